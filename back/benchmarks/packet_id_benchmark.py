@@ -0,0 +1,52 @@
+"""Benchmark of packet id generation (cost per packet).
+
+Usage (from the back directory):
+    python benchmarks/packet_id_benchmark.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pkt_parser import packet_ids, packet_uuid  # noqa: E402
+
+PACKETS_COUNT = 1000000
+
+
+def per_packet_ns(generate, repeat: int = 3) -> float:
+    """Get best time (in nanoseconds) of one id generation over several runs."""
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generate(PACKETS_COUNT)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed / PACKETS_COUNT * 1e9)
+
+    return best
+
+
+def random_ids(count: int) -> None:
+    for _ in range(count):
+        packet_uuid()
+
+
+def deterministic_ids(count: int) -> None:
+    ids = packet_ids(0, 0)
+
+    for _ in range(count):
+        next(ids)
+
+
+def main() -> None:
+    before = per_packet_ns(random_ids)
+    after = per_packet_ns(deterministic_ids)
+
+    print(f"packet_uuid: {before:,.0f} ns/packet")
+    print(f"packet_ids:  {after:,.0f} ns/packet ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
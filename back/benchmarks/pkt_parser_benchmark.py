@@ -0,0 +1,183 @@
+"""Benchmark of packet classification speed (packets per second).
+
+Usage (from the back directory):
+    python benchmarks/pkt_parser_benchmark.py [capture.pcap ...]
+
+Without arguments the traffic is rebuilt from the packet labels of the
+expected answers in tests/test_json, so the packet mix matches our labs.
+Every synthetic frame gets its own source MAC address, so all frames are
+distinct, like in real captures (ping sequence numbers, TCP sequence numbers).
+"""
+
+import json
+import re
+import socket
+import sys
+import time
+from pathlib import Path
+
+import dpkt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pkt_parser import iter_capture, packet_ids, packet_parser  # noqa: E402
+
+TEST_JSON_DIR = Path(__file__).resolve().parent.parent / "tests" / "test_json"
+PACKETS_COUNT = 200000
+
+MAC_SRC = b"\x02\x00\x00\x00\x00\x01"
+MAC_DST = b"\x02\x00\x00\x00\x00\x02"
+
+ADDRS_RE = re.compile(r"\n(\S+) > (\S+)$")
+PORTS_RE = re.compile(r"(\d+) > (\d+)")
+TCP_FLAGS = {
+    "FIN": dpkt.tcp.TH_FIN,
+    "SYN": dpkt.tcp.TH_SYN,
+    "RST": dpkt.tcp.TH_RST,
+    "PUSH": dpkt.tcp.TH_PUSH,
+    "ACK": dpkt.tcp.TH_ACK,
+    "URG": dpkt.tcp.TH_URG,
+}
+ICMP_TYPES = {
+    "ICMP echo-request": (8, 0),
+    "ICMP echo-reply": (0, 0),
+    "ICMP destination net unreachable": (3, 0),
+    "ICMP destination host unreachable": (3, 1),
+}
+DHCP_TYPES = {
+    "DHCP Discover": dpkt.dhcp.DHCPDISCOVER,
+    "DHCP Offer": dpkt.dhcp.DHCPOFFER,
+    "DHCP Request": dpkt.dhcp.DHCPREQUEST,
+    "DHCP ACK": dpkt.dhcp.DHCPACK,
+}
+BPDU_FLAGS = {
+    "RSTP (Unknown)": (2, 0),
+    "RSTP (Alternate/Backup)": (2, 1),
+    "RSTP (Root)": (2, 2),
+    "RSTP (Designated)": (2, 3),
+    "STP (Root)": (0, 0),
+    "STP (TC + Root)": (0, 1),
+}
+
+
+def ethernet(data, eth_type=dpkt.ethernet.ETH_TYPE_IP) -> bytes:
+    return bytes(
+        dpkt.ethernet.Ethernet(src=MAC_SRC, dst=MAC_DST, type=eth_type, data=data)
+    )
+
+
+def ip_frame(label: str, proto: int, payload) -> bytes:
+    match = ADDRS_RE.search(label)
+    src, dst = match.groups() if match else ("10.0.0.1", "10.0.0.2")
+
+    ip = dpkt.ip.IP(
+        src=socket.inet_aton(src), dst=socket.inet_aton(dst), p=proto, data=payload
+    )
+    ip.len += len(bytes(payload))
+
+    return ethernet(ip)
+
+
+def frame_from_label(label: str) -> bytes | None:
+    """Build a frame that pkt_parser labels the same way (roughly)."""
+    head = label.split("\n")[0]
+
+    if head in BPDU_FLAGS:
+        version, flags = BPDU_FLAGS[head]
+        llc = b"\x42\x42\x03" + bytes((0, 0, version, 0, flags)) + bytes(31)
+        return MAC_DST + MAC_SRC + len(llc).to_bytes(2, "big") + llc
+
+    if head.startswith("ARP"):
+        arp = dpkt.arp.ARP(
+            op=1 if head == "ARP-request" else 2,
+            sha=MAC_SRC,
+            spa=socket.inet_aton("10.0.0.1"),
+            tha=MAC_DST,
+            tpa=socket.inet_aton("10.0.0.2"),
+        )
+        return ethernet(arp, dpkt.ethernet.ETH_TYPE_ARP)
+
+    if head in ICMP_TYPES:
+        icmp_type, code = ICMP_TYPES[head]
+        icmp = dpkt.icmp.ICMP(
+            type=icmp_type, code=code, data=dpkt.icmp.ICMP.Echo(data=bytes(56))
+        )
+        return ip_frame(label, dpkt.ip.IP_PROTO_ICMP, icmp)
+
+    if head.startswith("TCP"):
+        sport, dport = map(int, PORTS_RE.search(head).groups())  # type: ignore[union-attr]
+        flags = sum(flag for name, flag in TCP_FLAGS.items() if name in head)
+        tcp = dpkt.tcp.TCP(sport=sport, dport=dport, flags=flags)
+        return ip_frame(label, dpkt.ip.IP_PROTO_TCP, tcp)
+
+    if head.startswith("UDP") or head.startswith("DHCP"):
+        payload = bytes(64)
+        sport, dport = 5000, 6000
+
+        if head.startswith("UDP"):
+            sport, dport = map(int, PORTS_RE.search(head).groups())  # type: ignore[union-attr]
+
+        for name, msg_type in DHCP_TYPES.items():
+            if head.startswith(name):
+                sport, dport = 68, 67
+                payload = bytes(
+                    dpkt.dhcp.DHCP(
+                        opts=((dpkt.dhcp.DHCP_OPT_MSGTYPE, bytes((msg_type,))),)
+                    )
+                )
+
+        udp = dpkt.udp.UDP(sport=sport, dport=dport, data=payload)
+        udp.ulen = len(bytes(udp))
+        return ip_frame(label, dpkt.ip.IP_PROTO_UDP, udp)
+
+    return None
+
+
+def frames_from_answers(directory: Path) -> list[bytes]:
+    frames = []
+
+    for answer_file in sorted(directory.glob("*_answer.json")):
+        for group in json.loads(answer_file.read_text()):
+            for pkt in group:
+                frame = frame_from_label(pkt["data"]["label"])
+
+                if frame is not None:
+                    frames.append(frame)
+
+    return frames
+
+
+def unique_frame(frame: bytes, index: int) -> bytes:
+    """Make the frame distinct by writing index to its source MAC address."""
+    return frame[:6] + b"\x02\x00" + index.to_bytes(4, "big") + frame[12:]
+
+
+def benchmark(records: list[tuple[float, bytes]], repeat: int = 3) -> float:
+    """Get best packets per second rate of packet_parser over several runs."""
+    best = 0.0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        packet_parser(records, "edge", "source", "target", 0, 0, packet_ids(0, 0))
+        elapsed = time.perf_counter() - start
+        best = max(best, len(records) / elapsed)
+
+    return best
+
+
+def main(files: list[str]) -> None:
+    if files:
+        records = [r for file in files for r in iter_capture(file)]
+    else:
+        frames = frames_from_answers(TEST_JSON_DIR)
+        records = [
+            (1700000000.0 + i * 0.0001, unique_frame(frames[i % len(frames)], i))
+            for i in range(PACKETS_COUNT)
+        ]
+
+    rate = benchmark(records)
+    print(f"{len(records)} packets, {rate:,.0f} packets/sec")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
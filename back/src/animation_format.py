@@ -0,0 +1,104 @@
+import io
+import json
+import re
+from typing import Iterable
+
+COMPACT_FORMAT = "compact"
+COMPACT_FORMAT_VERSION = 2
+
+# Deterministic packet id (pkt_parser.packet_ids): prefix of the edge direction
+# and packet number
+PACKET_ID_RE = re.compile(r"(pkt_\d+_\d+_)(\d+)")
+
+
+def encode_legacy(animation: Iterable[list[dict]]) -> str:
+    """Serialize animation frames one by one into JSON list of packet groups."""
+    out = io.StringIO()
+    out.write("[")
+
+    for i, frame in enumerate(animation):
+        if i:
+            out.write(", ")
+
+        out.write(json.dumps(frame))
+
+    out.write("]")
+
+    return out.getvalue()
+
+
+def encode_compact(animation: Iterable[list[dict]]) -> dict:
+    """Encode grouped animation into compact columnar form.
+
+    Edge attributes and labels are stored once in interned tables, every packet
+    is a row: [edge index, label index, time offset, packet number].
+    Time offsets are in microseconds from the first packet ("start").
+    Packet id is the id prefix of the edge followed by the packet number;
+    ids of other forms are stored in the row as is (with empty prefix).
+
+    Example:
+        {
+            "format": "compact",
+            "version": 2,
+            "start": 1683282739671808,
+            "edges": [["edge_1", "host_1", "l2sw1", 0, 0, "pkt_0_0_"], ...],
+            "labels": ["ARP-request", ...],
+            "frames": [[[0, 0, 0, 0], [1, 0, 15079, 0]], ...]
+        }
+
+    Args:
+        animation (Iterable[list[dict]]): Packets grouped by time (legacy format).
+
+    Returns:
+        dict: Compact animation (decoded by DecodeAnimation in miminet_animation.js).
+    """
+
+    edges: dict[tuple, int] = {}
+    labels: dict[str, int] = {}
+    frames = []
+    start = None
+
+    for group in animation:
+        frame = []
+
+        for pkt in group:
+            config = pkt["config"]
+            pkt_id = pkt["data"]["id"]
+            match = PACKET_ID_RE.fullmatch(pkt_id)
+            id_prefix, pkt_num = match.groups() if match else ("", pkt_id)
+
+            edge = (
+                config["path"],
+                config["source"],
+                config["target"],
+                config.get("loss_percentage", 0),
+                config.get("duplicate_percentage", 0),
+                id_prefix,
+            )
+            edge_idx = edges.setdefault(edge, len(edges))
+            label_idx = labels.setdefault(pkt["data"]["label"], len(labels))
+
+            timestamp = pkt["timestamp"]
+
+            if start is None:
+                start = timestamp
+
+            frame.append(
+                [
+                    edge_idx,
+                    label_idx,
+                    timestamp - start,
+                    int(pkt_num) if match else pkt_num,
+                ]
+            )
+
+        frames.append(frame)
+
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_FORMAT_VERSION,
+        "start": start or 0,
+        "edges": [list(edge) for edge in edges],
+        "labels": list(labels),
+        "frames": frames,
+    }
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+import time
+
+from mininet.log import info
+
+# Directory shared with the front (volume or network mount).
+# Empty - pcaps are sent inside the task messages.
+ARTIFACT_DIR = os.getenv("artifact_dir", "")
+
+# Artifacts not taken by the front during this time are removed (in seconds)
+ARTIFACT_TTL = int(os.getenv("artifact_ttl", "86400"))
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def store_artifact(data: bytes, artifact_dir: str = ARTIFACT_DIR) -> dict:
+    """Write pcap to the content-addressed store.
+
+    The file is written in chunks to a temporary file and renamed,
+    so the front never sees partially written artifacts.
+
+    Args:
+        data (bytes): pcap file content.
+        artifact_dir (str): store directory.
+
+    Returns:
+        dict: artifact description with sha256 hash and size.
+    """
+
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(artifact_dir, digest + ".pcap")
+
+    if not os.path.exists(path):
+        fd, tmp_path = tempfile.mkstemp(dir=artifact_dir, suffix=".tmp")
+
+        view = memoryview(data)
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for start in range(0, len(view), CHUNK_SIZE):
+                    f.write(view[start : start + CHUNK_SIZE])
+
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    else:
+        # Same capture is already stored, keep it from expiring
+        os.utime(path)
+
+    return {"sha256": digest, "size": len(data)}
+
+
+def store_pcaps(
+    pcaps: list[tuple[bytes, str]], artifact_dir: str = ARTIFACT_DIR
+) -> list:
+    """Replace pcap bytes with artifact descriptions (if the store is configured).
+
+    Returns:
+        list: [(bytes, name), ...] without the store, [{"sha256", "size", "name"}, ...]
+            otherwise.
+    """
+
+    if not artifact_dir:
+        return pcaps
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    remove_expired(artifact_dir)
+
+    artifacts = []
+
+    for data, name in pcaps:
+        artifact = store_artifact(data, artifact_dir)
+        artifact["name"] = name
+        artifacts.append(artifact)
+
+    return artifacts
+
+
+def remove_expired(artifact_dir: str = ARTIFACT_DIR, ttl: int = ARTIFACT_TTL) -> None:
+    """Remove artifacts older than ttl seconds."""
+    deadline = time.time() - ttl
+
+    for entry in os.scandir(artifact_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < deadline:
+                os.remove(entry.path)
+        except OSError as e:
+            info(f"[artifact_store] can't remove {entry.path}: {e}\n")
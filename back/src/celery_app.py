@@ -30,8 +30,19 @@ EXCHANGE_NAME = os.getenv("exchange_name")
 
 DEFAULT_APP_EXCHANGE = Exchange(EXCHANGE_NAME, type=EXCHANGE_TYPE)
 
+# Interactive simulations are sent with higher priority than exam checks.
+# Off by default: RabbitMQ refuses to redeclare existing queues with priority
+# (PRECONDITION_FAILED), so they have to be deleted or renamed (queue_names)
+# before setting queue_max_priority.
+QUEUE_MAX_PRIORITY = int(os.getenv("queue_max_priority", "0")) or None
+
 QUEUES = [
-    Queue(name, exchange=DEFAULT_APP_EXCHANGE, routing_key=ROUTING_KEY)
+    Queue(
+        name,
+        exchange=DEFAULT_APP_EXCHANGE,
+        routing_key=ROUTING_KEY,
+        max_priority=QUEUE_MAX_PRIORITY,
+    )
     for name in QUEUES_NAMES
 ]
 
@@ -10,3 +10,11 @@ result_backend = os.getenv("rpc_urls")
 imports = ["tasks"]
 
 broker_connection_retry_on_startup = True
+
+# Take one task at a time: waiting tasks stay in the broker,
+# so high priority tasks aren't stuck behind prefetched ones
+worker_prefetch_multiplier = 1
+task_acks_late = True
+# Task of a crashed worker process is acknowledged, not returned to the queue:
+# a network crashing the emulator would be redelivered forever
+task_reject_on_worker_lost = False
@@ -1,29 +1,31 @@
+import heapq
 import os
 import os.path
 import subprocess
 import time
-
-import dpkt
+from operator import itemgetter
+from typing import Iterable, Iterator
 
 from ipmininet.ipnet import IPNet
 from jobs import Jobs
-from network_schema import Job, Network
-from pkt_parser import create_pkt_animation
+from job_scheduler import execute_jobs, order_jobs
+from network_schema import Job, Network, NetworkSchemaError
+from pkt_parser import create_pkt_animation, iter_capture
 from mininet.log import setLogLevel, info, error
-from network_topology import MiminetTopology
-from network import MiminetNetwork
+from network_pool import NETWORK_POOL
 
 
 def emulate(
     network: Network,
-) -> tuple[list[list], list[tuple[bytes, str]]]:
+) -> tuple[Iterable[list[dict]], list[tuple[str, str]]]:
     """Run mininet emulation.
 
     Args:
         network (str): Network schema for emulation.
 
     Returns:
-        tuple: animation list and pcap files.
+        tuple: animation frames (generated lazily from capture files)
+            and paths of pcap files (see read_pcaps).
     """
 
     setLogLevel("info")
@@ -32,14 +34,17 @@ def emulate(
     MAX_JOBS_COUNT = 30
     MAX_TIME_SLEEP = 60
     if len(network.jobs) > MAX_JOBS_COUNT:
-        raise ValueError(
+        raise NetworkSchemaError(
             f"Превышен лимит! В сети максимальное количество команд ({MAX_JOBS_COUNT}). "
             f"Текущее количество: {len(network.jobs)}"
         )
     sleep_jobs = [j for j in network.jobs if j.job_id == 7]
-    total_time = sum(int(j.arg_1) for j in sleep_jobs)
+    try:
+        total_time = sum(int(j.arg_1) for j in sleep_jobs)
+    except ValueError:
+        raise NetworkSchemaError("Неверное время в команде sleep.")
     if total_time > 60 or total_time < 0:
-        raise ValueError(
+        raise NetworkSchemaError(
             f"Превышен лимит! В сети максимальное количество команд sleep {MAX_TIME_SLEEP})."
         )
 
@@ -47,15 +52,10 @@ def emulate(
         return [], []
 
     try:
-        topo = MiminetTopology(network)
-        net = MiminetNetwork(topo, network)
-
-        net.start()
+        topo, net = NETWORK_POOL.acquire(network)
 
         # Jobs with high ID have priority over low ones
-        ordered_jobs = sorted(
-            network.jobs, key=lambda job: job.job_id // 100, reverse=True
-        )
+        ordered_jobs = order_jobs(network.jobs)
 
         error(
             "[emulator] Job execution order (%d jobs): %s\n"
@@ -68,7 +68,7 @@ def emulate(
             )
         )
 
-        for job in ordered_jobs:
+        def run_job(job: Job) -> None:
             info(
                 "[emulator] Executing job: host=%s job_id=%s cmd=%r args=(%r, %r, %r, %r, %r)\n"
                 % (
@@ -90,6 +90,9 @@ def emulate(
                 % (job.host_id, job.job_id, elapsed)
             )
 
+        # Independent jobs of different hosts are executed concurrently
+        execute_jobs(ordered_jobs, run_job)
+
         # Log pcap file sizes AND actual paths used by mimidump before stop().
         # mimidump writes to {intf.node.cwd}/capture_{intf.name}_out.pcapng —
         # for hosts cwd may differ from /tmp (routers use /tmp, plain hosts may use /).
@@ -121,11 +124,12 @@ def emulate(
                     )
                 )
 
-        error("[emulator] calling net.stop()\n")
-        net.stop()
+        error("[emulator] releasing network (stop or keep warm)\n")
+        NETWORK_POOL.release(network)
 
     except Exception as e:
         error(f"An error occurred during mininet configuration: {str(e)}")
+        NETWORK_POOL.discard()
         subprocess.call("mn -c", shell=True)
 
         raise e
@@ -139,29 +143,31 @@ def emulate(
         ]:
             size = os.path.getsize(fname) if os.path.exists(fname) else -1
             error("[emulator] pcap size after stop: %s = %d bytes\n" % (fname, size))
-    error("[emulator] Animation groups before grouping: %d\n" % len(animation))
-    animation = group_packets_by_time(animation)
-    error("[emulator] Animation groups after time-grouping: %d\n" % len(animation))
+    error("[emulator] Animation packet streams: %d\n" % len(animation))
 
-    return animation, pcaps
+    return group_packets_by_time(animation), pcaps
 
 
 def create_animation(
     interfaces_info,
-) -> tuple[list[list] | list, list | list[tuple[bytes, str]]]:
+) -> tuple[list[Iterator[dict]], list[tuple[str, str]]]:
     """Creates an animation using saved pcap files.
 
+    Capture files are read lazily while the animation is consumed,
+    so it must be consumed before the next emulation removes them.
+
     Args:
         interfaces_info: Interface information stored in the topology.
 
     Returns:
-        tuple: A tuple containing the animation list and a list of packet captures with their names.
+        tuple: A tuple containing the animation (lazy time-ordered packet stream
+            of every link) and a list of packet capture paths with their names.
     """
 
     pcap_list = []
     animation = []
 
-    for (
+    for edge_index, (
         link1,
         link2,
         edge_id,
@@ -169,20 +175,13 @@ def create_animation(
         edge_target,
         loss_percentage,
         duplicate_percentage,
-    ) in interfaces_info:
+    ) in enumerate(interfaces_info):
         pcap_out_file1 = "/tmp/capture_" + link1 + "_out.pcapng"
         pcap_out_file2 = "/tmp/capture_" + link2 + "_out.pcapng"
 
         pcap_file1 = "/tmp/capture_" + link1 + ".pcapng"
         pcap_file2 = "/tmp/capture_" + link2 + ".pcapng"
 
-        if not os.path.exists(pcap_out_file1):
-            raise ValueError("No capture for interface: " + link1)
-
-        if not os.path.exists(pcap_out_file2):
-            raise ValueError("No capture for interface: " + link2)
-
-        # Log pcap sizes and packet counts before parsing
         for fname, iface, node_name, direction in [
             (pcap_file1, link1, edge_source, "INOUT"),
             (pcap_out_file1, link1, edge_source, "OUT"),
@@ -194,79 +193,87 @@ def create_animation(
                     "[create_animation] pcap: node=%s iface=%s direction=%s MISSING\n"
                     % (node_name, iface, direction)
                 )
-                continue
-            fsize = os.path.getsize(fname)
-            count_pcap = count_pcapng = -1
-            try:
-                with open(fname, "rb") as _f:
-                    count_pcap = sum(1 for _ in dpkt.pcap.Reader(_f))
-            except Exception:
-                pass
-            try:
-                with open(fname, "rb") as _f:
-                    count_pcapng = sum(1 for _ in dpkt.pcapng.Reader(_f))
-            except Exception:
-                pass
+                raise ValueError("No capture for interface: " + iface)
+
             error(
                 "[create_animation] pcap: node=%s iface=%s direction=%s "
-                "file=%s size=%d pcap_count=%d pcapng_count=%d\n"
-                % (node_name, iface, direction, fname, fsize, count_pcap, count_pcapng)
+                "file=%s size=%d\n"
+                % (node_name, iface, direction, fname, os.path.getsize(fname))
             )
 
-        with open(pcap_file1, "rb") as file1, open(pcap_file2, "rb") as file2:
-            pcap_list.append((file1.read(), link1))
-            pcap_list.append((file2.read(), link2))
+        pcap_list.append((pcap_file1, link1))
+        pcap_list.append((pcap_file2, link2))
 
         packets = create_pkt_animation(
-            pcap_out_file1,
-            pcap_out_file2,
+            iter_capture(pcap_out_file1),
+            iter_capture(pcap_out_file2),
             edge_id,
             edge_source,
             edge_target,
             loss_percentage,
             duplicate_percentage,
+            edge_index,
         )
 
-        animation += packets
+        animation.append(packets)
 
     return animation, pcap_list
 
 
-def group_packets_by_time(packets, time_slice_us: int = 14000):
-    """Group packets into animation frames by time intervals.
+def read_pcaps(pcap_files: list[tuple[str, str]]) -> list[tuple[bytes, str]]:
+    """Read packet captures returned by emulate().
 
     Args:
-        packets: List of packets.
-        time_slice_us (int): Time interval (in microseconds) to group packets.
+        pcap_files (list): Capture paths with their names.
 
     Returns:
-        list: Grouped animation frames.
+        list: Capture contents with their names.
     """
-    if not packets:
-        return []
+    pcaps = []
+
+    for fname, name in pcap_files:
+        with open(fname, "rb") as f:
+            pcaps.append((f.read(), name))
 
-    animation_packets = sorted(packets, key=lambda k: k.get("timestamp", 0))
+    return pcaps
+
+
+def group_packets_by_time(
+    streams: Iterable[Iterable[dict]], time_slice_us: int = 14000
+) -> Iterator[list[dict]]:
+    """Group packets into animation frames by time intervals.
+
+    Streams are merged lazily, so only the current frame and one packet
+    of every stream are kept in memory.
+
+    Args:
+        streams (Iterable[Iterable[dict]]): Packets of every link ordered by time.
+        time_slice_us (int): Time interval (in microseconds) to group packets.
+
+    Yields:
+        list: Animation frame.
+    """
 
-    grouped = []
     current_group: list = []
-    first_packet_time = int(animation_packets[0]["timestamp"])
-    time_limit = first_packet_time + time_slice_us
+    time_limit = None
 
-    for pkt in animation_packets:
-        pkt_time = int(pkt["timestamp"])
+    # Streams are already ordered, k-way merge instead of sorting all packets
+    for pkt in heapq.merge(*streams, key=itemgetter("timestamp")):
+        pkt_time = pkt["timestamp"]
+
+        if time_limit is None:
+            time_limit = pkt_time + time_slice_us
 
         if pkt_time > time_limit:
             # Add packet to new group based on its time
-            grouped.append(current_group)
+            yield current_group
             current_group = [pkt]
             time_limit = pkt_time + time_slice_us
         else:
             current_group.append(pkt)
 
     if current_group:
-        grouped.append(current_group)
-
-    return grouped
+        yield current_group
 
 
 def execute_job(job: Job, net: IPNet) -> None:
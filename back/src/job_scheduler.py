@@ -0,0 +1,110 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from network_schema import Job
+
+# Jobs that run alone: everything before them has to be finished
+# and everything after them starts only when they are done.
+BARRIER_JOB_IDS = frozenset(
+    (
+        # link down: changes the path of packets sent by every other host
+        6,
+        # sleep: delays the whole network, not just the host it's set on
+        7,
+        # dhcp client: /tmp/dhclient.conf, leases and pid files are shared by hosts
+        108,
+        # dhcp server: clients of the next stages need the running dnsmasq
+        203,
+    )
+)
+
+# Maximum number of hosts executing jobs at the same time (1 - sequential execution).
+# Parallel execution is opt-in: expected captures were recorded sequentially.
+MAX_PARALLEL_JOBS = int(os.getenv("max_parallel_jobs", "1"))
+
+
+def job_priority(job: Job) -> int:
+    """Jobs with high ID have priority over low ones."""
+    return job.job_id // 100
+
+
+def order_jobs(jobs: list[Job]) -> list[Job]:
+    """Sort jobs by priority keeping the user's order inside every priority level."""
+    return sorted(jobs, key=job_priority, reverse=True)
+
+
+def build_stages(ordered_jobs: list[Job]) -> list[list[list[Job]]]:
+    """Build dependency graph of jobs as sequence of stages.
+
+    Stages are executed one after another. Every stage is a list of chains:
+    jobs of the same host in the user's order. Chains of the stage are
+    independent and can be executed concurrently.
+
+    A new stage starts when the priority level changes and around barrier jobs.
+
+    Args:
+        ordered_jobs (list[Job]): Jobs sorted by order_jobs.
+
+    Returns:
+        list: stages -> chains -> jobs.
+    """
+    stages: list[list[list[Job]]] = []
+    chains: dict[str, list[Job]] = {}
+    stage_priority = None
+
+    for job in ordered_jobs:
+        is_barrier = job.job_id in BARRIER_JOB_IDS
+
+        if chains and (is_barrier or job_priority(job) != stage_priority):
+            stages.append(list(chains.values()))
+            chains = {}
+
+        chains.setdefault(job.host_id, []).append(job)
+        stage_priority = job_priority(job)
+
+        if is_barrier:
+            stages.append(list(chains.values()))
+            chains = {}
+
+    if chains:
+        stages.append(list(chains.values()))
+
+    return stages
+
+
+def execute_jobs(
+    ordered_jobs: list[Job],
+    execute: Callable[[Job], None],
+    max_workers: int = MAX_PARALLEL_JOBS,
+) -> None:
+    """Execute jobs stage by stage, chains of every stage run in parallel.
+
+    Args:
+        ordered_jobs (list[Job]): Jobs sorted by order_jobs.
+        execute (Callable[[Job], None]): Function executing single job.
+        max_workers (int): Maximum number of chains executed at the same time.
+    """
+
+    if max_workers <= 1:
+        for job in ordered_jobs:
+            execute(job)
+        return
+
+    def run_chain(chain: list[Job]) -> None:
+        for job in chain:
+            execute(job)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for stage in build_stages(ordered_jobs):
+            if len(stage) == 1:
+                run_chain(stage[0])
+                continue
+
+            futures = [executor.submit(run_chain, chain) for chain in stage]
+
+            # Raise the first error only after the whole stage is finished
+            for future in futures:
+                future.exception()
+            for future in futures:
+                future.result()
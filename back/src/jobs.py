@@ -534,6 +534,60 @@ def dhcp_server(job: Job, job_host):
     info(f"[dhcp_server] dnsmasq started on host={job_host.name}")
 
 
+# Each command on the application server is encoded by a number
+JOB_HANDLERS: dict[int, Callable[[Job, Any], None]] = {
+    1: ping_handler,
+    2: ping_with_options_handler,
+    3: sending_udp_data_handler,
+    4: sending_tcp_data_handler,
+    5: traceroute_handler,
+    6: link_down_handler,
+    7: sleep_handler,
+    100: ip_addr_add_handler,
+    101: iptables_handler,
+    102: ip_route_add_handler,
+    103: arp_handler,
+    104: subinterface_with_vlan,
+    105: add_ipip_interface,
+    106: add_gre,
+    107: arp_proxy_enable,
+    108: dhcp_client,
+    109: port_forwarding_tcp_handler,
+    110: port_forwarding_udp_handler,
+    200: open_udp_server_handler,
+    201: open_tcp_server_handler,
+    202: block_tcp_udp_port,
+    203: dhcp_server,
+}
+
+# Jobs whose side effects are undone by MiminetNetwork.reset()
+# (addresses, routes, neighbours, iptables, link state and job processes).
+RESETTABLE_JOB_IDS = frozenset(
+    (1, 2, 3, 4, 5, 6, 7, 100, 101, 102, 103, 109, 110, 200, 201, 202)
+)
+
+# Jobs that leave state reset() doesn't know about, the network is rebuilt
+NOT_RESETTABLE_JOB_IDS = frozenset(
+    (
+        # VLAN subinterface stays on the node
+        104,
+        # IPIP and GRE tunnel interfaces stay on the node
+        105,
+        106,
+        # proxy_arp sysctl isn't restored
+        107,
+        # dhclient leases and pid files
+        108,
+        # dnsmasq daemon with its config and lease files
+        203,
+    )
+)
+
+# A new job must be added to one of the sets above
+assert RESETTABLE_JOB_IDS.isdisjoint(NOT_RESETTABLE_JOB_IDS)
+assert RESETTABLE_JOB_IDS | NOT_RESETTABLE_JOB_IDS == JOB_HANDLERS.keys()
+
+
 class Jobs:
     """Class for representing various commands for working with miminet network"""
 
@@ -543,32 +597,7 @@ class Jobs:
             job (Job): What type of Job we should execute.
             job_host (Any): Host for which the job is performed.
         """
-        # Dictionary for storing strategies
-        # (At the moment this is used since each command on the application server is encoded by a number)
-        self._dct: dict[int, Callable[[Job, Any], None]] = {
-            1: ping_handler,
-            2: ping_with_options_handler,
-            3: sending_udp_data_handler,
-            4: sending_tcp_data_handler,
-            5: traceroute_handler,
-            6: link_down_handler,
-            7: sleep_handler,
-            100: ip_addr_add_handler,
-            101: iptables_handler,
-            102: ip_route_add_handler,
-            103: arp_handler,
-            104: subinterface_with_vlan,
-            105: add_ipip_interface,
-            106: add_gre,
-            107: arp_proxy_enable,
-            108: dhcp_client,
-            109: port_forwarding_tcp_handler,
-            110: port_forwarding_udp_handler,
-            200: open_udp_server_handler,
-            201: open_tcp_server_handler,
-            202: block_tcp_udp_port,
-            203: dhcp_server,
-        }
+        self._dct: dict[int, Callable[[Job, Any], None]] = JOB_HANDLERS
         self._job: Job = job
         self._job_host = job_host
         self._strategy: Callable[[Job, Any], None] = self._dct[self._job.job_id]
@@ -0,0 +1,166 @@
+import os
+import re
+import time
+
+from ipmininet.ipnet import IPNet
+from mininet.log import info
+
+from network_schema import Node
+
+# Port states that mean spanning tree hasn't converged yet
+TRANSITIONAL_PORT_STATES = ("listening", "learning")
+
+# Only alternate and backup ports stay blocked in a converged tree.
+# Designated ports are blocked until they become forwarding
+# (with RSTP host ports wait for auto-edge detection).
+BLOCKED_PORT_STATES = ("blocking", "discarding")
+CONVERGED_BLOCKED_ROLES = ("alternate", "backup")
+
+# "<interface> <role> <state> ..." rows of ovs-appctl stp/show and rstp/show
+PORT_STATE_RE = re.compile(
+    r"^\s*\S+\s+(\S+)\s+(disabled|blocking|listening|learning|forwarding|discarding)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# How long the network state has to stay the same to be considered converged
+STABLE_TIME = 2.0
+POLL_INTERVAL = 0.2
+
+
+def wait_for_network(
+    net: IPNet, nodes: list[Node], interfaces: list, timeout: float
+) -> float:
+    """Wait until the network is ready for emulation (but no longer than timeout).
+
+    The network is ready when every capture file exists, every link is up,
+    router daemons are running and spanning tree has converged on every switch.
+
+    Args:
+        net (IPNet): network
+        nodes (list[Node]): nodes on the network
+        interfaces (list): interfaces information stored in the topology
+        timeout (float): upper bound of waiting (in seconds)
+
+    Returns:
+        float: time spent waiting (in seconds)
+    """
+
+    start = time.monotonic()
+    deadline = start + timeout
+
+    last_state = None
+    stable_since = start
+
+    while time.monotonic() < deadline:
+        now = time.monotonic()
+        state = spanning_tree_state(net, nodes)
+
+        if state != last_state:
+            last_state = state
+            stable_since = now
+
+        if (
+            captures_exist(interfaces)
+            and links_up(net, interfaces)
+            and daemons_running(net)
+            and spanning_tree_converged(state)
+            and (not state or now - stable_since >= STABLE_TIME)
+        ):
+            info("[readiness] network is ready in %.2fs\n" % (now - start))
+            return now - start
+
+        time.sleep(POLL_INTERVAL)
+
+    info("[readiness] network isn't ready after %.2fs, continue anyway\n" % timeout)
+    return time.monotonic() - start
+
+
+def captures_exist(interfaces: list) -> bool:
+    """Check that mimidump has created capture files for every interface."""
+    return all(
+        os.path.exists(f"/tmp/capture_{link1}_out.pcapng")
+        and os.path.exists(f"/tmp/capture_{link2}_out.pcapng")
+        for link1, link2, *_ in interfaces
+    )
+
+
+def links_up(net: IPNet, interfaces: list) -> bool:
+    """Check operational state of every interface from the schema."""
+    node_ifaces: dict[str, list[str]] = {}
+
+    for link1, link2, _, source, target, *_ in interfaces:
+        node_ifaces.setdefault(source, []).append(link1)
+        node_ifaces.setdefault(target, []).append(link2)
+
+    for node_name, ifaces in node_ifaces.items():
+        out = net.get(node_name).cmd(
+            " ".join(f"cat /sys/class/net/{iface}/operstate;" for iface in ifaces)
+        )
+        states = out.split()
+
+        if len(states) != len(ifaces) or any(
+            s not in ("up", "unknown") for s in states
+        ):
+            return False
+
+    return True
+
+
+def daemons_running(net: IPNet) -> bool:
+    """Check that every daemon configured on routers has a running process."""
+    for router in net.routers:
+        daemons = getattr(router.nconfig, "daemons", [])
+
+        for daemon in daemons:
+            if not router.cmd(f"pgrep -x {daemon.NAME}").strip():
+                return False
+
+    return True
+
+
+def spanning_tree_state(
+    net: IPNet, nodes: list[Node]
+) -> dict[str, tuple[tuple[str, str], ...]]:
+    """Get port roles and states of every switch with STP or RSTP enabled.
+
+    Args:
+        net (IPNet): network
+        nodes (list[Node]): nodes on the network
+
+    Returns:
+        dict: switch name -> (role, state) of its ports
+    """
+
+    state = {}
+
+    for node in nodes:
+        if node.config.type != "l2_switch" or node.config.stp not in (1, 2):
+            continue
+
+        switch = net.get(node.data.id)
+        command = "stp/show" if node.config.stp == 1 else "rstp/show"
+        out = switch.cmd(f"ovs-appctl {command} {switch.name}")
+
+        state[switch.name] = tuple(
+            (role.lower(), port_state.lower())
+            for role, port_state in PORT_STATE_RE.findall(out)
+        )
+
+    return state
+
+
+def spanning_tree_converged(state: dict[str, tuple[tuple[str, str], ...]]) -> bool:
+    """Every switch has a forwarding port, no ports in transitional states
+    and only alternate or backup ports are blocked."""
+    return all(
+        any(port_state == "forwarding" for _, port_state in ports)
+        and not any(
+            port_state in TRANSITIONAL_PORT_STATES
+            or (
+                port_state in BLOCKED_PORT_STATES
+                and role not in CONVERGED_BLOCKED_ROLES
+            )
+            for role, port_state in ports
+        )
+        for ports in state.values()
+    )
@@ -1,15 +1,20 @@
 import os
+import signal
+import subprocess
 import time
 from psutil import Process
 from ipmininet.ipnet import IPNet
+from ipmininet.ipovs_switch import IPOVSSwitch
 from mininet.log import info
 import psutil
 
 from network_topology import MiminetTopology
 from network_schema import Network
+from pkt_parser import is_ipv4_address
 
 from net_utils.vlan import setup_vlans, clean_bridges
 from net_utils.vxlan import setup_vtep_interfaces, teardown_vtep_bridges
+from net_utils.readiness import wait_for_network
 
 
 class MiminetNetwork(IPNet):
@@ -17,6 +22,13 @@ class MiminetNetwork(IPNet):
         super().__init__(topo=topo, use_v6=False, autoSetMacs=True, allocate_IPs=False)
         self.__network_topology = topo
         self.__network_schema = network
+        # Capture processes restarted by reset() (mininet doesn't know about them)
+        self.__captures: list[subprocess.Popen] = []
+        # Command lines of capture processes stopped by stop_captures()
+        self.__capture_cmds: list[tuple[str, list[str], str]] = []
+        # Processes of the started network (node shells, router daemons),
+        # reset() keeps them and kills only processes started by jobs
+        self.__baseline: set[Process] = set()
 
     def start(self):
         # Start network
@@ -26,10 +38,16 @@ class MiminetNetwork(IPNet):
         setup_vlans(self, self.__network_schema.nodes)
         setup_vtep_interfaces(self, self.__network_schema.nodes)
 
-        # Waiting for network setup
-        time.sleep(self.__network_topology.network_configuration_time)
+        # Waiting for network setup, configuration time is an upper bound
+        wait_for_network(
+            self,
+            self.__network_schema.nodes,
+            self.__network_topology.interfaces,
+            self.__network_topology.network_configuration_time,
+        )
 
         self.__check_files()
+        self.__baseline = set(Process().children(recursive=True))
 
     def stop(self):
         info("[network.stop] called, sleeping 2s before teardown\n")
@@ -39,6 +57,12 @@ class MiminetNetwork(IPNet):
         clean_bridges(self)
         teardown_vtep_bridges(self, self.__network_schema.nodes)
 
+        for capture in self.__captures:
+            if capture.poll() is None:
+                capture.send_signal(signal.SIGINT)
+                capture.wait()
+        self.__captures = []
+
         info("[network.stop] calling __clean_services\n")
         self.__clean_services()
         info(
@@ -47,6 +71,112 @@ class MiminetNetwork(IPNet):
         super().stop()
         info("[network.stop] done\n")
 
+    def stop_captures(self) -> bool:
+        """Flush capture files without stopping the network.
+
+        Command lines of the stopped mimidump processes are saved,
+        so reset() can start them again for the next emulation.
+
+        Returns:
+            bool: True if every capture can be restarted later.
+        """
+        # Wait for packets in flight
+        time.sleep(2)
+
+        iface_to_node = {}
+        for link1, link2, _, source, target, *_ in self.__network_topology.interfaces:
+            iface_to_node[link1] = source
+            iface_to_node[link2] = target
+
+        self.__capture_cmds = []
+        restartable = True
+
+        for child in Process().children(recursive=True):
+            try:
+                if child.name() != "mimidump":
+                    continue
+
+                cmdline, cwd = child.cmdline(), child.cwd()
+                child.send_signal(signal.SIGINT)
+                child.wait(timeout=5)
+            except (psutil.NoSuchProcess, psutil.TimeoutExpired):
+                restartable = False
+                continue
+
+            iface = next((arg for arg in cmdline if arg in iface_to_node), None)
+
+            if iface is None:
+                restartable = False
+                continue
+
+            self.__capture_cmds.append((iface_to_node[iface], cmdline, cwd))
+
+        return restartable and len(self.__capture_cmds) > 0
+
+    def reset(self, network: Network):
+        """Restore the network state after the previous emulation and restart captures.
+
+        Args:
+            network (Network): Schema of the next emulation (same topology).
+        """
+        self.__network_schema = network
+
+        self.__clean_services(keep=self.__baseline)
+        self.__clear_files()
+
+        for node in network.nodes:
+            if node.config.type not in ("host", "server", "router"):
+                continue
+
+            commands = [
+                "iptables -F",
+                "iptables -X",
+                "iptables -t nat -F",
+                "iptables -t nat -X",
+                "ip route flush table main",
+            ]
+
+            for iface in node.interface:
+                commands.append(f"ip link set {iface.name} up")
+                commands.append(f"ip addr flush dev {iface.name}")
+
+                if is_ipv4_address(iface.ip) and 0 < int(iface.netmask) <= 32:
+                    commands.append(
+                        f"ip addr add {iface.ip}/{iface.netmask} dev {iface.name}"
+                    )
+
+            if node.config.default_gw:
+                commands.append(f"ip route add default via {node.config.default_gw}")
+
+            # Static entries (arp -s of job 103) are removed too
+            commands.append("ip neigh flush all nud all")
+
+            self.get(node.data.id).cmd("; ".join(commands))
+
+        # Learned MAC addresses would change flooding compared to a fresh network
+        for switch in self.switches:
+            if isinstance(switch, IPOVSSwitch):
+                switch.cmd(f"ovs-appctl fdb/flush {switch.name}")
+                switch.cmd(f"ovs-appctl fdb/flush br-{switch.name}")
+
+        self.__captures = [
+            self.get(node_name).popen(
+                cmdline, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            for node_name, cmdline, cwd in self.__capture_cmds
+        ]
+        self.__capture_cmds = []
+
+        # Addresses and routes are re-added, wait for links, daemons and STP again
+        wait_for_network(
+            self,
+            network.nodes,
+            self.__network_topology.interfaces,
+            self.__network_topology.network_configuration_time,
+        )
+
+        self.__check_files()
+
     def __check_files(self):
         """Checking for the existence of pcap files."""
         for link1, link2, *_ in self.__network_topology.interfaces:
@@ -74,22 +204,28 @@ class MiminetNetwork(IPNet):
                 if os.path.exists(f):
                     os.remove(f)
 
-    def __clean_services(self):
+    def __clean_services(self, keep: set[Process] | None = None):
         """
         Processes running inside virtual devices don't terminate using default mininet functions.
 
         This function kill them manually.
+
+        Args:
+            keep (set[Process] | None): Processes to leave running. If not set,
+                every process except captures and node shells is killed.
         """
         info("Starting processes cleanup... ")
         current_process = Process()
         children = current_process.children(recursive=True)
-        allowed = ("mimidump", "bash")
+
+        if keep is None:
+            keep = {child for child in children if child.name() == "bash"}
 
         for child in children:
             if child.status() == psutil.STATUS_ZOMBIE:
                 # in case we already have zombies
                 child.wait()
-            elif child.name() not in allowed:
+            elif child.name() != "mimidump" and child not in keep:
                 # finish other processes
                 info(f"Killed: {child.name()} {child.pid}")
                 child.kill()
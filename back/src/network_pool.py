@@ -0,0 +1,122 @@
+import dataclasses
+import hashlib
+import json
+import os
+
+from mininet.log import info
+
+from jobs import RESETTABLE_JOB_IDS
+from network import MiminetNetwork
+from network_schema import Network
+from network_topology import MiminetTopology
+
+
+def topology_key(network: Network) -> str:
+    """Canonical hash of the network topology (nodes and edges without jobs).
+
+    Node positions and labels are excluded: moving or renaming a device
+    doesn't change the emulation.
+    """
+    nodes = []
+
+    for node in network.nodes:
+        node_dict = dataclasses.asdict(node)
+        node_dict.pop("position", None)
+        node_dict["data"].pop("label", None)
+        node_dict["config"].pop("label", None)
+        nodes.append(node_dict)
+
+    edges = [dataclasses.asdict(edge) for edge in network.edges]
+
+    canonical = json.dumps(
+        {
+            "nodes": sorted(nodes, key=lambda n: n["data"]["id"]),
+            "edges": sorted(edges, key=lambda e: e["data"]["id"]),
+        },
+        sort_keys=True,
+    )
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_reusable(network: Network) -> bool:
+    """Check whether the network can be safely reset and used for the next emulation."""
+    if any(job.job_id not in RESETTABLE_JOB_IDS for job in network.jobs):
+        return False
+
+    # VXLAN bridges are bound to interface addresses, don't touch them
+    return not any(
+        iface.vxlan_vni is not None or iface.vxlan_connection_type is not None
+        for node in network.nodes
+        for iface in node.interface
+    )
+
+
+class NetworkPool:
+    """Keeps the last started network alive to reuse it for the same topology.
+
+    Only one network is kept: interface and switch names of different
+    topologies collide, so a network is stopped before another one is built.
+    """
+
+    def __init__(self, enabled: bool):
+        self.__enabled = enabled
+        self.__key: str | None = None
+        self.__topo: MiminetTopology | None = None
+        self.__net: MiminetNetwork | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def acquire(self, network: Network) -> tuple[MiminetTopology, MiminetNetwork]:
+        """Get started network for the given schema (warm one if possible)."""
+        key = topology_key(network)
+
+        if self.__net is not None and self.__topo is not None and self.__key == key:
+            info(f"[network_pool] reusing warm network {key[:12]}\n")
+            try:
+                self.__net.reset(network)
+                return self.__topo, self.__net
+            except Exception as e:
+                info(f"[network_pool] can't reset warm network: {e}\n")
+                self.discard()
+
+        self.discard()
+
+        topo = MiminetTopology(network)
+        net = MiminetNetwork(topo, network)
+        net.start()
+
+        self.__key, self.__topo, self.__net = key, topo, net
+
+        return topo, net
+
+    def release(self, network: Network) -> None:
+        """Finish emulation: flush captures and keep the network or stop it."""
+        if self.__net is None:
+            return
+
+        if self.__enabled and is_reusable(network) and self.__net.stop_captures():
+            info(f"[network_pool] keeping warm network {str(self.__key)[:12]}\n")
+            return
+
+        net = self.__net
+        self.__key, self.__topo, self.__net = None, None, None
+        net.stop()
+
+    def discard(self) -> None:
+        """Stop kept network (if any)."""
+        if self.__net is None:
+            return
+
+        net = self.__net
+        self.__key, self.__topo, self.__net = None, None, None
+
+        try:
+            net.stop()
+        except Exception as e:
+            info(f"[network_pool] error while stopping warm network: {e}\n")
+
+
+NETWORK_POOL = NetworkPool(enabled=os.getenv("warm_network", "0") == "1")
@@ -4,6 +4,10 @@ from dataclasses import dataclass
 from typing import Union, Optional
 
 
+class NetworkSchemaError(ValueError):
+    """Network schema can't be emulated (user error, retrying won't help)."""
+
+
 @dataclass
 class NodeData:
     """
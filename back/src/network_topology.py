@@ -4,9 +4,64 @@ from ipmininet.ipswitch import IPSwitch
 from ipmininet.ipovs_switch import IPOVSSwitch
 from ipmininet.iptopo import IPTopo
 from ipmininet.router.config import RouterConfig
-from network_schema import Network, Node, NodeConfig, NodeInterface
+from network_schema import (
+    Network,
+    NetworkSchemaError,
+    Node,
+    NodeConfig,
+    NodeInterface,
+)
 from pkt_parser import is_ipv4_address
 
+HOST_SYSCTL = (
+    "net.bridge.bridge-nf-call-arptables=0",
+    "net.bridge.bridge-nf-call-iptables=0",
+    "net.bridge.bridge-nf-call-ip6tables=0",
+    "net.ipv6.conf.all.disable_ipv6=1",
+    "net.ipv6.conf.default.disable_ipv6=1",
+    "net.ipv6.conf.lo.disable_ipv6=1",
+    "net.ipv4.tcp_min_tso_segs=1",
+    "net.ipv4.conf.all.accept_source_route=1",
+    "net.ipv4.conf.all.log_martians=1",
+)
+
+ROUTER_SYSCTL = (
+    "net.bridge.bridge-nf-call-arptables=0",
+    "net.bridge.bridge-nf-call-iptables=0",
+    "net.bridge.bridge-nf-call-ip6tables=0",
+    "net.ipv4.conf.all.accept_source_route=1",
+    "net.ipv4.conf.all.log_martians=1",
+    "net.ipv6.conf.all.disable_ipv6=1",
+    "net.ipv6.conf.default.disable_ipv6=1",
+)
+
+SWITCH_SYSCTL = (
+    "net.bridge.bridge-nf-call-arptables=0",
+    "net.bridge.bridge-nf-call-iptables=0",
+    "net.bridge.bridge-nf-call-ip6tables=0",
+    "net.ipv6.conf.all.disable_ipv6=1",
+    "net.ipv6.conf.default.disable_ipv6=1",
+    "net.ipv6.conf.lo.disable_ipv6=1",
+)
+
+
+def apply_sysctl(nodes: list, settings: tuple[str, ...]) -> None:
+    """Apply sysctl settings with a single command per network namespace.
+
+    Nodes outside of namespaces (switches and hubs, including the ones
+    created for every link) share the root namespace, so it's configured once.
+    """
+    command = "sysctl -q -w " + " ".join(settings)
+    root_namespace_configured = False
+
+    for node in nodes:
+        if not node.inNamespace:
+            if root_namespace_configured:
+                continue
+            root_namespace_configured = True
+
+        node.cmd(command)
+
 
 class MiminetTopology(IPTopo):
     """Class representing topology for miminet networks."""
@@ -56,7 +111,9 @@ class MiminetTopology(IPTopo):
             self.__handle_router(node_id, config)
 
     def __handle_l2_switch(self, node_id: str, config: NodeConfig):
-        assert config.stp in (0, 1, 2), "Incorrect STP mode"
+        if config.stp not in (0, 1, 2):
+            raise NetworkSchemaError(f"Incorrect STP mode {config.stp!r}.")
+
         is_stp_enabled = config.stp == 1  # Check switch mode
         is_rstp_enabled = config.stp == 2
 
@@ -107,10 +164,10 @@ class MiminetTopology(IPTopo):
             return matches[0]
 
         elif len(matches) == 0:
-            raise ValueError(f"Can't find {edge_id} in node interfaces.")
+            raise NetworkSchemaError(f"Can't find {edge_id} in node interfaces.")
 
         else:
-            raise ValueError(
+            raise NetworkSchemaError(
                 f"Found {len(matches)} matching interfaces in node (expected 1)."
             )
 
@@ -118,7 +175,14 @@ class MiminetTopology(IPTopo):
         """Configure IP settings for an link if valid."""
         ip, mask = iface.ip, iface.netmask
 
-        if is_ipv4_address(ip) and 0 < int(mask) <= 32:
+        try:
+            mask = int(mask)
+        except (TypeError, ValueError):
+            raise NetworkSchemaError(
+                f"Incorrect netmask {mask!r} of interface {iface.id}."
+            )
+
+        if is_ipv4_address(ip) and 0 < mask <= 32:
             link.addParams(ip=f"{ip}/{mask}")
 
     def build(self, *args, **kwargs):
@@ -150,11 +214,11 @@ class MiminetTopology(IPTopo):
             duplicate_percentage = _to_percent(edge.data.duplicate_percentage)
 
             if source_id not in self.__nodes:
-                raise ValueError(
+                raise NetworkSchemaError(
                     f"Edge '{edge_id}' references unknown source node '{source_id}'."
                 )
             if target_id not in self.__nodes:
-                raise ValueError(
+                raise NetworkSchemaError(
                     f"Edge '{edge_id}' references unknown target node '{target_id}'."
                 )
 
@@ -264,33 +328,9 @@ class MiminetTopology(IPTopo):
             if config.type == "router":
                 net[node.data.id].cmd(f"route add default gw {config.default_gw}")
 
-        for h in net.hosts:
-            h.cmd("sysctl -w net.bridge.bridge-nf-call-arptables=0")
-            h.cmd("sysctl -w net.bridge.bridge-nf-call-iptables=0")
-            h.cmd("sysctl -w net.bridge.bridge-nf-call-ip6tables=0")
-            h.cmd("sysctl -w net.ipv6.conf.all.disable_ipv6=1")
-            h.cmd("sysctl -w net.ipv6.conf.default.disable_ipv6=1")
-            h.cmd("sysctl -w net.ipv6.conf.lo.disable_ipv6=1")
-            h.cmd("sysctl -w net.ipv4.tcp_min_tso_segs=1")
-            h.cmd("sysctl -w net.ipv4.conf.all.accept_source_route=1")
-            h.cmd("sysctl -w net.ipv4.conf.all.log_martians=1")
-
+        apply_sysctl(net.hosts, HOST_SYSCTL)
         # Enable source route
-        for r in net.routers:
-            r.cmd("sysctl -w net.bridge.bridge-nf-call-arptables=0")
-            r.cmd("sysctl -w net.bridge.bridge-nf-call-iptables=0")
-            r.cmd("sysctl -w net.bridge.bridge-nf-call-ip6tables=0")
-            r.cmd("sysctl -w net.ipv4.conf.all.accept_source_route=1")
-            r.cmd("sysctl -w net.ipv4.conf.all.log_martians=1")
-            r.cmd("sysctl -w net.ipv6.conf.all.disable_ipv6=1")
-            r.cmd("sysctl -w net.ipv6.conf.default.disable_ipv6=1")
-
-        for sw in net.switches:
-            sw.cmd("sysctl -w net.bridge.bridge-nf-call-arptables=0")
-            sw.cmd("sysctl -w net.bridge.bridge-nf-call-iptables=0")
-            sw.cmd("sysctl -w net.bridge.bridge-nf-call-ip6tables=0")
-            sw.cmd("sysctl -w net.ipv6.conf.all.disable_ipv6=1")
-            sw.cmd("sysctl -w net.ipv6.conf.default.disable_ipv6=1")
-            sw.cmd("sysctl -w net.ipv6.conf.lo.disable_ipv6=1")
+        apply_sysctl(net.routers, ROUTER_SYSCTL)
+        apply_sysctl(net.switches, SWITCH_SYSCTL)
 
         super().post_build(net)
@@ -1,9 +1,11 @@
-import os
+import heapq
+import itertools
 import random
 import string
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator
 
 import dpkt
-from dpkt.pcap import Reader
 from dpkt.utils import inet_to_str, mac_to_str
 
 
@@ -14,6 +16,14 @@ def packet_uuid(
     return "pkt_" + uid
 
 
+def packet_ids(edge_index: int, direction: int) -> Iterator[str]:
+    """Deterministic packet ids: pkt_<edge index>_<direction>_<packet number>.
+
+    Ids are unique within an emulation and stay the same for re-runs of the same capture.
+    """
+    return map(f"pkt_{edge_index}_{direction}_{{}}".format, itertools.count())
+
+
 def is_ipv4_address(dotquad: str) -> bool:
     octets = dotquad.split(".")
     return len(octets) == 4 and all(o.isdigit() and 0 <= int(o) < 256 for o in octets)
@@ -31,331 +41,451 @@ def int_to_ip(ip_int: int | None) -> str:
         return ""
 
 
-def is_dhcp(udp) -> bool:
+class VXLAN(dpkt.Packet):
+    """Virtual eXtensible Local Area Network.
+
+    Attributes:
+        __hdr__: Header fields of VXLAN.
+            flags: (int): 8 bits of flags
+            rsvd0: (int): 8 bits of reserved
+            rsvd1: (int): 16 bits of reserved
+            vnirsvd: (int): 24 bits of Virtual Network Identifier and 8 bits of reserved
+    """
+
+    __hdr__ = (
+        ("flags", "B", 0),  # 8 bits of flags
+        ("rsvd0", "B", 0),  # 8 bits of reserved
+        ("rsvd1", "H", 0),  # 16 bits of reserved
+        (
+            "vnirsvd",
+            "I",
+            0,
+        ),  # 24 bits of Virtual Network Identifier and 8 bits of reserved
+    )
+
+    @property
+    def vni(self):
+        return (self.vnirsvd >> 8) & 0xFFFFFF
+
+    @vni.setter
+    def vni(self, value):
+        self.vnirsvd = (value << 8) & 0xFFFFFF00
+
+
+# Packet classifier registry.
+# Decoder gets an already unpacked layer and returns the packet label
+# or None if the packet must be skipped.
+Decoder = Callable[[Any], str | None]
+
+# Keyed by the class of the Ethernet payload (dpkt unpacks it by ethertype,
+# class is used since ethertype of 802.3 and 802.1Q frames is a length or a TPID).
+ETHERNET_DECODERS: dict[type, Decoder] = {}
+# Keyed by the class of the IP payload (dpkt unpacks it by IP protocol).
+IP_DECODERS: dict[type, Decoder] = {}
+# Keyed by UDP port (destination port is checked first).
+UDP_DECODERS: dict[int, Decoder] = {}
+
+TCP_FLAGS = (
+    (dpkt.tcp.TH_FIN, "FIN"),
+    (dpkt.tcp.TH_SYN, "SYN"),
+    (dpkt.tcp.TH_RST, "RST"),
+    (dpkt.tcp.TH_PUSH, "PUSH"),
+    (dpkt.tcp.TH_ACK, "ACK"),
+    (dpkt.tcp.TH_URG, "URG"),
+)
+
+ICMP_LABELS = {
+    (3, 0): "ICMP destination net unreachable",
+    (3, 1): "ICMP destination host unreachable",
+    (3, 3): "ICMP destination port unreachable",
+}
+
+ICMP_TYPE_LABELS = {
+    8: "ICMP echo-request",
+    0: "ICMP echo-reply",
+    5: "ICMP redirect",
+    3: "ICMP destination unreachable",
+    11: "ICMP time to live exceeded",
+}
+
+DHCP_LABELS = {
+    dpkt.dhcp.DHCPDISCOVER: "DHCP Discover",
+    dpkt.dhcp.DHCPDECLINE: "DHCP Decline",
+    dpkt.dhcp.DHCPACK: "DHCP ACK",
+    dpkt.dhcp.DHCPNAK: "DHCP NAK",
+    dpkt.dhcp.DHCPRELEASE: "DHCP Release",
+    dpkt.dhcp.DHCPINFORM: "DHCP Inform",
+}
+
+
+def register_ethernet_decoder(*layers: type) -> Callable[[Decoder], Decoder]:
+    """Register decoder for Ethernet payloads of the given classes."""
+
+    def wrapper(decoder: Decoder) -> Decoder:
+        for layer in layers:
+            ETHERNET_DECODERS[layer] = decoder
+        return decoder
+
+    return wrapper
+
+
+def register_ip_decoder(*layers: type) -> Callable[[Decoder], Decoder]:
+    """Register decoder for IP payloads of the given classes."""
+
+    def wrapper(decoder: Decoder) -> Decoder:
+        for layer in layers:
+            IP_DECODERS[layer] = decoder
+        return decoder
+
+    return wrapper
+
+
+def register_udp_decoder(*ports: int) -> Callable[[Decoder], Decoder]:
+    """Register decoder for UDP datagrams sent from or to the given ports."""
+
+    def wrapper(decoder: Decoder) -> Decoder:
+        for port in ports:
+            UDP_DECODERS[port] = decoder
+        return decoder
+
+    return wrapper
+
+
+# Ethernet II payloads unpacked without dpkt.ethernet.Ethernet: it costs a third
+# of the frame parsing time, and these frames carry no VLAN tags or MPLS labels.
+FAST_ETHERNET_LAYERS: dict[int, type] = {
+    dpkt.ethernet.ETH_TYPE_IP: dpkt.ip.IP,
+    dpkt.ethernet.ETH_TYPE_ARP: dpkt.arp.ARP,
+}
+
+# Ethertypes without decoders: frames are skipped before unpacking
+SKIPPED_ETHERTYPES = frozenset((dpkt.ethernet.ETH_TYPE_IP6,))
+
+# Destination prefixes of Cisco ISL frames (dpkt.ethernet decapsulates them)
+ISL_PREFIXES = (b"\x01\x00\x0c\x00\x00", b"\x03\x00\x0c\x00\x00")
+
+
+def classify_packet(eth: dpkt.ethernet.Ethernet) -> str | None:
+    """Get label of the Ethernet frame (None - frame isn't shown in animation)."""
+    decoder = ETHERNET_DECODERS.get(type(eth.data))
+
+    return decoder(eth.data) if decoder else None
+
+
+def classify_frame(buf: bytes) -> str | None:
+    """Get label of the raw Ethernet frame, same as classify_packet.
+
+    Untagged IPv4, ARP and BPDU frames (almost all frames of our labs)
+    are unpacked starting from the Ethernet payload.
+    """
+    if len(buf) < 14:
+        return None
+
+    eth_type = int.from_bytes(buf[12:14], "big")
+
+    if eth_type in SKIPPED_ETHERTYPES:
+        return None
+
+    layer_cls = FAST_ETHERNET_LAYERS.get(eth_type)
+
+    if (
+        layer_cls is None
+        and 0 < eth_type <= 1500
+        and not buf.startswith(ISL_PREFIXES)
+        and buf[14:16] != b"\xff\xff"
+    ):
+        # IEEE 802.3 frame with LLC (BPDU), without padding and FCS
+        buf, layer_cls = buf[: 14 + eth_type], dpkt.llc.LLC
+
+    if layer_cls is None:
+        return classify_packet(dpkt.ethernet.Ethernet(buf))
+
+    try:
+        layer = layer_cls(buf[14:])
+    except dpkt.UnpackError:
+        return None
+
+    decoder = ETHERNET_DECODERS.get(layer_cls)
+
+    return decoder(layer) if decoder else None
+
+
+@register_ethernet_decoder(dpkt.arp.ARP)
+def decode_arp(arp) -> str | None:
+    match arp.op:
+        case 1:
+            return f"ARP-request\nWho has {inet_to_str(arp.tpa)}? Tell {inet_to_str(arp.spa)}"
+        case 2:
+            return f"ARP-response\n{inet_to_str(arp.spa)} at {mac_to_str(arp.sha)}"
+        case _:
+            return "ARP packet"
+
+
+@register_ethernet_decoder(dpkt.llc.LLC)
+def decode_llc(llc) -> str | None:
+    if llc.dsap != 0x42:
+        return "LLC"
+
+    # Spanning tree BPDU: protocol version 2 is RSTP
+    if bytes(llc.data)[2] == 0x02:
+        match llc.data.flags & 0x03:
+            case 0:
+                return "RSTP (Unknown)"
+            case 1:
+                return "RSTP (Alternate/Backup)"
+            case 2:
+                return "RSTP (Root)"
+            case _:
+                return "RSTP (Designated)"
+
+    match llc.data.flags:
+        case 0:
+            return "STP (Root)"
+        case 1:
+            return "STP (TC + Root)"
+        case _:
+            return "STP"
+
+
+@register_ethernet_decoder(dpkt.ip.IP)
+def decode_ip(ip) -> str | None:
+    decoder = IP_DECODERS.get(type(ip.data))
+    label = decoder(ip.data) if decoder else "IP packet"
+
+    if label is None:
+        return None
+
+    return f"{label}\n{inet_to_str(ip.src)} > {inet_to_str(ip.dst)}"
+
+
+@register_ip_decoder(dpkt.icmp.ICMP)
+def decode_icmp(icmp) -> str | None:
+    return ICMP_LABELS.get(
+        (icmp.type, icmp.code), ICMP_TYPE_LABELS.get(icmp.type, "ICMP message")
+    )
+
+
+@register_ip_decoder(dpkt.tcp.TCP)
+def decode_tcp(tcp) -> str | None:
+    flags_str = " + ".join(name for flag, name in TCP_FLAGS if flag & tcp.flags)
+
+    return f"TCP ({flags_str}) {tcp.sport} > {tcp.dport}"
+
+
+@register_ip_decoder(dpkt.udp.UDP)
+def decode_udp(udp) -> str | None:
+    decoder = UDP_DECODERS.get(udp.dport) or UDP_DECODERS.get(udp.sport)
+
+    return decoder(udp) if decoder else udp_label(udp)
+
+
+def udp_label(udp) -> str:
+    return f"UDP {udp.sport} > {udp.dport}"
+
+
+@register_ip_decoder(dpkt.ip.IP)
+def decode_ipip(_) -> str | None:
+    return "IPIP tunnel"
+
+
+@register_ip_decoder(dpkt.gre.GRE)
+def decode_gre(_) -> str | None:
+    return "GRE tunnel"
+
+
+@register_ip_decoder(dpkt.igmp.IGMP)
+def decode_igmp(_) -> str | None:
+    # Skip IGMP
+    return None
+
+
+@register_udp_decoder(67, 68)
+def decode_dhcp(udp) -> str | None:
     try:
         dh = dpkt.dhcp.DHCP(udp.data)
-        return dict(dh.opts).get(dpkt.dhcp.DHCP_OPT_MSGTYPE) is not None
     except (dpkt.dpkt.NeedData, dpkt.dpkt.UnpackError):
-        return False
+        return udp_label(udp)
 
+    opts = dict(dh.opts)
+    msg_type = opts.get(dpkt.dhcp.DHCP_OPT_MSGTYPE)
 
-def udp_packet_type(pkt) -> str:
-    if is_dhcp(pkt):
-        dh = dpkt.dhcp.DHCP(pkt.data)
-        opts = dict(dh.opts)
-        msg_type = int.from_bytes(
-            opts.get(dpkt.dhcp.DHCP_OPT_MSGTYPE, b""), byteorder="big"
-        )
-        match msg_type:
-            case dpkt.dhcp.DHCPDISCOVER:
-                return "DHCP Discover"
-            case dpkt.dhcp.DHCPOFFER:
-                ip = dh.yiaddr
-                mask = bin(
-                    int.from_bytes(
-                        opts.get(dpkt.dhcp.DHCP_OPT_NETMASK, b""), byteorder="big"
-                    )
-                ).count("1")
-                return f"DHCP Offer {int_to_ip(ip)}/{mask}"
-            case dpkt.dhcp.DHCPREQUEST:
-                ip = int.from_bytes(
-                    opts.get(dpkt.dhcp.DHCP_OPT_REQ_IP, b""), byteorder="big"
+    if msg_type is None:
+        return udp_label(udp)
+
+    match int.from_bytes(msg_type, byteorder="big"):
+        case dpkt.dhcp.DHCPOFFER:
+            mask = bin(
+                int.from_bytes(
+                    opts.get(dpkt.dhcp.DHCP_OPT_NETMASK, b""), byteorder="big"
                 )
-                return f"DHCP Request {int_to_ip(ip)}"
-            case dpkt.dhcp.DHCPDECLINE:
-                return "DHCP Decline"
-            case dpkt.dhcp.DHCPACK:
-                return "DHCP ACK"
-            case dpkt.dhcp.DHCPNAK:
-                return "DHCP NAK"
-            case dpkt.dhcp.DHCPRELEASE:
-                return "DHCP Release"
-            case dpkt.dhcp.DHCPINFORM:
-                return "DHCP Inform"
-    return "UDP " + str(pkt.sport) + " > " + str(pkt.dport)
-
-
-def ip_packet_type(pkt) -> str:
-    if isinstance(pkt.data, dpkt.icmp.ICMP):
-        icmp = pkt.data
-        match icmp.type, icmp.code:
-            case (8, _):
-                return "ICMP echo-request"
-            case (0, _):
-                return "ICMP echo-reply"
-            case (5, _):
-                return "ICMP redirect"
-            case (3, 0):
-                return "ICMP destination net unreachable"
-            case (3, 1):
-                return "ICMP destination host unreachable"
-            case (3, 3):
-                return "ICMP destination port unreachable"
-            case (3, _):
-                return "ICMP destination unreachable"
-            case (11, _):
-                return "ICMP time to live exceeded"
-            case _:
-                return "ICMP message"
-
-    if isinstance(pkt.data, dpkt.udp.UDP):
-        return udp_packet_type(pkt.data)
-
-    if isinstance(pkt.data, dpkt.tcp.TCP):
-        tcp = pkt.data
-        d = {
-            dpkt.tcp.TH_FIN: "FIN",
-            dpkt.tcp.TH_SYN: "SYN",
-            dpkt.tcp.TH_RST: "RST",
-            dpkt.tcp.TH_PUSH: "PUSH",
-            dpkt.tcp.TH_ACK: "ACK",
-            dpkt.tcp.TH_URG: "URG",
-        }
+            ).count("1")
+            return f"DHCP Offer {int_to_ip(dh.yiaddr)}/{mask}"
+        case dpkt.dhcp.DHCPREQUEST:
+            ip = int.from_bytes(
+                opts.get(dpkt.dhcp.DHCP_OPT_REQ_IP, b""), byteorder="big"
+            )
+            return f"DHCP Request {int_to_ip(ip)}"
+        case code:
+            return DHCP_LABELS.get(code, udp_label(udp))
 
-        active_flags = filter(lambda t: t[0] & tcp.flags, d.items())
-        flags_str = " + ".join(t[1] for t in active_flags)
 
-        return "TCP (" + str(flags_str) + ") " + str(tcp.sport) + " > " + str(tcp.dport)
+@register_udp_decoder(4789)
+def decode_vxlan(udp) -> str | None:
+    # VXLAN encapsulates packets inside UDP. Check inside UDP packets to skip IPv6 and IGMP
+    inner_eth = dpkt.ethernet.Ethernet(VXLAN(udp.data).data)
 
-    # If it's IPIP tunnel ?
-    if isinstance(pkt.data, dpkt.ip.IP):
-        return "IPIP tunnel"
+    if isinstance(inner_eth.data, dpkt.ip6.IP6):
+        return None
 
-    if isinstance(pkt.data, dpkt.gre.GRE):
-        return "GRE tunnel"
+    if isinstance(inner_eth.data, dpkt.ip.IP) and isinstance(
+        inner_eth.data.data, dpkt.igmp.IGMP
+    ):
+        return None
 
-    return "IP packet"
+    return udp_label(udp)
 
 
-def arp_packet_type(pkt) -> str:
-    if isinstance(pkt.data, dpkt.arp.ARP):
-        arp = pkt.data
-        match arp.op:
-            case 1:
-                return (
-                    "ARP-request\nWho has "
-                    + inet_to_str(arp.tpa)
-                    + "? Tell "
-                    + inet_to_str(arp.spa)
-                )
-            case 2:
-                return (
-                    "ARP-response\n"
-                    + inet_to_str(arp.spa)
-                    + " at "
-                    + mac_to_str(arp.sha)
-                )
-            case _:
-                return "ARP packet"
+def iter_capture(file: str) -> Iterator[tuple[float, bytes]]:
+    """Read records of the pcap (or pcapng) capture file one by one.
+
+    Only the current record is kept in memory, the file is closed
+    when all records are read.
+
+    Args:
+        file (str): Path to pcap (or pcapng) file.
+
+    Yields:
+        tuple: (timestamp, frame) record.
+    """
+    with open(file, "rb") as f:
+        reader = None
+
+        for reader_cls in (dpkt.pcap.Reader, dpkt.pcapng.Reader):
+            try:
+                f.seek(0)
+                reader = reader_cls(f)
+                break
+            except (ValueError, dpkt.dpkt.NeedData, dpkt.dpkt.UnpackError):
+                continue
+
+        if reader is None:
+            return
 
-    return "Unknown IP packet"
+        try:
+            yield from reader
+        except (dpkt.dpkt.NeedData, dpkt.dpkt.UnpackError):
+            # Capture may be cut off if mimidump was stopped in the middle of write
+            pass
 
 
 def create_pkt_animation(
-    file1: str,
-    file2: str,
+    records1: Iterable[tuple[float, bytes]],
+    records2: Iterable[tuple[float, bytes]],
     edge_id: str,
     e_source: str,
     e_target: str,
     loss_percentage: int = 0,
     duplicate_percentage: int = 0,
-):
-    if not os.path.exists(file1) or not os.path.exists(file2):
-        return None
-
-    with open(file1, "rb") as f1, open(file2, "rb") as f2:
-        pcap1 = dpkt.pcap.Reader(f1)
-        pcap2 = dpkt.pcap.Reader(f2)
-        pkts = packet_parser(
-            pcap1, edge_id, e_source, e_target, loss_percentage, duplicate_percentage
-        )
-        pkts2 = packet_parser(
-            pcap2, edge_id, e_target, e_source, loss_percentage, duplicate_percentage
-        )
+    edge_index: int | None = None,
+) -> Iterator[dict]:
+    """Lazily parse packets of both edge directions ordered by time."""
+    # Without edge index packets get random ids
+    ids1 = packet_ids(edge_index, 0) if edge_index is not None else None
+    ids2 = packet_ids(edge_index, 1) if edge_index is not None else None
+
+    pkts = iter_packets(
+        records1,
+        edge_id,
+        e_source,
+        e_target,
+        loss_percentage,
+        duplicate_percentage,
+        ids1,
+    )
+    pkts2 = iter_packets(
+        records2,
+        edge_id,
+        e_target,
+        e_source,
+        loss_percentage,
+        duplicate_percentage,
+        ids2,
+    )
 
-    return pkts + pkts2
+    # Both directions are ordered by time, keep the result ordered as well
+    return heapq.merge(pkts, pkts2, key=itemgetter("timestamp"))
 
 
 def packet_parser(
-    pcap1: Reader,
+    pcap1: Iterable[tuple[float, bytes]],
+    edge_id: str,
+    e_source: str,
+    e_target: str,
+    loss_percentage: int,
+    duplicate_percentage: int,
+    ids: Iterator[str] | None = None,
+) -> list[dict]:
+    return list(
+        iter_packets(
+            pcap1,
+            edge_id,
+            e_source,
+            e_target,
+            loss_percentage,
+            duplicate_percentage,
+            ids,
+        )
+    )
+
+
+def iter_packets(
+    pcap1: Iterable[tuple[float, bytes]],
     edge_id: str,
     e_source: str,
     e_target: str,
     loss_percentage: int,
     duplicate_percentage: int,
-):
-    pkts = []
+    ids: Iterator[str] | None = None,
+) -> Iterator[dict]:
+    """Generate animation packets of the capture one by one."""
 
     # For each packet in the pcap1 process the contents
     for timestamp, buf in pcap1:
         # Unpack the Ethernet frame (mac flask/dst, ethertype)
         try:
-            eth = dpkt.ethernet.Ethernet(buf)
+            label = classify_frame(buf)
         except dpkt.NeedData:
             continue
 
-        # ARP
-        if isinstance(eth.data, dpkt.arp.ARP):
-            ts = str(timestamp)
-            ts = ts.replace(".", "").ljust(16, "0")
-
-            pkt_type = arp_packet_type(eth)
-            pkts.append(
-                {
-                    "data": {"id": packet_uuid(), "label": pkt_type, "type": "packet"},
-                    "config": {
-                        "type": pkt_type,
-                        "path": edge_id,
-                        "source": e_source,
-                        "target": e_target,
-                        "loss_percentage": loss_percentage,
-                        "duplicate_percentage": duplicate_percentage,
-                    },
-                    "timestamp": ts,
-                }
-            )
-
-            continue
-
-        if isinstance(eth.data, dpkt.llc.LLC):
-            llc = eth.data
-
-            ts = str(timestamp)
-            ts = ts.replace(".", "").ljust(16, "0")
-
-            llc_label = "LLC"
-
-            if llc.dsap == 0x42:
-                data = bytes(llc.data)
-                version = data[2]
-                if version == 0x02:
-                    llc_label = "RSTP"
-
-                    match llc.data.flags & 0x03:
-                        case 0:
-                            llc_label = "RSTP (Unknown)"
-                        case 1:
-                            llc_label = "RSTP (Alternate/Backup)"
-                        case 2:
-                            llc_label = "RSTP (Root)"
-                        case 3:
-                            llc_label = "RSTP (Designated)"
-                        case _:
-                            llc_label = "RSTP (Reserved)"
-                else:
-                    llc_label = "STP"
-
-                    match llc.data.flags:
-                        case 0:
-                            llc_label = "STP (Root)"
-                        case 1:
-                            llc_label = "STP (TC + Root)"
-                        case _:
-                            llc_label = "STP"
-
-            pkts.append(
-                {
-                    "data": {"id": packet_uuid(), "label": llc_label, "type": "packet"},
-                    "config": {
-                        "type": llc_label,
-                        "path": edge_id,
-                        "source": e_source,
-                        "target": e_target,
-                        "loss_percentage": loss_percentage,
-                        "duplicate_percentage": duplicate_percentage,
-                    },
-                    "timestamp": ts,
-                }
-            )
-
-        # Skip IPv6
-        if isinstance(eth.data, dpkt.ip6.IP6):
+        if label is None:
             continue
 
-        # IP?
-        if isinstance(eth.data, dpkt.ip.IP):
-            ip = eth.data
-
-            # Skip IGMP
-            if isinstance(ip.data, dpkt.igmp.IGMP):
-                continue
-
-            # VXLAN encapsulates packets inside UDP. Check inside UDP packets to skip IPv6 and IGMP
-            if isinstance(ip.data, dpkt.udp.UDP):
-                udp = ip.data
-                if udp.dport == 4789:
-                    vxlan = VXLAN(udp.data)
-                    # Unpack the Ethernet frame
-                    inner_eth = dpkt.ethernet.Ethernet(vxlan.data)
-                    if isinstance(inner_eth.data, dpkt.ip6.IP6):
-                        continue
-                    if isinstance(inner_eth.data, dpkt.ip.IP):
-                        inner_ip = inner_eth.data
-                        if isinstance(inner_ip.data, dpkt.igmp.IGMP):
-                            continue
-
-            ts = str(timestamp)
-            ts = ts.replace(".", "").ljust(16, "0")
-
-            pkt_type = ip_packet_type(ip)
-            pkt_type = (
-                pkt_type + "\n" + inet_to_str(ip.src) + " > " + inet_to_str(ip.dst)
-            )
-
-            pkts.append(
-                {
-                    "data": {"id": packet_uuid(), "label": pkt_type, "type": "packet"},
-                    "config": {
-                        "type": pkt_type,
-                        "path": edge_id,
-                        "source": e_source,
-                        "target": e_target,
-                        "loss_percentage": loss_percentage,
-                        "duplicate_percentage": duplicate_percentage,
-                    },
-                    "timestamp": ts,
-                }
-            )
-
-    return pkts
+        yield {
+            "data": {
+                "id": next(ids) if ids is not None else packet_uuid(),
+                "label": label,
+                "type": "packet",
+            },
+            "config": {
+                "type": label,
+                "path": edge_id,
+                "source": e_source,
+                "target": e_target,
+                "loss_percentage": loss_percentage,
+                "duplicate_percentage": duplicate_percentage,
+            },
+            # Integer microseconds
+            "timestamp": round(timestamp * 1000000),
+        }
 
 
 if __name__ == "__main__":
-    create_pkt_animation(
-        "/tmp/capture_l2sw1_2.pcapng",
-        "/tmp/capture_l2sw2_1.pcapng",
-        "edge_123",
-        "host1",
-        "sw1",
-    )
-
-
-class VXLAN(dpkt.Packet):
-    """Virtual eXtensible Local Area Network.
-
-    Attributes:
-        __hdr__: Header fields of VXLAN.
-            flags: (int): 8 bits of flags
-            rsvd0: (int): 8 bits of reserved
-            rsvd1: (int): 16 bits of reserved
-            vnirsvd: (int): 24 bits of Virtual Network Identifier and 8 bits of reserved
-    """
-
-    __hdr__ = (
-        ("flags", "B", 0),  # 8 bits of flags
-        ("rsvd0", "B", 0),  # 8 bits of reserved
-        ("rsvd1", "H", 0),  # 16 bits of reserved
-        (
-            "vnirsvd",
-            "I",
-            0,
-        ),  # 24 bits of Virtual Network Identifier and 8 bits of reserved
+    packets = list(
+        create_pkt_animation(
+            iter_capture("/tmp/capture_l2sw1_2.pcapng"),
+            iter_capture("/tmp/capture_l2sw2_1.pcapng"),
+            "edge_123",
+            "host1",
+            "sw1",
+        )
     )
-
-    @property
-    def vni(self):
-        return (self.vnirsvd >> 8) & 0xFFFFFF
-
-    @vni.setter
-    def vni(self, value):
-        self.vnirsvd = (value << 8) & 0xFFFFFF00
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from mininet.log import info
+
+from network_pool import topology_key
+from network_schema import Network
+
+# Result of the emulation: animation JSON and pcap files
+Result = tuple[str, list[tuple[bytes, str]]]
+
+# Job fields that affect the emulation (id and level are generated by the editor)
+JOB_KEY_FIELDS = ("job_id", "host_id", "arg_1", "arg_2", "arg_3", "arg_4", "arg_5")
+
+
+def network_key(network: Network, animation_format: str | None = None) -> str:
+    """Canonical hash of the network schema and animation format.
+
+    Cosmetic fields (node positions and labels, zoom and pan of the view,
+    random job ids and printable commands) don't change the emulation
+    and are excluded. The order of jobs is kept: it is the order of execution.
+    """
+    jobs = [[getattr(job, field) for field in JOB_KEY_FIELDS] for job in network.jobs]
+
+    canonical = json.dumps(
+        {
+            "topology": topology_key(network),
+            "jobs": jobs,
+            "animation_format": animation_format,
+        },
+        sort_keys=True,
+    )
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_cacheable(network: Network) -> bool:
+    """Packet loss and duplication are random, such emulations aren't cached."""
+    return not any(
+        edge.data.loss_percentage or edge.data.duplicate_percentage
+        for edge in network.edges
+    )
+
+
+def result_size(result: Result) -> int:
+    animation, pcaps = result
+    return len(animation) + sum(len(pcap) for pcap, _ in pcaps)
+
+
+class ResultCache:
+    """LRU cache of emulation results limited by total size (in bytes)."""
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes = max_bytes
+        self.__size = 0
+        self.__results: OrderedDict[str, Result] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.__max_bytes > 0
+
+    def get(self, key: str) -> Result | None:
+        result = self.__results.get(key)
+
+        if result is None:
+            return None
+
+        self.__results.move_to_end(key)
+        info(f"[result_cache] hit {key[:12]}\n")
+
+        return result
+
+    def put(self, key: str, result: Result) -> None:
+        size = result_size(result)
+
+        if not self.enabled or size > self.__max_bytes:
+            return
+
+        if key in self.__results:
+            self.__size -= result_size(self.__results.pop(key))
+
+        self.__results[key] = result
+        self.__size += size
+
+        # Evict least recently used results
+        while self.__size > self.__max_bytes:
+            _, evicted = self.__results.popitem(last=False)
+            self.__size -= result_size(evicted)
+
+
+RESULT_CACHE = ResultCache(
+    max_bytes=int(os.getenv("result_cache_mb", "256")) * 1024 * 1024
+)
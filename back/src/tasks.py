@@ -1,6 +1,7 @@
 import json
 import os
 import signal
+import time
 
 import marshmallow_dataclass
 from celery_app import (
@@ -10,15 +11,36 @@ from celery_app import (
 )
 from mininet.log import setLogLevel, error
 
-from network_schema import Network
-from emulator import emulate
+from network_schema import Network, NetworkSchemaError
+from emulator import emulate, read_pcaps
+from network_pool import NETWORK_POOL
+from animation_format import COMPACT_FORMAT, encode_compact, encode_legacy
+from artifact_store import store_pcaps
+from result_cache import RESULT_CACHE, is_cacheable, network_key
 
+MAX_ATTEMPTS = 4
 
-def run_miminet(network_json: str):
+# Delay before the next attempt: RETRY_BACKOFF * 2^(attempt - 1) seconds
+RETRY_BACKOFF = 1.0
+
+# How many times a task is sent again after its worker died while emulating
+# (killed container, lost broker connection). The counter travels with the
+# republished message, so it is shared by all workers of the queue.
+MAX_REDELIVERIES = int(os.getenv("max_redeliveries", "2"))
+
+
+def run_miminet(
+    network_json: str, animation_format: str | None = None, use_cache: bool = True
+):
     """Load network from JSON and start emulation safely.
 
+    Results of identical networks are taken from the result cache.
+
     Args:
         network_json (str): JSON network from queue.
+        animation_format (str | None): "compact" to encode animation with
+            encode_compact, legacy list of packet groups otherwise.
+        use_cache (bool): False to bypass the result cache.
 
     Returns:
         tuple: Tuple (json emulation results, List[pcap, pcap name]).
@@ -35,17 +57,63 @@ def run_miminet(network_json: str):
     network_schema = marshmallow_dataclass.class_schema(Network)()
     network_json = network_schema.load(jnet, unknown="include")
 
-    for _ in range(4):
-        try:
-            animation, pcaps = emulate(network_json)
+    cache_key = None
+
+    if use_cache and RESULT_CACHE.enabled and is_cacheable(network_json):
+        cache_key = network_key(network_json, animation_format)
+        cached = RESULT_CACHE.get(cache_key)
 
-            return json.dumps(animation), pcaps
+        if cached is not None:
+            return cached
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        start = time.monotonic()
+
+        try:
+            animation, pcap_files = emulate(network_json)
+
+            if animation_format == COMPACT_FORMAT:
+                animation_json = json.dumps(
+                    encode_compact(animation), separators=(",", ":")
+                )
+            else:
+                animation_json = encode_legacy(animation)
+
+            # Captures are loaded after the animation is encoded from them
+            pcaps = read_pcaps(pcap_files)
+        except NetworkSchemaError as e:
+            # Error in the network itself, the next attempt will fail the same way
+            error(
+                "[run_miminet] attempt %d/%d: network error in %.2fs, no retry: %s\n"
+                % (attempt, MAX_ATTEMPTS, time.monotonic() - start, e)
+            )
+            break
         except Exception as e:
             # Sometimes mininet doesn't work correctly and simulation needs to be redone,
             # Example of mininet error: https://github.com/mininet/mininet/issues/737.
-            error(e)
+            error(
+                "[run_miminet] attempt %d/%d failed in %.2fs: %s\n"
+                % (attempt, MAX_ATTEMPTS, time.monotonic() - start, e)
+            )
+
+            # Don't reuse the network that has failed
+            NETWORK_POOL.discard()
+
+            if attempt < MAX_ATTEMPTS:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
             continue
 
+        error(
+            "[run_miminet] attempt %d/%d succeeded in %.2fs\n"
+            % (attempt, MAX_ATTEMPTS, time.monotonic() - start)
+        )
+
+        if cache_key is not None:
+            RESULT_CACHE.put(cache_key, (animation_json, pcaps))
+
+        return animation_json, pcaps
+
     return "[]", []
 
 
@@ -61,7 +129,44 @@ def mininet_worker(self, network_json: str):
 
     """
 
-    animation, pcaps = run_miminet(network_json)
+    headers = self.request.headers or {}
+    delivery_info = self.request.delivery_info or {}
+
+    if delivery_info.get("redelivered") and self.request.retries < MAX_REDELIVERIES:
+        # Unacknowledged task is redelivered only if its worker died while
+        # emulating (warm shutdown finishes running tasks). The emulation is
+        # repeated by the republished task with the increased retries counter.
+        error(
+            "[mininet_worker] task is redelivered, sending it again (%d/%d)\n"
+            % (self.request.retries + 1, MAX_REDELIVERIES)
+        )
+        raise self.retry(countdown=0, max_retries=MAX_REDELIVERIES)
+
+    if delivery_info.get("redelivered"):
+        # The network killed workers MAX_REDELIVERIES times, report the failure
+        error("[mininet_worker] task is redelivered too many times, skipped\n")
+        animation, pcaps = "[]", []
+    else:
+        try:
+            # Task that starts emulation proccess may ask for compact animation format
+            # or bypass the result cache (e.g. for nondeterministic jobs)
+            animation, pcaps = run_miminet(
+                network_json,
+                headers.get("animation_format"),
+                headers.get("result_cache", True),
+            )
+
+            # Exam checks don't need pcaps, otherwise with shared artifact store
+            # messages carry only hashes of pcaps
+            if headers.get("send_pcaps", True):
+                pcaps = store_pcaps(pcaps)
+            else:
+                pcaps = []
+        except Exception as e:
+            # Malformed network or broken artifact store: the result is still sent,
+            # otherwise the front waits for it forever
+            error(f"[mininet_worker] emulation failed: {e}\n")
+            animation, pcaps = "[]", []
 
     # Task that starts emulation proccess may specify where we should send the result
 
@@ -71,10 +176,7 @@ def mininet_worker(self, network_json: str):
 
         app.send_task(
             network_task,
-            (
-                animation,
-                pcaps,
-            ),
+            (animation, pcaps),
             routing_key=SEND_NETWORK_RESPONSE_ROUTING_KEY,
             exchange=SEND_NETWORK_RESPONSE_EXCHANGE.name,
             exchange_type=SEND_NETWORK_RESPONSE_EXCHANGE.type,
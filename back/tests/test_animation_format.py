@@ -0,0 +1,133 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from src.animation_format import COMPACT_FORMAT, encode_compact, encode_legacy
+from src.pkt_parser import packet_ids
+
+TEST_JSON_DIR = Path("test_json/")
+ANIMATION_JS = Path("../../front/src/static/miminet_animation.js")
+
+# Run DecodeAnimation from miminet_animation.js on compact animation from stdin.
+# uid() is defined by the page scripts, the decoder itself does not use it.
+DECODE_SCRIPT = """
+const fs = require("fs");
+const vm = require("vm");
+const context = {uid: () => "", console: console};
+vm.createContext(context);
+vm.runInContext(
+    fs.readFileSync(process.argv[1], "utf8") + ";this.decode = DecodeAnimation;",
+    context,
+);
+const animation = JSON.parse(fs.readFileSync(0, "utf8"));
+process.stdout.write(JSON.stringify(context.decode(animation)));
+"""
+
+
+# ---------------- Utility functions ---------------- #
+
+
+def load_animation(filename: str) -> list[list[dict]]:
+    """Load answer animation in the form produced by pkt_parser.
+
+    Answers have no timestamps and packet ids, so packets get synthetic
+    timestamps and deterministic ids (pkt_<edge index>_<direction>_<number>).
+    """
+    animation = json.loads((TEST_JSON_DIR / filename).read_text())
+    timestamp = 1683282739671808
+    edges: dict[str, int] = {}
+    ids: dict[tuple[str, str], Iterator[str]] = {}
+
+    for group in animation:
+        timestamp += 15079
+
+        for pkt in group:
+            config = pkt["config"]
+            direction = (config["path"], config["source"])
+
+            if direction not in ids:
+                edge_index = edges.setdefault(config["path"], len(edges))
+                ids[direction] = packet_ids(
+                    edge_index, sum(path == config["path"] for path, _ in ids)
+                )
+
+            pkt["data"]["id"] = next(ids[direction])
+            pkt["timestamp"] = timestamp
+            config.setdefault("loss_percentage", 0)
+            config.setdefault("duplicate_percentage", 0)
+
+    return animation
+
+
+def decode_with_js(compact: dict) -> list[list[dict]]:
+    result = subprocess.run(
+        ["node", "-e", DECODE_SCRIPT, str(ANIMATION_JS)],
+        input=json.dumps(compact),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+ANSWER_FILES = sorted(f.name for f in TEST_JSON_DIR.glob("*_answer.json"))
+
+
+# ---------------- Test cases ---------------- #
+
+
+def test_encode_compact_interns_edges_and_labels():
+    animation = load_animation(ANSWER_FILES[0])
+    compact = encode_compact(animation)
+
+    assert compact["format"] == COMPACT_FORMAT
+    assert len(compact["edges"]) == len(set(map(tuple, compact["edges"])))
+    assert len(compact["labels"]) == len(set(compact["labels"]))
+    assert [len(frame) for frame in compact["frames"]] == [
+        len(group) for group in animation
+    ]
+
+
+def test_encode_compact_empty_animation():
+    compact = encode_compact([])
+
+    assert compact["start"] == 0
+    assert compact["frames"] == []
+    assert encode_legacy([]) == "[]"
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize("answer_file", ANSWER_FILES)
+def test_compact_round_trip_through_js_decoder(answer_file: str):
+    animation = load_animation(answer_file)
+
+    decoded = decode_with_js(encode_compact(animation))
+
+    assert decoded == animation
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_compact_round_trip_keeps_random_ids():
+    # Packets of edges without index get random ids (pkt_parser.packet_uuid)
+    animation = load_animation(ANSWER_FILES[0])
+    animation[0][0]["data"]["id"] = "pkt_G09AFC4L"
+
+    decoded = decode_with_js(encode_compact(animation))
+
+    assert decoded == animation
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_js_decoder_numbers_packets_of_version_1():
+    compact = encode_compact(load_animation(ANSWER_FILES[0]))
+    compact["version"] = 1
+    compact["edges"] = [edge[:5] for edge in compact["edges"]]
+    compact["frames"] = [[row[:3] for row in frame] for frame in compact["frames"]]
+
+    decoded = decode_with_js(compact)
+
+    ids = [pkt["data"]["id"] for group in decoded for pkt in group]
+    assert ids == [f"pkt_{i}" for i in range(1, len(ids) + 1)]
@@ -0,0 +1,26 @@
+import hashlib
+import os
+
+import pytest
+from src import artifact_store
+from src.artifact_store import store_artifact
+
+
+def test_store_artifact_by_content_hash(tmp_path):
+    artifact = store_artifact(b"capture", str(tmp_path))
+
+    digest = hashlib.sha256(b"capture").hexdigest()
+    assert artifact == {"sha256": digest, "size": 7}
+    assert os.listdir(tmp_path) == [digest + ".pcap"]
+
+
+def test_store_artifact_removes_temp_file_on_failure(tmp_path, monkeypatch):
+    def replace(src, dst):
+        raise OSError("disk is full")
+
+    monkeypatch.setattr(artifact_store.os, "replace", replace)
+
+    with pytest.raises(OSError):
+        store_artifact(b"capture", str(tmp_path))
+
+    assert os.listdir(tmp_path) == []
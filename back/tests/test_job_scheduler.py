@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+from src.job_scheduler import build_stages, execute_jobs, order_jobs
+from src.network_schema import Job
+
+# ---------------- Utility functions ---------------- #
+
+
+def make_job(name: str, job_id: int, host_id: str) -> Job:
+    return Job(id=name, level=0, job_id=job_id, host_id=host_id, print_cmd=name)
+
+
+def stage_names(stages: list[list[list[Job]]]) -> list[list[list[str]]]:
+    return [[[job.id for job in chain] for chain in stage] for stage in stages]
+
+
+# ---------------- Test cases ---------------- #
+
+
+def test_order_jobs_by_priority_keeping_user_order():
+    jobs = [
+        make_job("ping", 1, "host_1"),
+        make_job("ip_addr", 102, "host_1"),
+        make_job("tcp", 3, "host_2"),
+        make_job("dhcp_server", 203, "server_1"),
+        make_job("route", 104, "host_2"),
+    ]
+
+    assert [job.id for job in order_jobs(jobs)] == [
+        "dhcp_server",
+        "ip_addr",
+        "route",
+        "ping",
+        "tcp",
+    ]
+
+
+def test_jobs_of_different_hosts_share_stage():
+    jobs = [
+        make_job("ping_1", 1, "host_1"),
+        make_job("ping_2", 1, "host_2"),
+        make_job("ping_3", 1, "host_1"),
+    ]
+
+    assert stage_names(build_stages(jobs)) == [[["ping_1", "ping_3"], ["ping_2"]]]
+
+
+def test_new_stage_on_priority_change():
+    jobs = order_jobs(
+        [
+            make_job("ping", 1, "host_1"),
+            make_job("ip_addr", 102, "host_2"),
+        ]
+    )
+
+    assert stage_names(build_stages(jobs)) == [[["ip_addr"]], [["ping"]]]
+
+
+@pytest.mark.parametrize(
+    "barrier_id",
+    [6, 7, 108, 203],
+    ids=["link_down", "sleep", "dhcp_client", "dhcp_server"],
+)
+def test_barrier_job_runs_alone(barrier_id: int):
+    priority = barrier_id // 100 * 100
+    jobs = [
+        make_job("before", priority + 1, "host_1"),
+        make_job("barrier", barrier_id, "host_2"),
+        make_job("after", priority + 1, "host_3"),
+    ]
+
+    assert stage_names(build_stages(jobs)) == [
+        [["before"]],
+        [["barrier"]],
+        [["after"]],
+    ]
+
+
+def test_dhcp_clients_of_different_hosts_run_sequentially():
+    jobs = [
+        make_job("dhcp_1", 108, "host_1"),
+        make_job("dhcp_2", 108, "host_2"),
+    ]
+
+    assert stage_names(build_stages(jobs)) == [[["dhcp_1"]], [["dhcp_2"]]]
+
+
+def test_execute_jobs_keeps_order_of_host_jobs():
+    jobs = [make_job(f"job_{i}", 1, f"host_{i % 3}") for i in range(12)]
+    executed: list[str] = []
+    lock = threading.Lock()
+
+    def execute(job: Job) -> None:
+        with lock:
+            executed.append(job.id)
+
+    execute_jobs(jobs, execute, max_workers=4)
+
+    assert sorted(executed) == sorted(job.id for job in jobs)
+
+    for host in ("host_0", "host_1", "host_2"):
+        host_jobs = [job.id for job in jobs if job.host_id == host]
+        assert [name for name in executed if name in host_jobs] == host_jobs
+
+
+def test_execute_jobs_finishes_stage_before_raising():
+    jobs = [
+        make_job("failing", 1, "host_1"),
+        make_job("other", 1, "host_2"),
+    ]
+    executed: list[str] = []
+
+    def execute(job: Job) -> None:
+        if job.id == "failing":
+            raise RuntimeError("job failed")
+        executed.append(job.id)
+
+    with pytest.raises(RuntimeError):
+        execute_jobs(jobs, execute, max_workers=2)
+
+    assert executed == ["other"]
@@ -7,6 +7,10 @@ from pathlib import Path
 
 from mininet.log import setLogLevel, info, error
 import pytest
+import emulator
+import network_pool
+from network_pool import NetworkPool
+from src import tasks
 from src.tasks import run_miminet
 
 setLogLevel("info")
@@ -156,3 +160,32 @@ def test_miminet_work(test: Case, request) -> None:
         raise e
 
     info(f"Finish test {request.node.name}.")
+
+
+def test_reset_network_captures_like_cold_one(monkeypatch) -> None:
+    """Warm network after reset() gives the same packets as a fresh one."""
+    cleanup_pcap_files()
+
+    pool = NetworkPool(enabled=True)
+    monkeypatch.setattr(emulator, "NETWORK_POOL", pool)
+    monkeypatch.setattr(tasks, "NETWORK_POOL", pool)
+
+    starts = []
+    start = network_pool.MiminetNetwork.start
+    monkeypatch.setattr(
+        network_pool.MiminetNetwork,
+        "start",
+        lambda net: starts.append(net) or start(net),
+    )
+
+    network_json = (TEST_JSON_DIR / "switch_and_hub_network.json").read_text()
+
+    try:
+        cold, _ = run_miminet(network_json, use_cache=False)
+        warm, _ = run_miminet(network_json, use_cache=False)
+    finally:
+        pool.discard()
+
+    # The second emulation reused the network
+    assert len(starts) == 1
+    assert extract_important_fields(warm) == extract_important_fields(cold)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from src import tasks
+
+
+class Retry(Exception):
+    pass
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """mininet_worker with stubbed emulation and task retry."""
+    calls = []
+
+    def retry(**options):
+        calls.append(("retry", options))
+        return Retry()
+
+    def run_miminet(network_json, *args):
+        calls.append(("emulate", network_json))
+        return "animation", []
+
+    monkeypatch.setattr(tasks, "run_miminet", run_miminet)
+    monkeypatch.setattr(tasks, "store_pcaps", lambda pcaps: pcaps)
+    monkeypatch.setattr(tasks.mininet_worker, "retry", retry)
+
+    def run(redelivered: bool, retries: int = 0):
+        tasks.mininet_worker.push_request(
+            delivery_info={"redelivered": redelivered}, retries=retries
+        )
+        try:
+            return tasks.mininet_worker.run("{}")
+        finally:
+            tasks.mininet_worker.pop_request()
+
+    run.calls = calls
+    return run
+
+
+def test_task_is_emulated(worker):
+    assert worker(redelivered=False) == (json.dumps("animation"), [])
+    assert worker.calls == [("emulate", "{}")]
+
+
+def test_redelivered_task_is_sent_again(worker):
+    with pytest.raises(Retry):
+        worker(redelivered=True, retries=tasks.MAX_REDELIVERIES - 1)
+
+    assert worker.calls == [
+        ("retry", {"countdown": 0, "max_retries": tasks.MAX_REDELIVERIES})
+    ]
+
+
+def test_task_redelivered_too_many_times_is_skipped(worker):
+    assert worker(redelivered=True, retries=tasks.MAX_REDELIVERIES) == (
+        json.dumps("[]"),
+        [],
+    )
+    assert worker.calls == []
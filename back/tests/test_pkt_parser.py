@@ -0,0 +1,133 @@
+import socket
+
+import dpkt
+import pytest
+from src.pkt_parser import classify_frame, classify_packet, iter_capture
+
+MAC_SRC = b"\x02\x00\x00\x00\x00\x01"
+MAC_DST = b"\x02\x00\x00\x00\x00\x02"
+STP_MULTICAST = b"\x01\x80\xc2\x00\x00\x00"
+
+
+# ---------------- Utility functions ---------------- #
+
+
+def ethernet(data, eth_type: int = dpkt.ethernet.ETH_TYPE_IP, **kwargs) -> bytes:
+    return bytes(
+        dpkt.ethernet.Ethernet(
+            src=MAC_SRC, dst=MAC_DST, type=eth_type, data=data, **kwargs
+        )
+    )
+
+
+def udp_frame(sport: int, dport: int, payload: bytes) -> bytes:
+    udp = dpkt.udp.UDP(sport=sport, dport=dport, data=payload)
+    udp.ulen = len(bytes(udp))
+    ip = dpkt.ip.IP(
+        src=socket.inet_aton("10.0.0.1"),
+        dst=socket.inet_aton("10.0.0.2"),
+        p=dpkt.ip.IP_PROTO_UDP,
+        data=udp,
+    )
+    ip.len += len(bytes(udp))
+
+    return ethernet(ip)
+
+
+def dhcp_discover() -> bytes:
+    return bytes(
+        dpkt.dhcp.DHCP(
+            opts=((dpkt.dhcp.DHCP_OPT_MSGTYPE, bytes((dpkt.dhcp.DHCPDISCOVER,))),)
+        )
+    )
+
+
+def bpdu_frame() -> bytes:
+    """RSTP BPDU padded to the minimal frame size."""
+    llc = b"\x42\x42\x03" + bytes((0, 0, 2, 0, 3)) + bytes(31)
+    frame = STP_MULTICAST + MAC_SRC + len(llc).to_bytes(2, "big") + llc
+
+    return frame + bytes(60 - len(frame))
+
+
+def vlan_frame() -> bytes:
+    """ICMP echo request with 802.1Q tag."""
+    icmp = dpkt.icmp.ICMP(type=8, data=dpkt.icmp.ICMP.Echo(data=bytes(8)))
+    ip = dpkt.ip.IP(
+        src=socket.inet_aton("10.0.0.1"),
+        dst=socket.inet_aton("10.0.0.2"),
+        p=dpkt.ip.IP_PROTO_ICMP,
+        data=icmp,
+    )
+    ip.len += len(bytes(icmp))
+    tag = bytes(dpkt.ethernet.VLANtag8021Q(id=10, type=dpkt.ethernet.ETH_TYPE_IP))
+
+    return MAC_DST + MAC_SRC + b"\x81\x00" + tag + bytes(ip)
+
+
+# ---------------- Test cases ---------------- #
+
+
+@pytest.mark.parametrize("sport, dport", [(68, 67), (67, 68)])
+def test_dhcp_on_dhcp_ports(sport: int, dport: int):
+    assert classify_frame(udp_frame(sport, dport, dhcp_discover())) == (
+        "DHCP Discover\n10.0.0.1 > 10.0.0.2"
+    )
+
+
+def test_dhcp_payload_on_other_ports_is_udp():
+    # DHCP is recognised on ports 67/68 only
+    assert classify_frame(udp_frame(5000, 6000, dhcp_discover())) == (
+        "UDP 5000 > 6000\n10.0.0.1 > 10.0.0.2"
+    )
+
+
+@pytest.mark.parametrize(
+    "frame",
+    [
+        udp_frame(68, 67, dhcp_discover()),
+        ethernet(
+            dpkt.arp.ARP(
+                op=1,
+                sha=MAC_SRC,
+                spa=socket.inet_aton("10.0.0.1"),
+                tpa=socket.inet_aton("10.0.0.2"),
+            ),
+            dpkt.ethernet.ETH_TYPE_ARP,
+        ),
+        bpdu_frame(),
+        vlan_frame(),
+        ethernet(dpkt.ip6.IP6(nxt=58), dpkt.ethernet.ETH_TYPE_IP6),
+        ethernet(b"\x00" * 4),
+    ],
+    ids=["dhcp", "arp", "bpdu", "vlan", "ipv6", "broken_ip"],
+)
+def test_classify_frame_same_as_ethernet_unpacking(frame: bytes):
+    assert classify_frame(frame) == classify_packet(dpkt.ethernet.Ethernet(frame))
+
+
+@pytest.mark.parametrize("writer_cls", [dpkt.pcap.Writer, dpkt.pcapng.Writer])
+def test_iter_capture_reads_records(tmp_path, writer_cls):
+    frames = [bpdu_frame(), udp_frame(68, 67, dhcp_discover())]
+    path = tmp_path / "capture.pcapng"
+
+    with path.open("wb") as f:
+        writer = writer_cls(f)
+        for i, frame in enumerate(frames):
+            writer.writepkt(frame, ts=1700000000 + i)
+
+    assert [buf for _, buf in iter_capture(str(path))] == frames
+
+
+def test_iter_capture_stops_at_cut_off_record(tmp_path):
+    path = tmp_path / "capture.pcap"
+
+    with path.open("wb") as f:
+        writer = dpkt.pcap.Writer(f)
+        writer.writepkt(bpdu_frame(), ts=1700000000)
+        writer.writepkt(bpdu_frame(), ts=1700000001)
+
+    # mimidump was stopped while writing header of the second record
+    path.write_bytes(path.read_bytes()[:-70])
+
+    assert len(list(iter_capture(str(path)))) == 1
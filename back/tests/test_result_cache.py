@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import marshmallow_dataclass
+import pytest
+from src import tasks
+from src.network_schema import Network
+from src.result_cache import ResultCache, is_cacheable, network_key
+
+TEST_JSON_DIR = Path("test_json/")
+NETWORK_FILE = "router_network.json"
+
+
+# ---------------- Utility functions ---------------- #
+
+
+def load_network(network_dict: dict) -> Network:
+    schema = marshmallow_dataclass.class_schema(Network)()
+    return schema.load(network_dict, unknown="include")
+
+
+@pytest.fixture
+def network_dict() -> dict:
+    return json.loads((TEST_JSON_DIR / NETWORK_FILE).read_text())
+
+
+@pytest.fixture
+def emulations(monkeypatch) -> list:
+    """Replace emulation with a stub, every call is recorded."""
+    calls = []
+
+    def emulate(network):
+        calls.append(network)
+        return [], []
+
+    monkeypatch.setattr(tasks, "emulate", emulate)
+    monkeypatch.setattr(tasks, "RESULT_CACHE", ResultCache(max_bytes=1024 * 1024))
+
+    return calls
+
+
+# ---------------- Test cases ---------------- #
+
+
+def test_key_ignores_job_ids_and_cosmetic_fields(network_dict: dict):
+    key = network_key(load_network(network_dict))
+
+    for job in network_dict["jobs"]:
+        job["id"] = job["id"] + "_copy"
+        job["level"] += 1
+        job["print_cmd"] = ""
+
+    for node in network_dict["nodes"]:
+        node["position"] = {"x": 0, "y": 0}
+        node["data"]["label"] = "renamed"
+
+    assert network_key(load_network(network_dict)) == key
+
+
+def test_key_depends_on_job_content(network_dict: dict):
+    key = network_key(load_network(network_dict))
+
+    network_dict["jobs"][0]["arg_1"] = "10.0.0.99"
+
+    assert network_key(load_network(network_dict)) != key
+
+
+def test_key_depends_on_job_order(network_dict: dict):
+    network_dict["jobs"].append(
+        {**network_dict["jobs"][0], "id": "second", "job_id": 2, "arg_1": "x"}
+    )
+    key = network_key(load_network(network_dict))
+
+    network_dict["jobs"].reverse()
+
+    assert network_key(load_network(network_dict)) != key
+
+
+def test_key_depends_on_animation_format(network_dict: dict):
+    network = load_network(network_dict)
+
+    assert network_key(network, "compact") != network_key(network)
+
+
+def test_random_loss_is_not_cacheable(network_dict: dict):
+    assert is_cacheable(load_network(network_dict))
+
+    network_dict["edges"][0]["data"]["loss_percentage"] = 10
+
+    assert not is_cacheable(load_network(network_dict))
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", ("aaaa", []))
+    cache.put("b", ("bbbb", []))
+    cache.get("a")
+    cache.put("c", ("cccc", []))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_repeated_emulation_is_cached(emulations: list, network_dict: dict):
+    network_json = json.dumps(network_dict)
+
+    assert tasks.run_miminet(network_json) == tasks.run_miminet(network_json)
+    assert len(emulations) == 1
+
+
+def test_cache_bypass_emulates_again(emulations: list, network_dict: dict):
+    network_json = json.dumps(network_dict)
+
+    tasks.run_miminet(network_json)
+    tasks.run_miminet(network_json, use_cache=False)
+
+    assert len(emulations) == 2
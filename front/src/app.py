@@ -45,12 +45,13 @@ from miminet_host import (
     save_switch_config,
     save_edge_config,
 )
-from miminet_model import Network, db, init_db
+from miminet_model import Network, convert_network_to_jsonb, db, init_db
 from miminet_network import (
     copy_network,
     create_network,
     delete_network,
     move_nodes,
+    patch_network,
     post_nodes,
     post_nodes_edges,
     update_network_config,
@@ -58,10 +59,11 @@ from miminet_network import (
     web_network,
     web_network_shared,
     get_emulation_queue_size,
+    get_emulation_queue_depth,
     get_last_emulation_time,
 )
-from miminet_shark import mimishark_page
-from miminet_simulation import check_simulation, run_simulation
+from miminet_shark import download_pcap, mimishark_page
+from miminet_simulation import check_simulation, run_simulation, simulation_status
 from quiz.controller.question_controller import (
     get_questions_by_section_endpoint,
     create_question_endpoint,
@@ -167,6 +169,16 @@ db.init_app(app)
 # Init Flask-Migrate
 migrate = Migrate(app, db)
 
+
+@app.cli.command("convert-network-jsonb")
+def convert_network_jsonb_command():
+    """Convert network schemas to JSONB (run once before enabling network_jsonb)."""
+    if convert_network_to_jsonb():
+        print("Network schemas are converted to JSONB.")
+    else:
+        print("Nothing to convert.")
+
+
 # Init LoginManager
 login_manager.init_app(app)
 
@@ -201,6 +213,7 @@ app.add_url_rule("/delete_network", methods=["GET", "POST"], view_func=delete_ne
 app.add_url_rule("/post_network_nodes", methods=["GET", "POST"], view_func=post_nodes)
 app.add_url_rule("/post_nodes_edges", methods=["POST"], view_func=post_nodes_edges)
 app.add_url_rule("/move_network_nodes", methods=["POST"], view_func=move_nodes)
+app.add_url_rule("/network/patch", methods=["POST"], view_func=patch_network)
 app.add_url_rule(
     "/network/upload_network_picture",
     methods=["GET", "POST"],
@@ -213,6 +226,7 @@ app.add_url_rule(
 # Simulation
 app.add_url_rule("/run_simulation", methods=["POST"], view_func=run_simulation)
 app.add_url_rule("/check_simulation", methods=["GET"], view_func=check_simulation)
+app.add_url_rule("/simulation_status", methods=["GET"], view_func=simulation_status)
 
 # Emulation queue
 app.add_url_rule(
@@ -221,6 +235,9 @@ app.add_url_rule(
 app.add_url_rule(
     "/emulation_queue/time", methods=["GET"], view_func=get_last_emulation_time
 )
+app.add_url_rule(
+    "/emulation_queue/depth", methods=["GET"], view_func=get_emulation_queue_depth
+)
 
 
 # Hosts
@@ -250,6 +267,7 @@ app.add_url_rule("/router/mimishark", methods=["GET"], view_func=mimishark_page)
 app.add_url_rule("/server/mimishark", methods=["GET"], view_func=mimishark_page)
 app.add_url_rule("/hub/mimishark", methods=["GET"], view_func=mimishark_page)
 app.add_url_rule("/switch/mimishark", methods=["GET"], view_func=mimishark_page)
+app.add_url_rule("/mimishark/download", methods=["GET"], view_func=download_pcap)
 
 # Quiz
 app.add_url_rule(
@@ -412,6 +430,7 @@ def sitemap():
         "/auth/logout",
         "/run_simulation",
         "/check_simulation",
+        "/simulation_status",
         "/network/update_network_config",
         "/host/save_config",
         "/host/delete_job",
@@ -25,6 +25,11 @@ SEND_NETWORK_EXCHANGE = Exchange(SEND_NETWORK_EXCHANGE_NAME, type=EXCHANGE_TYPE)
 NETWORK_RESULTS_EXCHANGE = Exchange("network-results-exchange", type="direct")
 TASK_CHECKING_EXCHANGE = Exchange("task-checking-exchange", type="direct")
 
+# Notifications about finished simulations for every web server process
+SIMULATION_EVENTS_EXCHANGE = Exchange(
+    "simulation-events-exchange", type="fanout", durable=False
+)
+
 QUEUES = [
     Queue(
         "common-results-queue",
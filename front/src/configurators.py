@@ -1,9 +1,10 @@
 from abc import abstractmethod
-import json
 from celery_app import app
 from flask import jsonify, make_response, request, Response
 from flask_login import current_user
-from miminet_model import Network, Simulate, db
+from miminet_model import Network, db, delete_simulations
+from network_storage import load_network_parts, save_network_parts
+from sqlalchemy.orm import defer
 from typing import Callable, Optional
 import uuid
 import ipaddress
@@ -184,6 +185,9 @@ class AbstractDeviceConfigurator:
         self._device_type: str = device_type
         self._device_node = None  # current device node in miminet network
 
+    # Parts of the network schema read and saved by the configurator
+    _network_parts: tuple = ("nodes", "jobs")
+
     __MAX_JOBS_COUNT: int = 30
     __SLEEP_JOB_ID: int = 7
     __MAX_SLEEP_TIME: int = 60
@@ -215,9 +219,10 @@ class AbstractDeviceConfigurator:
         if not network_guid:
             raise ConfigurationError("Не указан параметр net_guid")
 
-        # get user's network
+        # get user's network (the schema is read partially below)
         self._cur_network: Network = (
-            Network.query.filter(Network.guid == network_guid)
+            Network.query.options(defer(Network.network))
+            .filter(Network.guid == network_guid)
             .filter(Network.author_id == current_user.id)
             .first()
         )
@@ -232,8 +237,15 @@ class AbstractDeviceConfigurator:
         if not device_id:
             raise ConfigurationError(f"Не указан параметр {element_form_id}")
 
-        # json representation
-        self._json_network: dict = json.loads(self._cur_network.network)
+        # json representation of the needed parts
+        json_network = load_network_parts(self._cur_network.id, self._network_parts)
+
+        if json_network is None:
+            raise ConfigurationError("Сеть не найдена")
+
+        self._json_network: dict = {
+            key: value or [] for key, value in json_network.items()
+        }
         self._nodes: list = self._json_network["nodes"]
 
         # find all matches with device in nodes
@@ -258,12 +270,10 @@ class AbstractDeviceConfigurator:
     def __conf_sims_delete(self):
         """Delete saved simulations. Typically used at the end of the configuration"""
         # Remove all previous simulations (after configuration update)
-        sims = Simulate.query.filter(Simulate.network_id == self._cur_network.id).all()
-        for s in sims:
-            app.control.revoke(s.task_guid, terminate=False)
-            db.session.delete(s)
+        for task_guid in delete_simulations(self._cur_network.id):
+            app.control.revoke(task_guid, terminate=False)
 
-        self._cur_network.network = json.dumps(self._json_network)
+        save_network_parts(self._cur_network.id, self._json_network)
         db.session.commit()
 
     def _conf_jobs(self):
@@ -501,6 +511,8 @@ class ServerConfigurator(HostConfigurator):
 
 
 class EdgeConfigurator(AbstractDeviceConfigurator):
+    _network_parts = ("nodes", "jobs", "edges")
+
     def __init__(self):
         super().__init__(device_type="edge")
 
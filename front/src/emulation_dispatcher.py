@@ -0,0 +1,273 @@
+"""Load-aware dispatching of emulation tasks to the worker queues.
+
+Interactive simulations (users pressing "Emulate") and bulk exam checks use
+separate sets of worker queues (lanes). Inside a lane a task goes to the queue
+with the smallest backlog per consumer. Without configured queues tasks are
+spread randomly by the consistent-hash exchange.
+
+Interactive tasks have higher priority, so on priority queues (see
+queue_max_priority of the workers) they are taken before waiting exam checks.
+Exam checks may borrow idle interactive queues to use all workers.
+
+Queue depths are cached by the web server process for QUEUE_DEPTH_TTL,
+if the broker can't be asked, tasks are sent to the lane queues in turn.
+"""
+
+import datetime
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+
+from celery_app import EXCHANGE_TYPE, SEND_NETWORK_EXCHANGE, app
+from kombu import Exchange
+from miminet_model import SimulateLog, db
+from sqlalchemy import not_
+
+INTERACTIVE_LANE = "interactive"
+BULK_LANE = "bulk"
+
+LANE_QUEUES = {
+    INTERACTIVE_LANE: [
+        q for q in os.getenv("interactive_queue_names", "").split(",") if q
+    ],
+    BULK_LANE: [q for q in os.getenv("bulk_queue_names", "").split(",") if q],
+}
+
+LANE_PRIORITY = {
+    INTERACTIVE_LANE: 9,
+    BULK_LANE: 0,
+}
+
+# Exam checks may be sent to interactive queues without waiting messages
+BULK_BORROW_QUEUES = os.getenv("bulk_borrow_queues", "1") == "1"
+
+# Used for messages waiting in the queue without known estimation (in seconds)
+AVERAGE_EMULATION_TIME = 10.0
+
+# Unfinished simulations older than this are considered lost
+PENDING_WINDOW = datetime.timedelta(minutes=10)
+
+# Messages are published directly to the chosen queue
+DIRECT_EXCHANGE = Exchange("")
+
+# Queue depths are taken from the broker at most once per this time (in seconds)
+QUEUE_DEPTH_TTL = float(os.getenv("queue_depth_ttl", "1"))
+
+# Static choice of lane queues when the broker doesn't answer
+STATIC_QUEUES = {lane: itertools.cycle(queues) for lane, queues in LANE_QUEUES.items()}
+
+
+def queue_depth(queues: list[str]) -> dict[str, tuple[int, int]]:
+    """Get number of waiting messages and consumers of every existing queue.
+
+    Args:
+        queues (list[str]): Queue names.
+
+    Returns:
+        dict: queue name -> (messages, consumers). Missing queues are skipped.
+    """
+
+    depth = {}
+
+    with app.connection_for_write() as conn:
+        for queue in queues:
+            channel = conn.channel()
+
+            try:
+                _, messages, consumers = channel.queue_declare(
+                    queue=queue, passive=True
+                )
+                depth[queue] = (messages, consumers)
+            except Exception as e:
+                logging.error(f"Очередь {queue} недоступна: {e}")
+            finally:
+                try:
+                    channel.close()
+                except Exception:
+                    pass
+
+    return depth
+
+
+def pending_time(queues: list[str]) -> dict[str, float]:
+    """Estimated time of unfinished interactive simulations of every queue."""
+    since = datetime.datetime.now(datetime.timezone.utc) - PENDING_WINDOW
+
+    rows = (
+        db.session.query(
+            SimulateLog.queue_name,
+            db.func.sum(
+                db.func.coalesce(SimulateLog.estimated_time, AVERAGE_EMULATION_TIME)
+            ),
+        )
+        .filter(not_(SimulateLog.ready))
+        .filter(SimulateLog.simulate_start >= since)
+        .filter(SimulateLog.queue_name.in_(queues))
+        .group_by(SimulateLog.queue_name)
+        .all()
+    )
+
+    return {queue: float(total) for queue, total in rows}
+
+
+def queue_backlog(
+    depth: dict[str, tuple[int, int]], pending: dict[str, float]
+) -> dict[str, float]:
+    """Expected waiting time (in seconds) per consumer of every queue.
+
+    Messages waiting in the broker and estimations of unfinished simulations
+    describe the same work, the larger of them is taken.
+    """
+
+    backlog = {}
+
+    for queue, (messages, consumers) in depth.items():
+        # Queue without consumers never gets a task
+        if not consumers:
+            continue
+
+        work = max(pending.get(queue, 0.0), messages * AVERAGE_EMULATION_TIME)
+        backlog[queue] = work / consumers
+
+    return backlog
+
+
+class QueueLoad:
+    """Depths of the lane queues and unfinished simulations, cached for ttl.
+
+    Tasks sent by this process are counted right away, so requests
+    coming before the next refresh don't all go to the same queue.
+    """
+
+    def __init__(self, ttl: float = QUEUE_DEPTH_TTL):
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__updated: float | None = None
+        # None - the broker hasn't answered at the last refresh
+        self.__depth: dict[str, tuple[int, int]] | None = None
+        self.__pending: dict[str, float] = {}
+
+    def __refresh(self) -> None:
+        if self.__updated is not None and (
+            time.monotonic() - self.__updated < self.__ttl
+        ):
+            return
+
+        queues = list(dict.fromkeys(itertools.chain(*LANE_QUEUES.values())))
+
+        try:
+            self.__depth = queue_depth(queues)
+        except Exception as e:
+            logging.error(f"Не удалось получить состояние очередей: {e}")
+            self.__depth = None
+
+        # Unfinished simulations are known only for the interactive lane
+        self.__pending = pending_time(LANE_QUEUES[INTERACTIVE_LANE])
+        self.__updated = time.monotonic()
+
+    def get(self) -> tuple[dict[str, tuple[int, int]] | None, dict[str, float]]:
+        """Get queue depths (None if the broker is unavailable) and pending times."""
+        with self.__lock:
+            self.__refresh()
+
+            if self.__depth is None:
+                return None, dict(self.__pending)
+
+            return dict(self.__depth), dict(self.__pending)
+
+    def add_sent(self, queue: str, lane: str, estimated_time: float | None) -> None:
+        """Count the task sent by this process before the next refresh."""
+        with self.__lock:
+            if self.__depth is not None and queue in self.__depth:
+                messages, consumers = self.__depth[queue]
+                self.__depth[queue] = (messages + 1, consumers)
+
+            if lane == INTERACTIVE_LANE:
+                self.__pending[queue] = self.__pending.get(queue, 0.0) + (
+                    estimated_time or AVERAGE_EMULATION_TIME
+                )
+
+
+QUEUE_LOAD = QueueLoad()
+
+
+def choose_queue(lane: str) -> str | None:
+    """Choose the least loaded queue of the lane (None if no queue is available)."""
+    queues = LANE_QUEUES.get(lane, [])
+
+    if not queues:
+        return None
+
+    borrowed = []
+
+    if lane == BULK_LANE and BULK_BORROW_QUEUES:
+        borrowed = [q for q in LANE_QUEUES[INTERACTIVE_LANE] if q not in queues]
+
+    all_depth, all_pending = QUEUE_LOAD.get()
+
+    if all_depth is None:
+        return next(STATIC_QUEUES[lane])
+
+    depth = {q: all_depth[q] for q in queues + borrowed if q in all_depth}
+
+    # Borrow only idle queues: an interactive task coming later waits
+    # no longer than one exam check per consumer
+    for queue in borrowed:
+        if queue in depth and depth[queue][0] > 0:
+            del depth[queue]
+
+    pending = all_pending if lane == INTERACTIVE_LANE else {}
+    backlog = queue_backlog(depth, pending)
+
+    if not backlog:
+        return None
+
+    return min(backlog, key=lambda queue: backlog[queue])
+
+
+def send_emulation_task(
+    network_json: str,
+    lane: str,
+    estimated_time: float | None = None,
+    task_id: str | None = None,
+    headers: dict | None = None,
+):
+    """Send network to emulation.
+
+    Args:
+        network_json (str): Network JSON.
+        lane (str): INTERACTIVE_LANE or BULK_LANE.
+        estimated_time (float | None): Estimated emulation time (in seconds).
+        task_id (str | None): Celery task id.
+        headers (dict | None): Celery task headers.
+
+    Returns:
+        tuple: AsyncResult of the task and the queue name (None for random routing).
+    """
+
+    queue = choose_queue(lane)
+
+    if queue:
+        routing = {"exchange": DIRECT_EXCHANGE, "routing_key": queue}
+        QUEUE_LOAD.add_sent(queue, lane, estimated_time)
+        logging.info(f"Эмуляция ({lane}, ~{estimated_time} с) отправлена в {queue}")
+    else:
+        routing = {
+            "exchange": SEND_NETWORK_EXCHANGE,
+            "exchange_type": EXCHANGE_TYPE,
+            "routing_key": str(uuid.uuid4()),
+        }
+
+    async_obj = app.send_task(
+        "tasks.mininet_worker",
+        (network_json,),
+        task_id=task_id,
+        headers=headers,
+        priority=LANE_PRIORITY[lane],
+        **routing,
+    )
+
+    return async_obj, queue
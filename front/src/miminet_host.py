@@ -1,4 +1,3 @@
-import json
 import re
 import ipaddress
 import shlex
@@ -6,7 +5,9 @@ from typing import List, Dict
 
 from flask import jsonify, make_response, request, Response
 from flask_login import current_user, login_required
-from miminet_model import Network, Simulate, db
+from miminet_model import Network, db, delete_simulations
+from network_storage import load_network_part, save_network_part
+from sqlalchemy.orm import defer
 from configurators import (
     HostConfigurator,
     SwitchConfigurator,
@@ -547,8 +548,10 @@ def delete_job():
     if not network_guid:
         return build_response("Не указан параметр net_guid")
 
+    # Only jobs are replaced, the network schema isn't read
     cur_network: Network = (
-        Network.query.filter(Network.guid == network_guid)
+        Network.query.options(defer(Network.network))
+        .filter(Network.guid == network_guid)
         .filter(Network.author_id == user.id)
         .first()
     )
@@ -556,21 +559,16 @@ def delete_job():
     if not cur_network:
         return build_response("Такая сеть не найдена")
 
-    json_network: dict = json.loads(cur_network.network)
-
     # get jobs & remove one
-    jobs: list = json_network["jobs"]
+    jobs: list = load_network_part(cur_network.id, "jobs", [])
     new_jobs: list = list(filter(lambda x: x["id"] != job_id, jobs))
-    json_network["jobs"] = new_jobs
 
     # update network
-    cur_network.network = json.dumps(json_network)
+    save_network_part(cur_network.id, "jobs", new_jobs)
 
     # Remove all previous simulations
-    sims = Simulate.query.filter(Simulate.network_id == cur_network.id).all()
-    for s in sims:
-        db.session.delete(s)
+    delete_simulations(cur_network.id)
 
     db.session.commit()
 
-    return {"message": "Команда удалена", "jobs": json_network["jobs"]}
+    return {"message": "Команда удалена", "jobs": new_jobs}
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from os import urandom
 
@@ -7,15 +8,25 @@ from miminet_config import (
     make_empty_network,
 )
 from sqlalchemy import (
+    TypeDecorator,
+    cast,
+    text,
     MetaData,
     BigInteger,
+    Float,
+    Integer,
     Text,
     Boolean,
     TIMESTAMP,
     ForeignKey,
     not_,
     inspect,
+    event,
+    delete,
 )
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.security import generate_password_hash
 import psycopg2
 from psycopg2 import OperationalError
@@ -32,6 +43,24 @@ convention = {
 metadata = MetaData(naming_convention=convention)
 db = SQLAlchemy(metadata=metadata)
 
+# Network schemas are stored as JSONB on PostgreSQL
+# (the column is converted once by convert_network_to_jsonb)
+NETWORK_JSONB = os.getenv("network_jsonb", "0") == "1"
+
+
+class JsonText(TypeDecorator):
+    """JSON document, a string in Python.
+
+    The column may be TEXT or JSONB, it is always read as text,
+    so JSONB documents are not parsed by the driver.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def column_expression(self, colexpr):
+        return cast(colexpr, Text)
+
 
 class User(db.Model, UserMixin):  # type:ignore[name-defined]
     id = db.Column(BigInteger, primary_key=True, unique=True, autoincrement=True)
@@ -61,7 +90,7 @@ class Network(db.Model):  # type:ignore[name-defined]
 
     description = db.Column(Text, default="", nullable=True)
 
-    network = db.Column(Text, default=make_empty_network, nullable=False)
+    network = db.Column(JsonText, default=make_empty_network, nullable=False)
     preview_uri = db.Column(Text, default="first_network.jpg", nullable=False)
 
     # Is this network in share mode?
@@ -70,30 +99,137 @@ class Network(db.Model):  # type:ignore[name-defined]
     # Don't show networks for tasks
     is_task = db.Column(Boolean, default=False, nullable=False)
 
+    # Incremented on every change of the network schema (see patch_network)
+    revision = db.Column(BigInteger, default=0, nullable=False)
+
+
+@event.listens_for(Network, "before_update")
+def bump_network_revision(mapper, connection, target):
+    if inspect(target).attrs.network.history.has_changes():
+        target.revision = (target.revision or 0) + 1
+
 
 class Simulate(db.Model):  # type:ignore[name-defined]
     id = db.Column(BigInteger, primary_key=True, autoincrement=True)
-    network_id = db.Column(BigInteger, ForeignKey("network.id"), nullable=False)
+    network_id = db.Column(
+        BigInteger, ForeignKey("network.id"), nullable=False, index=True
+    )
     task_guid = db.Column(Text, nullable=True, default="")
     # Do we finish? (False - new, True - simulation is finished)
     ready = db.Column(Boolean, default=False)
     packets = db.Column(Text, nullable=True, default="")
 
 
+def delete_simulations(network_id: int) -> list[str]:
+    """Remove all simulations of the network with one DELETE (without commit).
+
+    Returns:
+        list[str]: Task guids of the removed simulations.
+    """
+
+    result = db.session.execute(
+        delete(Simulate)
+        .where(Simulate.network_id == network_id)
+        .returning(Simulate.task_guid)
+    )
+
+    return [task_guid for (task_guid,) in result]
+
+
+# Simulated networks stored once per content (see SimulateLog.network_hash)
+class NetworkSnapshot(db.Model):  # type:ignore[name-defined]
+    # sha256 of the network JSON
+    hash = db.Column(Text, primary_key=True)
+    network = db.Column(Text, nullable=False)
+    created = db.Column(TIMESTAMP(timezone=True), server_default=db.func.now())
+
+
+def store_network_snapshot(network: str) -> str:
+    """Save the network snapshot if it is not saved yet (without commit).
+
+    Returns:
+        str: Snapshot hash.
+    """
+
+    network_hash = hashlib.sha256(network.encode()).hexdigest()
+
+    insert = (
+        postgresql_insert if db.engine.dialect.name == "postgresql" else sqlite_insert
+    )
+
+    # Snapshot may be saved concurrently by another simulation
+    db.session.execute(
+        insert(NetworkSnapshot)
+        .values(hash=network_hash, network=network)
+        .on_conflict_do_nothing()
+    )
+
+    return network_hash
+
+
 # Add new record to this table when you put a new simulation
 # Set ready flag to True when simulation is over
 # simulate_end will autp-update
 class SimulateLog(db.Model):  # type:ignore[name-defined]
+    __table_args__ = (
+        # Unfinished simulations (queue status and load of worker queues)
+        db.Index(
+            "ix_simulate_log_pending",
+            "simulate_start",
+            "queue_name",
+            postgresql_where=text("NOT ready"),
+        ),
+    )
+
     id = db.Column(BigInteger, primary_key=True)
     author_id = db.Column(BigInteger, nullable=False)
-    network_guid = db.Column(Text, nullable=False)
-    network = db.Column(Text, default=make_empty_network, nullable=False)
+    network_guid = db.Column(Text, nullable=False, index=True)
+    # Network copy of old records, new records reference network_snapshot
+    network = db.Column(Text, nullable=True)
+    network_hash = db.Column(
+        Text, ForeignKey("network_snapshot.hash"), nullable=True, index=True
+    )
 
-    simulate_start = db.Column(TIMESTAMP(timezone=True), server_default=db.func.now())
+    simulate_start = db.Column(
+        TIMESTAMP(timezone=True), server_default=db.func.now(), index=True
+    )
     simulate_end = db.Column(TIMESTAMP(timezone=True), onupdate=db.func.now())
 
     ready = db.Column(Boolean, default=False, nullable=False)
 
+    # Estimated emulation time in seconds (see network_validation.py)
+    estimated_time = db.Column(Float, nullable=True)
+
+    # Worker queue the emulation was sent to (see emulation_dispatcher.py)
+    queue_name = db.Column(Text, nullable=True)
+
+
+# Practice task check waiting for emulation results of its scenarios.
+# Results are scored when the last scenario is emulated (see tasks.py)
+class CheckTask(db.Model):  # type:ignore[name-defined]
+    id = db.Column(BigInteger, primary_key=True, autoincrement=True)
+    # None for checks without quiz session (results are written to a file)
+    session_question_id = db.Column(BigInteger, nullable=True)
+    network_guid = db.Column(Text, nullable=True)
+    # Number of scenarios without emulation result
+    remaining = db.Column(Integer, default=0, nullable=False)
+    finished = db.Column(Boolean, default=False, nullable=False)
+    created = db.Column(TIMESTAMP(timezone=True), server_default=db.func.now())
+
+
+class CheckTaskScenario(db.Model):  # type:ignore[name-defined]
+    id = db.Column(BigInteger, primary_key=True, autoincrement=True)
+    check_task_id = db.Column(
+        BigInteger, ForeignKey("check_task.id", ondelete="CASCADE"), nullable=False
+    )
+    # Id of the emulation task
+    task_guid = db.Column(Text, nullable=False, index=True)
+    network = db.Column(Text, nullable=False)
+    requirements = db.Column(Text, nullable=False)
+    modifications = db.Column(Text, nullable=False)
+    # Emulation result (None - not emulated yet)
+    animation = db.Column(Text, nullable=True)
+
 
 def ensure_db_exists(
     host,
@@ -173,6 +309,98 @@ def ensure_db_exists(
         raise
 
 
+# Changes of existing databases made after the tables were created.
+# Every statement is idempotent, they are executed on each start.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE simulate_log ADD COLUMN IF NOT EXISTS estimated_time FLOAT",
+    "ALTER TABLE simulate_log ADD COLUMN IF NOT EXISTS queue_name TEXT",
+    "ALTER TABLE network ADD COLUMN IF NOT EXISTS revision BIGINT NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_simulate_network_id ON simulate (network_id)",
+    # Simulated networks are referenced in network_snapshot (created by create_all)
+    "ALTER TABLE simulate_log ADD COLUMN IF NOT EXISTS network_hash TEXT"
+    " CONSTRAINT fk_simulate_log_network_hash_network_snapshot"
+    " REFERENCES network_snapshot (hash)",
+    "CREATE INDEX IF NOT EXISTS ix_simulate_log_network_hash"
+    " ON simulate_log (network_hash)",
+    "ALTER TABLE simulate_log ALTER COLUMN network DROP NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_simulate_log_network_guid"
+    " ON simulate_log (network_guid)",
+    "CREATE INDEX IF NOT EXISTS ix_simulate_log_simulate_start"
+    " ON simulate_log (simulate_start)",
+    "CREATE INDEX IF NOT EXISTS ix_simulate_log_pending"
+    " ON simulate_log (simulate_start, queue_name) WHERE NOT ready",
+]
+
+
+def upgrade_schema():
+    """Bring the schema of an existing database up to the models."""
+
+    # Tables of new models (check_task, ...) are created with their indexes
+    db.create_all()
+
+    if db.engine.dialect.name != "postgresql":
+        return
+
+    for statement in SCHEMA_UPGRADES:
+        try:
+            db.session.execute(text(statement))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[!] Error upgrading schema ({statement}): {e}")
+
+
+def upgrade_json_storage():
+    """Compress large text columns with lz4.
+
+    Skipped if it isn't supported by the server (lz4 needs PostgreSQL 14).
+    """
+
+    if db.engine.dialect.name != "postgresql":
+        return
+
+    statements = [
+        # TOAST compresses new values with lz4 (faster than the default pglz)
+        "ALTER TABLE simulate ALTER COLUMN packets SET COMPRESSION lz4",
+        "ALTER TABLE network_snapshot ALTER COLUMN network SET COMPRESSION lz4",
+    ]
+
+    for statement in statements:
+        try:
+            db.session.execute(text(statement))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[!] Error upgrading storage ({statement}): {e}")
+
+
+def convert_network_to_jsonb() -> bool:
+    """Convert the network schema column to JSONB.
+
+    One-off migration, the table is rewritten under an exclusive lock.
+    Run it with ``flask convert-network-jsonb`` before enabling network_jsonb.
+
+    Returns:
+        bool: Whether the column was converted (False if it is already JSONB
+            or the database isn't PostgreSQL).
+    """
+
+    if db.engine.dialect.name != "postgresql":
+        return False
+
+    columns = {c["name"]: c["type"] for c in inspect(db.engine).get_columns("network")}
+
+    if isinstance(columns["network"], JSONB):
+        return False
+
+    db.session.execute(
+        text("ALTER TABLE network ALTER COLUMN network TYPE jsonb USING network::jsonb")
+    )
+    db.session.commit()
+
+    return True
+
+
 def init_db(app):
     # Init DB
     mode = os.getenv("MODE", "dev")
@@ -239,6 +467,8 @@ def init_db(app):
                     db.session.commit()
         else:
             print(f"[{mode.upper()}] Schema exists.")
+            upgrade_schema()
+
             # Only fix data if tables exist
             try:
                 # Some networks can be marked as non-emulated in the database, we should fix them.
@@ -249,3 +479,5 @@ def init_db(app):
                 db.session.commit()
             except Exception as e:
                 print(f"[!] Error fixing nonemulated networks: {e}")
+
+        upgrade_json_storage()
@@ -14,9 +14,25 @@ from flask import (
 )
 from flask_login import current_user, login_required
 from miminet_config import check_image_with_pil
-from miminet_model import Network, Simulate, db, SimulateLog
+from emulation_dispatcher import (
+    INTERACTIVE_LANE,
+    LANE_QUEUES,
+    pending_time,
+    queue_backlog,
+    queue_depth,
+)
+from miminet_model import Network, Simulate, db, delete_simulations
+from network_patch import (
+    NetworkPatchError,
+    apply_patch,
+    is_layout_patch,
+    validate_patch,
+)
+from network_storage import patch_layout, save_network_part
+from pcap_store import list_pcaps
+from queue_status import QUEUE_STATUS
+from sqlalchemy.orm import defer
 import datetime
-from sqlalchemy import not_
 
 PREVIEW_IMAGES_ROOT = "static/images/preview"
 
@@ -122,12 +138,8 @@ def delete_network():
         return redirect("home")
 
     if request.method == "POST":
-        sims = Simulate.query.filter(Simulate.network_id == net.id).all()
-
         # Remove all previous simulations
-        for s in sims:
-            db.session.delete(s)
-            db.session.commit()
+        delete_simulations(net.id)
 
         db.session.delete(net)
         db.session.commit()
@@ -185,11 +197,7 @@ def web_network_shared():
     pcap_dir = "static/pcaps/" + network_guid
 
     if os.path.exists(pcap_dir):
-        jnet["pcap"] = [
-            os.path.splitext(f)[0]
-            for f in os.listdir(pcap_dir)
-            if os.path.isfile(os.path.join(pcap_dir, f))
-        ]
+        jnet["pcap"] = list_pcaps(pcap_dir)
         net.network = json.dumps(jnet)
         db.session.commit()
 
@@ -269,11 +277,7 @@ def web_network():
     pcap_dir = "static/pcaps/" + network_guid
 
     if os.path.exists(pcap_dir):
-        jnet["pcap"] = [
-            os.path.splitext(f)[0]
-            for f in os.listdir(pcap_dir)
-            if os.path.isfile(os.path.join(pcap_dir, f))
-        ]
+        jnet["pcap"] = list_pcaps(pcap_dir)
         net.network = json.dumps(jnet)
         db.session.commit()
 
@@ -342,8 +346,10 @@ def post_nodes():
         ret = {"message": "Пропущен параметр guid"}
         return make_response(jsonify(ret), 400)
 
+    # Only nodes are replaced, the network schema isn't read
     net = (
-        Network.query.filter(Network.guid == network_guid)
+        Network.query.options(defer(Network.network))
+        .filter(Network.guid == network_guid)
         .filter(Network.author_id == user.id)
         .first()
     )
@@ -353,19 +359,14 @@ def post_nodes():
         return make_response(jsonify(ret), 400)
 
     if request.method == "POST":
-        nodes = request.json
-        jnet = json.loads(net.network)
-        jnet["nodes"] = nodes
-        net.network = json.dumps(jnet)
+        save_network_part(net.id, "nodes", request.json)
 
         # Remove all previous simulations
-        sims = Simulate.query.filter(Simulate.network_id == net.id).all()
-        for s in sims:
-            db.session.delete(s)
+        delete_simulations(net.id)
 
         db.session.commit()
 
-    ret = {"message": "Done", "code": "SUCCESS"}
+    ret = {"message": "Done", "code": "SUCCESS", "revision": net.revision}
     return make_response(jsonify(ret), 201)
 
 
@@ -393,10 +394,7 @@ def post_nodes_edges():
         edges = request.json[1]
         jobs = request.json[2]
 
-        for edge in edges:
-            edge_data = edge.get("data", {})
-            edge_data["loss_percentage"] = edge_data.get("loss_percentage", 0)
-            edge_data["duplicate_percentage"] = edge_data.get("duplicate_percentage", 0)
+        set_edge_defaults(edges)
 
         jnet = json.loads(net.network)
         jnet["edges"] = edges
@@ -409,16 +407,121 @@ def post_nodes_edges():
         net.network = json.dumps(jnet)
 
         # Remove all previous simulations
-        sims = Simulate.query.filter(Simulate.network_id == net.id).all()
-        for s in sims:
-            db.session.delete(s)
+        delete_simulations(net.id)
 
         db.session.commit()
 
-    ret = {"message": "Done", "code": "SUCCESS"}
+    ret = {"message": "Done", "code": "SUCCESS", "revision": net.revision}
     return make_response(jsonify(ret), 201)
 
 
+def set_edge_defaults(edges: list) -> None:
+    for edge in edges:
+        edge_data = edge.get("data", {})
+        edge_data["loss_percentage"] = edge_data.get("loss_percentage", 0)
+        edge_data["duplicate_percentage"] = edge_data.get("duplicate_percentage", 0)
+
+
+@login_required
+def patch_network():
+    """Apply JSON Patch with changes of the network schema.
+
+    Request body: {"revision": <revision the patch is made for>, "patch": [...]}.
+    The patch is applied only if the network has not changed since that revision,
+    otherwise 409 is returned and the client has to send the whole network.
+    """
+
+    user = current_user
+    network_guid = request.args.get("guid", type=str)
+
+    if not network_guid:
+        ret = {"message": "Пропущен параметр guid"}
+        return make_response(jsonify(ret), 400)
+
+    net = (
+        Network.query.filter(Network.guid == network_guid)
+        .filter(Network.author_id == user.id)
+        .first()
+    )
+
+    if not net:
+        ret = {"message": "Нет такой сети"}
+        return make_response(jsonify(ret), 400)
+
+    body = request.get_json(silent=True) or {}
+    revision = body.get("revision")
+    patch = body.get("patch")
+
+    if not isinstance(revision, int):
+        ret = {"message": "Неверный запрос"}
+        return make_response(jsonify(ret), 400)
+
+    try:
+        validate_patch(patch)
+    except NetworkPatchError as e:
+        ret = {"message": str(e)}
+        return make_response(jsonify(ret), 400)
+
+    if revision != net.revision:
+        ret = {"message": "Сеть была изменена", "revision": net.revision}
+        return make_response(jsonify(ret), 409)
+
+    # Node moves are applied by the database without reading the network
+    if is_layout_patch(patch):
+        updated = patch_layout(net.id, revision, patch)
+
+        if updated is not None:
+            if not updated:
+                db.session.rollback()
+                ret = {"message": "Сеть была изменена"}
+                return make_response(jsonify(ret), 409)
+
+            db.session.commit()
+            ret = {"message": "Done", "code": "SUCCESS", "revision": revision + 1}
+            return make_response(jsonify(ret), 200)
+
+    jnet = json.loads(net.network)
+
+    try:
+        apply_patch(jnet, patch)
+    except NetworkPatchError as e:
+        ret = {"message": str(e), "revision": net.revision}
+        return make_response(jsonify(ret), 409)
+
+    layout_only = is_layout_patch(patch)
+
+    if not layout_only:
+        set_edge_defaults(jnet.get("edges", []))
+
+        # Remove all pcaps
+        jnet["pcap"] = []
+
+    # Network may be changed by another request after it was read
+    updated = (
+        db.session.query(Network)
+        .filter(Network.id == net.id)
+        .filter(Network.revision == revision)
+        .update(
+            {"network": json.dumps(jnet), "revision": revision + 1},
+            synchronize_session=False,
+        )
+    )
+
+    if not updated:
+        db.session.rollback()
+        ret = {"message": "Сеть была изменена"}
+        return make_response(jsonify(ret), 409)
+
+    if not layout_only:
+        # Remove all previous simulations
+        delete_simulations(net.id)
+
+    db.session.commit()
+
+    ret = {"message": "Done", "code": "SUCCESS", "revision": revision + 1}
+    return make_response(jsonify(ret), 200)
+
+
 @login_required
 def move_nodes():
     user = current_user
@@ -428,8 +531,10 @@ def move_nodes():
         ret = {"message": "Пропущен параметр GUID. И какую сеть мне открыть?!"}
         return make_response(jsonify(ret), 400)
 
+    # Only nodes are replaced, the network schema isn't read
     net = (
-        Network.query.filter(Network.guid == network_guid)
+        Network.query.options(defer(Network.network))
+        .filter(Network.guid == network_guid)
         .filter(Network.author_id == user.id)
         .first()
     )
@@ -439,13 +544,10 @@ def move_nodes():
         return make_response(jsonify(ret), 400)
 
     if request.method == "POST":
-        nodes = request.json
-        jnet = json.loads(net.network)
-        jnet["nodes"] = nodes
-        net.network = json.dumps(jnet)
+        save_network_part(net.id, "nodes", request.json)
         db.session.commit()
 
-    ret = {"message": "Done", "code": "SUCCESS"}
+    ret = {"message": "Done", "code": "SUCCESS", "revision": net.revision}
     return make_response(jsonify(ret), 201)
 
 
@@ -546,12 +648,7 @@ def copy_network():
 @login_required
 def get_last_emulation_time():
     """Answer with current last emulation starting time."""
-    last_emulation_time = (
-        db.session.query(SimulateLog.simulate_start)
-        .order_by(SimulateLog.simulate_start.desc())
-        .limit(1)
-        .scalar()
-    )
+    last_emulation_time = QUEUE_STATUS.last_start()
 
     if not last_emulation_time:
         return make_response(jsonify({"message": "Никаких эмуляций не найдено."}), 404)
@@ -572,13 +669,39 @@ def get_emulation_queue_size():
             jsonify({"message": "Пропущен параметр 'time-filter'."}), 400
         )
 
-    emulated_networks_count = (
-        SimulateLog.query.filter(not_(SimulateLog.ready))
-        .filter(SimulateLog.simulate_start <= time_filter)
-        .count()
-    )
+    emulated_networks_count = QUEUE_STATUS.pending_before(time_filter)
 
     return make_response(
         jsonify({"size": emulated_networks_count}),
         200,
     )
+
+
+@login_required
+def get_emulation_queue_depth():
+    """Answer with waiting messages, consumers and backlog of every worker queue."""
+    queues = []
+
+    for lane, names in LANE_QUEUES.items():
+        try:
+            depth = queue_depth(names)
+        except Exception:
+            return make_response(
+                jsonify({"message": "Не удалось получить состояние очередей."}), 503
+            )
+
+        pending = pending_time(names) if lane == INTERACTIVE_LANE else {}
+        backlog = queue_backlog(depth, pending)
+
+        for name, (messages, consumers) in depth.items():
+            queues.append(
+                {
+                    "name": name,
+                    "lane": lane,
+                    "messages": messages,
+                    "consumers": consumers,
+                    "backlog": backlog.get(name),
+                }
+            )
+
+    return make_response(jsonify({"queues": queues}), 200)
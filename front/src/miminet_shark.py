@@ -1,10 +1,11 @@
 import json
 import os.path
 
-from flask import flash, redirect, render_template, request, url_for
+from flask import flash, redirect, render_template, request, send_file, url_for
 from flask_login import current_user
 from miminet_model import Network
 from pcap_parser import from_pcap_to_json
+from pcap_store import open_pcap, pcap_path
 
 test_mimishark_json_file = "static/mimi_shark/test_mimishark_json_file.json"
 test_mimishark_pcap_file = "static/mimi_shark/test_mimishark_pcap_file.pcap"
@@ -41,10 +42,10 @@ def mimishark_page():
         flash("Нет PCAP файлов")
         return redirect("home")
 
-    file_path = pcap_dir + "/" + iface + ".pcap"
+    file_path = pcap_path(pcap_dir, iface)
 
     # Do we have a pcap file for a given iface?
-    if not os.path.exists(file_path):
+    if not file_path:
         flash("Нет PCAP файла для интерфейса " + iface)
         return redirect("home")
 
@@ -69,3 +70,37 @@ def mimishark_page():
         network=net,
         iface=iface,
     )
+
+
+def download_pcap():
+    """Download pcap of the interface, compressed pcaps are decompressed on the fly."""
+    user = current_user
+    network_guid = request.args.get("guid", type=str)
+    iface = request.args.get("iface", type=str)
+
+    if not network_guid or not iface:
+        flash("Пропущен параметр GUID или iface.")
+        return redirect(url_for("home"))
+
+    net = Network.query.filter(Network.guid == network_guid).first()
+
+    if not net:
+        flash("Нет такой сети")
+        return redirect(url_for("home"))
+
+    if user.is_anonymous and not net.share_mode:
+        flash("У вас нет доступа к этой сети")
+        return redirect(url_for("index"))
+
+    file_path = pcap_path("static/pcaps/" + network_guid, iface)
+
+    if not file_path:
+        flash("Нет PCAP файла для интерфейса " + iface)
+        return redirect(url_for("home"))
+
+    return send_file(
+        open_pcap(file_path),
+        mimetype="application/vnd.tcpdump.pcap",
+        as_attachment=True,
+        download_name=iface + ".pcap",
+    )
@@ -1,14 +1,26 @@
+import json
 import os
 import uuid
 
-from celery_app import (
-    SEND_NETWORK_EXCHANGE,
-    EXCHANGE_TYPE,
-    app,
-)
+from emulation_dispatcher import INTERACTIVE_LANE, send_emulation_task
 from flask import jsonify, make_response, redirect, request, url_for
 from flask_login import current_user, login_required
-from miminet_model import Network, Simulate, SimulateLog, db
+from miminet_model import (
+    Network,
+    Simulate,
+    SimulateLog,
+    db,
+    delete_simulations,
+    store_network_snapshot,
+)
+from pcap_store import list_pcaps
+from queue_status import QUEUE_STATUS
+from network_validation import (
+    NetworkValidationError,
+    estimate_emulation_time,
+    validate_network,
+)
+from simulation_events import SIMULATION_LISTENER
 from werkzeug.wrappers import Response
 
 
@@ -36,18 +48,39 @@ def run_simulation() -> Response:
         return make_response(jsonify(ret), 400)
 
     if request.method == "POST":
+        jnet = json.loads(net.network)
+
+        # Reject networks the worker can't emulate
+        try:
+            validate_network(jnet)
+        except NetworkValidationError as e:
+            ret = {"simulation_id": -1, "message": str(e)}
+            return make_response(jsonify(ret), 400)
+
+        estimated_time = estimate_emulation_time(jnet)
+
         # Put new network to database
 
-        # Get saved emulations
-        sims = Simulate.query.filter(Simulate.network_id == net.id).all()
         # Remove all previous emulations
-        for s in sims:
-            db.session.delete(s)
-            db.session.commit()
+        delete_simulations(net.id)
+
+        network_hash = store_network_snapshot(net.network)
+
+        # Emulating the same network again is an explicit re-run,
+        # the worker emulates it instead of returning the cached result
+        previous = (
+            SimulateLog.query.filter(SimulateLog.network_guid == net.guid)
+            .order_by(SimulateLog.simulate_start.desc())
+            .first()
+        )
+        use_cache = previous is None or previous.network_hash != network_hash
 
         # Write log
         simlog = SimulateLog(
-            author_id=net.author_id, network=net.network, network_guid=net.guid
+            author_id=net.author_id,
+            network_hash=network_hash,
+            network_guid=net.guid,
+            estimated_time=estimated_time,
         )
 
         # Add new network
@@ -57,19 +90,28 @@ def run_simulation() -> Response:
         db.session.add(simlog)
         db.session.commit()
 
-        # Send emulation task to celery
-        app.send_task(
-            "tasks.mininet_worker",
-            (net.network,),
-            routing_key=str(uuid.uuid4()),
-            exchange=SEND_NETWORK_EXCHANGE,
-            exchange_type=EXCHANGE_TYPE,
+        QUEUE_STATUS.add_started(simlog.simulate_start)
+
+        # Send emulation task to the least loaded worker
+        _, queue = send_emulation_task(
+            net.network,
+            INTERACTIVE_LANE,
+            estimated_time,
             task_id=str(task_guid),
-            headers={"network_task_name": "tasks.save_simulate_result"},
+            headers={
+                "network_task_name": "tasks.save_simulate_result",
+                # Animation is decoded by DecodeAnimation (miminet_animation.js)
+                "animation_format": "compact",
+                "result_cache": use_cache,
+            },
         )
 
+        if queue:
+            simlog.queue_name = queue
+            db.session.commit()
+
         # Return network id to check emulation result
-        ret = {"simulation_id": sim.id}
+        ret = {"simulation_id": sim.id, "estimated_time": estimated_time}
         return make_response(jsonify(ret), 201)
 
     return redirect(url_for("home"))
@@ -98,14 +140,37 @@ def check_simulation():
         pcaps = []
 
         if os.path.exists(pcap_dir):
-            pcaps = [
-                os.path.splitext(f)[0]
-                for f in os.listdir(pcap_dir)
-                if os.path.isfile(os.path.join(pcap_dir, f))
-            ]
+            pcaps = list_pcaps(pcap_dir)
 
         ret = {"message": "Симуляция завершена", "packets": sim.packets, "pcaps": pcaps}
         return make_response(jsonify(ret), 200)
 
     ret = {"message": "Сеть в процессе симуляции"}
     return make_response(jsonify(ret), 210)
+
+
+@login_required
+def simulation_status() -> Response:
+    """Cheap status of the simulation polled by the browser until it is finished.
+
+    Unlike check_simulation it doesn't load the animation and list pcaps,
+    the browser calls check_simulation once the simulation is ready.
+    """
+
+    sim_id = request.args.get("simulation_id", type=int)
+
+    if not sim_id:
+        ret = {"message": "Пропущен параметр simulation_id."}
+        return make_response(jsonify(ret), 400)
+
+    # Finished simulations are known from notifications of the results worker
+    if SIMULATION_LISTENER.is_finished(sim_id):
+        return make_response(jsonify({"ready": True}), 200)
+
+    ready = db.session.query(Simulate.ready).filter(Simulate.id == sim_id).scalar()
+
+    if ready is None:
+        ret = {"message": "Нет такой симуляции."}
+        return make_response(jsonify(ret), 400)
+
+    return make_response(jsonify({"ready": bool(ready)}), 200)
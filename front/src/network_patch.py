@@ -0,0 +1,145 @@
+"""Application of JSON Patch (RFC 6902) to the network schema.
+
+Supported operations: add, remove, replace and test. Paths are JSON Pointers
+(RFC 6901) into the network JSON, e.g. /nodes/3/position/x.
+"""
+
+import re
+
+OPERATIONS = ("add", "remove", "replace", "test")
+
+# Operations changing only the layout don't invalidate simulations
+LAYOUT_PATH = re.compile(r"^/nodes/\d+/position(/|$)")
+
+
+class NetworkPatchError(ValueError):
+    """Patch can't be applied to the network."""
+
+
+def parse_pointer(path) -> list[str]:
+    if not isinstance(path, str) or (path and not path.startswith("/")):
+        raise NetworkPatchError(f"Неверный путь {path}.")
+
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in path.split("/")[1:]
+    ]
+
+
+def array_index(array: list, token: str, allow_end: bool = False) -> int:
+    if token == "-" and allow_end:
+        return len(array)
+
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise NetworkPatchError(f"Неверный индекс {token}.")
+
+    index = int(token)
+
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise NetworkPatchError(f"Индекс {token} вне массива.")
+
+    return index
+
+
+def resolve(document, tokens: list[str]):
+    """Get value at the path given by tokens."""
+    for token in tokens:
+        if isinstance(document, list):
+            document = document[array_index(document, token)]
+        elif isinstance(document, dict) and token in document:
+            document = document[token]
+        else:
+            raise NetworkPatchError(f"Нет значения {token}.")
+
+    return document
+
+
+def validate_patch(patch) -> None:
+    """Check the structure of the patch without applying it.
+
+    Raises:
+        NetworkPatchError: Patch is malformed.
+    """
+
+    if not isinstance(patch, list):
+        raise NetworkPatchError("Патч должен быть списком операций.")
+
+    for operation in patch:
+        if not isinstance(operation, dict):
+            raise NetworkPatchError("Операция должна быть объектом.")
+
+        op = operation.get("op")
+
+        if op not in OPERATIONS:
+            raise NetworkPatchError(f"Неизвестная операция {op}.")
+
+        parse_pointer(operation.get("path"))
+
+        if op != "remove" and "value" not in operation:
+            raise NetworkPatchError(f"Нет значения для операции {op}.")
+
+
+def apply_operation(document: dict, operation: dict) -> None:
+    op = operation["op"]
+    tokens = parse_pointer(operation["path"])
+
+    if op == "test":
+        if resolve(document, tokens) != operation["value"]:
+            raise NetworkPatchError(f"Проверка {operation['path']} не пройдена.")
+        return
+
+    # Whole network can't be replaced or removed
+    if not tokens:
+        raise NetworkPatchError("Нельзя изменить всю сеть целиком.")
+
+    parent = resolve(document, tokens[:-1])
+    token = tokens[-1]
+
+    if isinstance(parent, list):
+        if op == "add":
+            parent.insert(
+                array_index(parent, token, allow_end=True), operation["value"]
+            )
+        elif op == "remove":
+            del parent[array_index(parent, token)]
+        elif op == "replace":
+            parent[array_index(parent, token)] = operation["value"]
+        else:
+            raise NetworkPatchError(f"Неизвестная операция {op}.")
+    elif isinstance(parent, dict):
+        if op == "add":
+            parent[token] = operation["value"]
+        elif op in ("remove", "replace"):
+            if token not in parent:
+                raise NetworkPatchError(f"Нет значения {token}.")
+
+            if op == "remove":
+                del parent[token]
+            else:
+                parent[token] = operation["value"]
+        else:
+            raise NetworkPatchError(f"Неизвестная операция {op}.")
+    else:
+        raise NetworkPatchError(f"Нет значения {token}.")
+
+
+def apply_patch(document: dict, patch: list) -> None:
+    """Apply patch to the network JSON in place.
+
+    Raises:
+        NetworkPatchError: Patch is invalid or doesn't match the network.
+    """
+
+    validate_patch(patch)
+
+    for operation in patch:
+        apply_operation(document, operation)
+
+
+def is_layout_patch(patch: list) -> bool:
+    """Patch only moves nodes (malformed operations don't)."""
+    return all(
+        isinstance(operation, dict)
+        and isinstance(operation.get("path"), str)
+        and LAYOUT_PATH.match(operation["path"]) is not None
+        for operation in patch
+    )
@@ -0,0 +1,149 @@
+"""Partial reads and writes of network schemas.
+
+With JSONB storage (network_jsonb=1) parts of the schema are read and written
+by the database, the whole document isn't transferred and parsed. With TEXT
+storage the same functions work on the parsed document.
+"""
+
+import json
+from functools import lru_cache
+
+from miminet_model import NETWORK_JSONB, Network, db
+from sqlalchemy import false, func, inspect, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB, array
+
+
+@lru_cache(maxsize=1)
+def network_is_jsonb() -> bool:
+    """Network schemas are stored in the JSONB column."""
+    if not NETWORK_JSONB or db.engine.dialect.name != "postgresql":
+        return False
+
+    columns = inspect(db.engine).get_columns("network")
+
+    return any(c["name"] == "network" and isinstance(c["type"], JSONB) for c in columns)
+
+
+def network_document():
+    return type_coerce(Network.network, JSONB)
+
+
+def jsonb_value(value):
+    return type_coerce(value, JSONB)
+
+
+def load_network_parts(network_id: int, keys: tuple, default=None) -> dict | None:
+    """Get top-level parts of the network schema (e.g. "nodes" and "jobs").
+
+    Args:
+        network_id (int): Network id.
+        keys (tuple): Names of the parts.
+        default: Value of the parts missing in the schema.
+
+    Returns:
+        dict | None: Parts by name, None if there is no such network.
+    """
+
+    if network_is_jsonb():
+        document = network_document()
+        row = (
+            db.session.query(*(document[key].astext for key in keys))
+            .filter(Network.id == network_id)
+            .first()
+        )
+
+        if row is None:
+            return None
+
+        return {
+            key: default if value is None else json.loads(value)
+            for key, value in zip(keys, row)
+        }
+
+    network = (
+        db.session.query(Network.network).filter(Network.id == network_id).scalar()
+    )
+
+    if network is None:
+        return None
+
+    jnet = json.loads(network)
+
+    return {key: jnet.get(key, default) for key in keys}
+
+
+def load_network_part(network_id: int, key: str, default=None):
+    """Get one top-level part of the network schema (e.g. "jobs")."""
+    parts = load_network_parts(network_id, (key,), default)
+
+    return default if parts is None else parts[key]
+
+
+def save_network_parts(network_id: int, parts: dict) -> None:
+    """Replace top-level parts of the network schema (without commit)."""
+    if network_is_jsonb():
+        document = network_document()
+
+        for key, value in parts.items():
+            document = func.jsonb_set(document, array([key]), jsonb_value(value))
+
+        db.session.query(Network).filter(Network.id == network_id).update(
+            {Network.network: document, Network.revision: Network.revision + 1},
+            synchronize_session=False,
+        )
+        return
+
+    net = db.session.get(Network, network_id)
+
+    if net is None:
+        return
+
+    jnet = json.loads(net.network)
+    jnet.update(parts)
+    net.network = json.dumps(jnet)
+
+
+def save_network_part(network_id: int, key: str, value) -> None:
+    """Replace one top-level part of the network schema (without commit)."""
+    save_network_parts(network_id, {key: value})
+
+
+def patch_layout(network_id: int, revision: int, patch: list) -> bool | None:
+    """Apply patch replacing node positions by the database.
+
+    Args:
+        network_id (int): Network id.
+        revision (int): Revision the patch is made for.
+        patch (list): JSON Patch with "replace" operations of node positions.
+
+    Returns:
+        bool | None: None if the patch can't be applied by the database,
+            otherwise whether the revision matched (without commit).
+    """
+
+    if not network_is_jsonb() or any(op.get("op") != "replace" for op in patch):
+        return None
+
+    document = network_document()
+
+    for operation in patch:
+        path = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in operation["path"].split("/")[1:]
+        ]
+        # Missing paths are not created
+        document = func.jsonb_set(
+            document, array(path), jsonb_value(operation["value"]), false()
+        )
+
+    updated = (
+        db.session.query(Network)
+        .filter(Network.id == network_id)
+        .filter(Network.revision == revision)
+        .update(
+            {Network.network: document, Network.revision: revision + 1},
+            synchronize_session=False,
+        )
+    )
+
+    return bool(updated)
@@ -0,0 +1,191 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+import miminet_network
+from network_patch import (
+    NetworkPatchError,
+    apply_patch,
+    is_layout_patch,
+    validate_patch,
+)
+
+
+def _network():
+    return {
+        "nodes": [
+            {"data": {"id": "host_1"}, "position": {"x": 1, "y": 2}},
+            {"data": {"id": "host_2"}, "position": {"x": 3, "y": 4}},
+        ],
+        "edges": [],
+        "jobs": [],
+    }
+
+
+# ---------------- apply_patch ---------------- #
+
+
+def test_apply_patch_add_replace_remove():
+    network = _network()
+
+    apply_patch(
+        network,
+        [
+            {"op": "replace", "path": "/nodes/0/position/x", "value": 10},
+            {"op": "add", "path": "/edges/-", "value": {"data": {"id": "edge_1"}}},
+            {"op": "remove", "path": "/nodes/1"},
+            {"op": "add", "path": "/nodes/0/data/label", "value": "a/b"},
+        ],
+    )
+
+    assert network["nodes"] == [
+        {"data": {"id": "host_1", "label": "a/b"}, "position": {"x": 10, "y": 2}}
+    ]
+    assert network["edges"] == [{"data": {"id": "edge_1"}}]
+
+
+def test_apply_patch_unescapes_pointer_tokens():
+    network = {"a/b": {"c~d": 1}}
+
+    apply_patch(network, [{"op": "replace", "path": "/a~1b/c~0d", "value": 2}])
+
+    assert network == {"a/b": {"c~d": 2}}
+
+
+def test_apply_patch_test_operation_mismatch():
+    with pytest.raises(NetworkPatchError):
+        apply_patch(
+            _network(), [{"op": "test", "path": "/nodes/0/data/id", "value": "x"}]
+        )
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "replace", "path": "/nodes/5/position", "value": {}},
+        {"op": "remove", "path": "/nodes/0/missing"},
+        {"op": "replace", "path": "/nodes/01", "value": {}},
+        {"op": "add", "path": "/nodes/0/data/id/x", "value": 1},
+        {"op": "remove", "path": ""},
+    ],
+)
+def test_apply_patch_rejects_paths_not_in_network(operation):
+    with pytest.raises(NetworkPatchError):
+        apply_patch(_network(), [operation])
+
+
+# ---------------- validate_patch and is_layout_patch ---------------- #
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        {"op": "add"},
+        [5],
+        [{"op": "add"}],
+        [{"op": "add", "path": "/nodes/-"}],
+        [{"op": "move", "path": "/nodes/0", "from": "/nodes/1"}],
+        [{"op": "remove", "path": 5}],
+        [{"op": "remove", "path": "nodes"}],
+    ],
+)
+def test_malformed_patch_is_rejected(patch):
+    with pytest.raises(NetworkPatchError):
+        validate_patch(patch)
+
+    with pytest.raises(NetworkPatchError):
+        apply_patch(_network(), patch)
+
+
+@pytest.mark.parametrize(
+    "patch, expected",
+    [
+        ([{"op": "replace", "path": "/nodes/0/position/x", "value": 1}], True),
+        ([{"op": "replace", "path": "/nodes/0/position", "value": {}}], True),
+        ([{"op": "replace", "path": "/nodes/0/data/label", "value": ""}], False),
+        ([{"op": "replace", "path": "/nodes/0/positions", "value": 1}], False),
+        ([{"op": "add"}], False),
+        ([5], False),
+    ],
+)
+def test_is_layout_patch(patch, expected):
+    assert is_layout_patch(patch) is expected
+
+
+# ---------------- patch_network endpoint ---------------- #
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """patch_network with the network of revision 3 and a mocked database."""
+    net = SimpleNamespace(id=1, guid="guid", revision=3, network=json.dumps(_network()))
+    network_model = MagicMock()
+    network_model.query.filter().filter().first.return_value = net
+    # Conditional UPDATE of the network revision matches one row
+    database = MagicMock()
+    database.session.query().filter().filter().update.return_value = 1
+    delete_simulations = MagicMock()
+
+    monkeypatch.setattr(miminet_network, "current_user", SimpleNamespace(id=1))
+    monkeypatch.setattr(miminet_network, "Network", network_model)
+    monkeypatch.setattr(miminet_network, "db", database)
+    monkeypatch.setattr(miminet_network, "delete_simulations", delete_simulations)
+    monkeypatch.setattr(miminet_network, "patch_layout", lambda *args: None)
+
+    app = Flask(__name__)
+
+    def call(body):
+        with app.test_request_context(
+            "/network/patch?guid=guid", method="POST", json=body
+        ):
+            response = miminet_network.patch_network.__wrapped__()
+            return response.status_code, response.get_json()
+
+    return SimpleNamespace(call=call, database=database, deleted=delete_simulations)
+
+
+def test_patch_network_rejects_malformed_patch(endpoint):
+    status, _ = endpoint.call({"revision": 3, "patch": [{"op": "add"}]})
+
+    assert status == 400
+    endpoint.database.session.commit.assert_not_called()
+
+
+def test_patch_network_stale_revision_conflicts(endpoint):
+    patch = [{"op": "replace", "path": "/nodes/0/position/x", "value": 5}]
+
+    status, body = endpoint.call({"revision": 2, "patch": patch})
+
+    assert (status, body["revision"]) == (409, 3)
+    endpoint.database.session.commit.assert_not_called()
+
+
+def test_patch_network_concurrent_update_conflicts(endpoint):
+    endpoint.database.session.query().filter().filter().update.return_value = 0
+    patch = [{"op": "replace", "path": "/nodes/0/position/x", "value": 5}]
+
+    status, _ = endpoint.call({"revision": 3, "patch": patch})
+
+    assert status == 409
+    endpoint.database.session.rollback.assert_called_once()
+
+
+def test_patch_network_layout_keeps_simulations(endpoint):
+    patch = [{"op": "replace", "path": "/nodes/0/position/x", "value": 5}]
+
+    status, body = endpoint.call({"revision": 3, "patch": patch})
+
+    assert (status, body["revision"]) == (200, 4)
+    endpoint.deleted.assert_not_called()
+
+
+def test_patch_network_schema_change_removes_simulations(endpoint):
+    patch = [{"op": "replace", "path": "/nodes/0/data/id", "value": "host_3"}]
+
+    status, _ = endpoint.call({"revision": 3, "patch": patch})
+
+    assert status == 200
+    endpoint.deleted.assert_called_once_with(1)
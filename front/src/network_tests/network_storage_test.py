@@ -0,0 +1,162 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+from sqlalchemy.dialects import postgresql
+
+import miminet_host
+import network_storage
+from miminet_model import Network, db
+from network_storage import (
+    load_network_part,
+    load_network_parts,
+    save_network_part,
+    save_network_parts,
+)
+
+
+def _network():
+    return {
+        "nodes": [{"data": {"id": "host_1"}}],
+        "edges": [],
+        "jobs": [{"id": "job_1"}, {"id": "job_2"}],
+    }
+
+
+def _compile(statement):
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return str(compiled), list(compiled.params.values())
+
+
+# ---------------- TEXT storage ---------------- #
+
+
+@pytest.fixture
+def text_storage(monkeypatch):
+    """Network 1 stored as TEXT in the in-memory database."""
+    monkeypatch.setattr(network_storage, "network_is_jsonb", lambda: False)
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+
+    with app.app_context():
+        Network.__table__.create(db.engine)
+        db.session.add(
+            Network(id=1, author_id=1, guid="guid", network=json.dumps(_network()))
+        )
+        db.session.commit()
+
+        yield
+
+        db.session.remove()
+
+
+def test_load_network_part_from_text(text_storage):
+    assert load_network_part(1, "jobs") == _network()["jobs"]
+    assert load_network_part(1, "config", {}) == {}
+    assert load_network_part(2, "jobs", []) == []
+
+
+def test_load_network_parts_from_text(text_storage):
+    assert load_network_parts(1, ("nodes", "jobs")) == {
+        "nodes": _network()["nodes"],
+        "jobs": _network()["jobs"],
+    }
+    assert load_network_parts(2, ("nodes",)) is None
+
+
+def test_save_network_parts_to_text(text_storage):
+    save_network_parts(1, {"jobs": [], "nodes": []})
+    db.session.commit()
+
+    net = db.session.get(Network, 1)
+
+    assert json.loads(net.network) == {"nodes": [], "edges": [], "jobs": []}
+    assert net.revision == 1
+
+
+# ---------------- JSONB storage ---------------- #
+
+
+@pytest.fixture
+def jsonb_storage(monkeypatch):
+    """Mocked database with the JSONB network column."""
+    database = MagicMock()
+    monkeypatch.setattr(network_storage, "network_is_jsonb", lambda: True)
+    monkeypatch.setattr(network_storage, "db", database)
+
+    return database
+
+
+def test_load_network_parts_reads_parts_by_database(jsonb_storage):
+    query = jsonb_storage.session.query
+    query.return_value.filter.return_value.first.return_value = (
+        json.dumps(_network()["jobs"]),
+        None,
+    )
+
+    parts = load_network_parts(1, ("jobs", "config"), {})
+
+    assert parts == {"jobs": _network()["jobs"], "config": {}}
+    # network->>'jobs' and network->>'config' in one query
+    assert [_compile(column) for column in query.call_args.args] == [
+        ("network.network ->> %(param_1)s::TEXT", ["jobs"]),
+        ("network.network ->> %(param_1)s::TEXT", ["config"]),
+    ]
+
+
+def test_load_network_part_of_missing_network(jsonb_storage):
+    query = jsonb_storage.session.query
+    query.return_value.filter.return_value.first.return_value = None
+
+    assert load_network_part(1, "jobs", []) == []
+
+
+def test_save_network_part_updates_part_by_database(jsonb_storage):
+    update = jsonb_storage.session.query.return_value.filter.return_value.update
+
+    save_network_part(1, "jobs", [])
+
+    values = update.call_args.args[0]
+    assert _compile(values[Network.network]) == (
+        "jsonb_set(network.network, ARRAY[%(param_1)s::VARCHAR], %(param_2)s::JSONB)",
+        ["jobs", []],
+    )
+    jsonb_storage.session.get.assert_not_called()
+
+
+# ---------------- delete_job endpoint ---------------- #
+
+
+def test_delete_job_reads_only_jobs(monkeypatch):
+    net = SimpleNamespace(id=1)
+    network_model = MagicMock()
+    network_model.query.options().filter().filter().first.return_value = net
+    saved = {}
+
+    monkeypatch.setattr(miminet_host, "current_user", SimpleNamespace(id=1))
+    monkeypatch.setattr(miminet_host, "Network", network_model)
+    monkeypatch.setattr(miminet_host, "defer", MagicMock())
+    monkeypatch.setattr(miminet_host, "db", MagicMock())
+    monkeypatch.setattr(miminet_host, "delete_simulations", MagicMock())
+    monkeypatch.setattr(
+        miminet_host, "load_network_part", lambda *args: _network()["jobs"]
+    )
+    monkeypatch.setattr(
+        miminet_host,
+        "save_network_part",
+        lambda *args: saved.update({args[1]: args[2]}),
+    )
+
+    app = Flask(__name__)
+
+    with app.test_request_context(
+        "/host/delete_job", method="POST", data={"guid": "guid", "id": "job_1"}
+    ):
+        response = miminet_host.delete_job.__wrapped__()
+
+    assert response == {"message": "Команда удалена", "jobs": [{"id": "job_2"}]}
+    assert saved == {"jobs": [{"id": "job_2"}]}
@@ -0,0 +1,148 @@
+"""Pre-flight validation and cost estimation of networks before emulation.
+
+Checks mirror the ones done by the emulation worker (back/src/emulator.py and
+back/src/network_topology.py), so invalid networks are rejected right away
+instead of occupying a worker.
+"""
+
+# Limits of the emulation worker
+MAX_JOBS_COUNT = 30
+MAX_TIME_SLEEP = 60
+
+LINK_DOWN_JOB_ID = 6
+SLEEP_JOB_ID = 7
+
+# Time (in seconds) for the worker to build and start the network
+START_TIME = 2.0
+NODE_START_TIME = 0.3
+LINK_START_TIME = 0.2
+
+# Time (in seconds) for the network configuration by spanning tree mode
+CONFIGURATION_TIME = 3.0
+RSTP_CONFIGURATION_TIME = 7.0
+STP_CONFIGURATION_TIME = 33.0
+
+# Time (in seconds) to flush captures and build the animation
+FINISH_TIME = 2.5
+
+# Typical execution time (in seconds) of jobs
+DEFAULT_JOB_TIME = 1.0
+JOB_TIME = {
+    5: 5.0,  # traceroute
+    108: 5.0,  # dhcp client
+}
+
+
+class NetworkValidationError(ValueError):
+    """Network can't be emulated."""
+
+
+def validate_network(jnet: dict) -> None:
+    """Check the network the same way the emulation worker does.
+
+    Args:
+        jnet (dict): Network JSON.
+
+    Raises:
+        NetworkValidationError: Network can't be emulated.
+    """
+
+    jobs = jnet.get("jobs", [])
+
+    if len(jobs) > MAX_JOBS_COUNT:
+        raise NetworkValidationError(
+            f"Превышен лимит! В сети максимальное количество команд ({MAX_JOBS_COUNT}). "
+            f"Текущее количество: {len(jobs)}"
+        )
+
+    if not 0 <= sleep_time(jobs) <= MAX_TIME_SLEEP:
+        raise NetworkValidationError(
+            f"Превышен лимит! В сети максимальное количество команд sleep {MAX_TIME_SLEEP})."
+        )
+
+    # Network without jobs isn't started at all
+    if not jobs:
+        return
+
+    nodes = {node["data"]["id"]: node for node in jnet.get("nodes", [])}
+
+    for edge in jnet.get("edges", []):
+        edge_id = edge["data"]["id"]
+
+        for end in ("source", "target"):
+            node = nodes.get(edge["data"][end])
+
+            if not node:
+                raise NetworkValidationError(
+                    f"Соединение {edge_id} ведет к несуществующему устройству."
+                )
+
+            matches = [
+                iface
+                for iface in node.get("interface", [])
+                if iface["connect"] == edge_id
+            ]
+
+            if len(matches) != 1:
+                raise NetworkValidationError(
+                    f"Не найден интерфейс соединения {edge_id} "
+                    f"у устройства {node['data']['id']}."
+                )
+
+
+def sleep_time(jobs: list[dict]) -> int:
+    """Total time of sleep jobs (in seconds)."""
+    try:
+        return sum(int(job["arg_1"]) for job in jobs if job["job_id"] == SLEEP_JOB_ID)
+    except (KeyError, TypeError, ValueError):
+        raise NetworkValidationError("Неверное время в команде sleep.")
+
+
+def estimate_emulation_time(jnet: dict) -> float:
+    """Predict emulation duration (in seconds) on the worker.
+
+    Jobs of different hosts are executed concurrently, so the longest host
+    determines the time. Sleep jobs stop the whole network.
+
+    Args:
+        jnet (dict): Valid network JSON.
+
+    Returns:
+        float: Estimated emulation time.
+    """
+
+    jobs = jnet.get("jobs", [])
+
+    if not jobs:
+        return 0.0
+
+    nodes = jnet.get("nodes", [])
+    stp_modes = {node["config"].get("stp", 0) for node in nodes}
+
+    if 1 in stp_modes:
+        configuration_time = STP_CONFIGURATION_TIME
+    elif 2 in stp_modes:
+        configuration_time = RSTP_CONFIGURATION_TIME
+    else:
+        configuration_time = CONFIGURATION_TIME
+
+    host_time: dict[str, float] = {}
+
+    for job in jobs:
+        if job["job_id"] in (SLEEP_JOB_ID, LINK_DOWN_JOB_ID):
+            continue
+
+        host_id = job.get("host_id", "")
+        host_time[host_id] = host_time.get(host_id, 0.0) + JOB_TIME.get(
+            job["job_id"], DEFAULT_JOB_TIME
+        )
+
+    return (
+        START_TIME
+        + NODE_START_TIME * len(nodes)
+        + LINK_START_TIME * len(jnet.get("edges", []))
+        + configuration_time
+        + max(host_time.values(), default=0.0)
+        + sleep_time(jobs)
+        + FINISH_TIME
+    )
@@ -0,0 +1,235 @@
+"""Pcap files received from the emulation workers.
+
+Workers with a shared artifact store (artifact_dir) send only descriptions
+of pcaps {"sha256", "size", "name"}, the files are copied from the store.
+Otherwise pcaps come inside the result message as [bytes, name] pairs.
+
+Pcaps are kept gzip-compressed as static/pcaps/<guid>/<iface>.pcap.gz,
+uncompressed <iface>.pcap files of old simulations are read as well.
+Hashes of the saved captures are kept in the manifest of the directory,
+so re-simulation replaces only the captures that have changed.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+# Directory shared with the emulation workers (empty - pcaps come in messages)
+ARTIFACT_DIR = os.getenv("artifact_dir", "")
+
+CHUNK_SIZE = 1024 * 1024
+
+PCAP_SUFFIX = ".pcap"
+COMPRESSED_PCAP_SUFFIX = ".pcap.gz"
+
+# Pcaps compress well, higher levels only slow down saving of results
+COMPRESS_LEVEL = 6
+
+JSON_SUFFIX = ".json"
+MANIFEST_NAME = "manifest.sha256.json"
+
+
+class ArtifactError(Exception):
+    """Artifact is missing or damaged."""
+
+
+def copy_artifact(artifact: dict, dest_path: str, artifact_dir: str = ARTIFACT_DIR):
+    """Copy pcap from the artifact store checking its size and hash.
+
+    Destination file is compressed and replaced atomically.
+
+    Raises:
+        ArtifactError: Artifact is missing or doesn't match its description.
+    """
+
+    src_path = os.path.join(artifact_dir, artifact["sha256"] + ".pcap")
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix=".tmp")
+
+    try:
+        with open(src_path, "rb") as src, os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+            fileobj=raw, mode="wb", compresslevel=COMPRESS_LEVEL
+        ) as dest:
+            while chunk := src.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                dest.write(chunk)
+
+        if size != artifact["size"] or digest.hexdigest() != artifact["sha256"]:
+            raise ArtifactError(f"Артефакт {artifact['sha256']} поврежден.")
+
+        os.replace(tmp_path, dest_path)
+    except OSError as e:
+        raise ArtifactError(f"Артефакт {artifact['sha256']} недоступен: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_pcap(pcap, pcap_dir: str) -> None:
+    """Save compressed pcap of the emulation result to pcap_dir/<name>.pcap.gz.
+
+    The file is replaced atomically.
+
+    Args:
+        pcap: Artifact description (dict) or [bytes, name] pair.
+        pcap_dir (str): Directory of the network pcaps.
+
+    Raises:
+        ArtifactError: Artifact is missing or damaged.
+    """
+
+    if isinstance(pcap, dict):
+        copy_artifact(
+            pcap, os.path.join(pcap_dir, pcap["name"] + COMPRESSED_PCAP_SUFFIX)
+        )
+        return
+
+    data, name = pcap
+    fd, tmp_path = tempfile.mkstemp(dir=pcap_dir, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+            fileobj=raw, mode="wb", compresslevel=COMPRESS_LEVEL
+        ) as file:
+            file.write(data)
+
+        os.replace(tmp_path, os.path.join(pcap_dir, name + COMPRESSED_PCAP_SUFFIX))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def pcap_name(pcap) -> str:
+    return pcap["name"] if isinstance(pcap, dict) else pcap[1]
+
+
+def pcap_digest(pcap) -> str:
+    """sha256 of the uncompressed capture."""
+    if isinstance(pcap, dict):
+        return pcap["sha256"]
+
+    return hashlib.sha256(pcap[0]).hexdigest()
+
+
+def load_manifest(pcap_dir: str) -> dict[str, str]:
+    """Interface name -> sha256 of its saved capture."""
+    try:
+        with open(os.path.join(pcap_dir, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(pcap_dir: str, manifest: dict[str, str]) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=pcap_dir, suffix=".tmp")
+
+    with os.fdopen(fd, "w") as file:
+        json.dump(manifest, file)
+
+    os.replace(tmp_path, os.path.join(pcap_dir, MANIFEST_NAME))
+
+
+def remove_pcap(pcap_dir: str, iface: str, keep_compressed: bool = False) -> None:
+    """Remove capture of the interface and the JSON derived from it."""
+    suffixes = [PCAP_SUFFIX, JSON_SUFFIX]
+
+    if not keep_compressed:
+        suffixes.append(COMPRESSED_PCAP_SUFFIX)
+
+    for suffix in suffixes:
+        try:
+            os.remove(os.path.join(pcap_dir, iface + suffix))
+        except FileNotFoundError:
+            pass
+
+
+def update_pcaps(pcaps: list, pcap_dir: str) -> None:
+    """Save pcaps of the emulation result replacing only changed captures.
+
+    Unchanged captures and JSON files derived from them are kept. Captures
+    of interfaces that are no longer in the network are removed.
+
+    Args:
+        pcaps (list): Artifact descriptions (dict) or [bytes, name] pairs.
+        pcap_dir (str): Directory of the network pcaps.
+    """
+
+    os.makedirs(pcap_dir, exist_ok=True)
+
+    old_manifest = load_manifest(pcap_dir)
+    manifest = {}
+
+    for pcap in pcaps:
+        iface = pcap_name(pcap)
+        digest = pcap_digest(pcap)
+
+        if old_manifest.get(iface) == digest and pcap_path(pcap_dir, iface):
+            manifest[iface] = digest
+            continue
+
+        try:
+            save_pcap(pcap, pcap_dir)
+        except (ArtifactError, OSError) as e:
+            logging.error(f"Не удалось сохранить pcap {iface}: {e}")
+            remove_pcap(pcap_dir, iface)
+            continue
+
+        # JSON of the old capture is built again by MimiShark
+        remove_pcap(pcap_dir, iface, keep_compressed=True)
+        manifest[iface] = digest
+
+    for iface in list_pcaps(pcap_dir):
+        if iface not in manifest:
+            remove_pcap(pcap_dir, iface)
+
+    save_manifest(pcap_dir, manifest)
+
+
+def pcap_path(pcap_dir: str, iface: str) -> str | None:
+    """Path of the interface pcap (compressed or not), None if there is no pcap."""
+    # Interface name comes from the request
+    if os.path.basename(iface) != iface:
+        return None
+
+    for suffix in (COMPRESSED_PCAP_SUFFIX, PCAP_SUFFIX):
+        path = os.path.join(pcap_dir, iface + suffix)
+
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def open_pcap(path: str):
+    """Open pcap for reading, compressed pcaps are decompressed on the fly."""
+    if path.endswith(COMPRESSED_PCAP_SUFFIX):
+        return gzip.open(path, "rb")
+
+    return open(path, "rb")
+
+
+def list_pcaps(pcap_dir: str) -> list[str]:
+    """Interface names of all pcaps in the directory."""
+    if not os.path.isdir(pcap_dir):
+        return []
+
+    ifaces = set()
+
+    for entry in os.scandir(pcap_dir):
+        if not entry.is_file():
+            continue
+
+        for suffix in (COMPRESSED_PCAP_SUFFIX, PCAP_SUFFIX):
+            if entry.name.endswith(suffix):
+                ifaces.add(entry.name[: -len(suffix)])
+                break
+
+    return sorted(ifaces)
@@ -0,0 +1,60 @@
+"""Emulation queue status shown to users waiting for their simulation.
+
+Every browser tab polls the queue size. The size is one COUNT over the
+partial index of unfinished simulations, so finished simulations leave the
+queue as soon as their logs are marked ready. The last start time is the same
+for all tabs and is kept in the web server process for STATUS_TTL.
+"""
+
+import datetime
+import threading
+import time
+
+from miminet_model import SimulateLog, db
+from sqlalchemy import func, not_
+
+# Last start time is read from the database at most once per this time (in seconds)
+STATUS_TTL = 2.0
+
+
+class QueueStatus:
+    def __init__(self, ttl: float = STATUS_TTL):
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__updated: float | None = None
+        self.__last_start: datetime.datetime | None = None
+
+    def last_start(self) -> datetime.datetime | None:
+        """Start time of the last simulation."""
+        with self.__lock:
+            if self.__updated is None or (
+                time.monotonic() - self.__updated >= self.__ttl
+            ):
+                # Uses the simulate_start index
+                self.__last_start = db.session.query(
+                    func.max(SimulateLog.simulate_start)
+                ).scalar()
+                self.__updated = time.monotonic()
+
+            return self.__last_start
+
+    @staticmethod
+    def pending_before(time_filter: datetime.datetime) -> int:
+        """Number of unfinished simulations started not later than time_filter."""
+        # Index-only scan of ix_simulate_log_pending
+        return (
+            db.session.query(func.count())
+            .select_from(SimulateLog)
+            .filter(not_(SimulateLog.ready))
+            .filter(SimulateLog.simulate_start <= time_filter)
+            .scalar()
+        )
+
+    def add_started(self, start: datetime.datetime) -> None:
+        """Show the simulation started by this process before the next refresh."""
+        with self.__lock:
+            if self.__last_start is None or start > self.__last_start:
+                self.__last_start = start
+
+
+QUEUE_STATUS = QueueStatus()
@@ -387,9 +387,11 @@ def answer_on_session_question(session_question_id: str, answer, user: User):
                     else modifications_json
                 )
 
+                from emulation_dispatcher import INTERACTIVE_LANE
                 from tasks import create_emulation_task
 
-                animation = create_emulation_task(network_json)
+                # User waits for the answer
+                animation = create_emulation_task(network_json, INTERACTIVE_LANE)
                 networks_to_check.append(
                     (network_json, animation, req_json, modifications_json)
                 )
@@ -0,0 +1,112 @@
+"""Notifications about finished simulations.
+
+The results worker publishes the id of every finished simulation to a fanout
+exchange. Every web server process has one listener thread consuming them,
+so status polls of finished simulations are answered without the database.
+"""
+
+import logging
+import socket
+import threading
+import time
+import uuid
+
+from celery_app import SIMULATION_EVENTS_EXCHANGE, app
+from kombu import Queue
+
+# Timeout of waiting for broker events, then the heartbeat is checked (in seconds)
+DRAIN_TIMEOUT = 20.0
+
+# Delay before reconnection of the listener to the broker (in seconds)
+RECONNECT_DELAY = 5.0
+
+# Number of finished simulation ids remembered by every process
+MAX_FINISHED = 10000
+
+
+def publish_simulation_ready(simulation_id: int) -> None:
+    """Notify web server processes that the simulation is finished."""
+    try:
+        with app.producer_or_acquire() as producer:
+            producer.publish(
+                {"simulation_id": simulation_id},
+                exchange=SIMULATION_EVENTS_EXCHANGE,
+                routing_key="",
+                declare=[SIMULATION_EVENTS_EXCHANGE],
+                serializer="json",
+                retry=True,
+            )
+    except Exception as e:
+        # Status of the simulation is still taken from the database
+        logging.error(f"Не удалось отправить уведомление о симуляции: {e}")
+
+
+class SimulationListener:
+    """Remember simulations finished recently inside the web server process."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED):
+        self.__lock = threading.Lock()
+        # Ids of finished simulations in the order of notifications
+        self.__finished: dict[int, None] = {}
+        self.__max_finished = max_finished
+        self.__thread: threading.Thread | None = None
+
+    def is_finished(self, simulation_id: int) -> bool:
+        """Check whether the simulation is reported as finished.
+
+        False doesn't mean the simulation is running: notifications sent
+        before the listener has started or while it was disconnected are lost.
+        """
+        with self.__lock:
+            self.__start()
+            return simulation_id in self.__finished
+
+    def __start(self) -> None:
+        # Started on the first request: threads don't survive fork of uWSGI workers
+        if self.__thread and self.__thread.is_alive():
+            return
+
+        self.__thread = threading.Thread(target=self.__listen, daemon=True)
+        self.__thread.start()
+
+    def __listen(self) -> None:
+        queue = Queue(
+            f"simulation-events-{uuid.uuid4()}",
+            exchange=SIMULATION_EVENTS_EXCHANGE,
+            exclusive=True,
+            auto_delete=True,
+            durable=False,
+        )
+
+        while True:
+            try:
+                with app.connection_for_read() as conn:
+                    with conn.Consumer(
+                        queue,
+                        callbacks=[self.__on_message],
+                        accept=["json"],
+                        no_ack=True,
+                    ):
+                        while True:
+                            try:
+                                conn.drain_events(timeout=DRAIN_TIMEOUT)
+                            except socket.timeout:
+                                conn.heartbeat_check()
+            except Exception as e:
+                logging.error(f"Потеряно соединение с очередью уведомлений: {e}")
+                time.sleep(RECONNECT_DELAY)
+
+    def __on_message(self, body, message) -> None:
+        simulation_id = body.get("simulation_id") if isinstance(body, dict) else None
+
+        if not isinstance(simulation_id, int):
+            return
+
+        with self.__lock:
+            self.__finished[simulation_id] = None
+
+            if len(self.__finished) > self.__max_finished:
+                del self.__finished[next(iter(self.__finished))]
+
+
+SIMULATION_LISTENER = SimulationListener()
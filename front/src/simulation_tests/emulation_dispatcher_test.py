@@ -0,0 +1,76 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+import emulation_dispatcher
+from emulation_dispatcher import (
+    BULK_LANE,
+    INTERACTIVE_LANE,
+    QueueLoad,
+    choose_queue,
+)
+
+LANES = {INTERACTIVE_LANE: ["queue1", "queue2"], BULK_LANE: ["queue3"]}
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Lane queues with idle workers, every broker request is recorded."""
+    state = SimpleNamespace(requests=[], down=False)
+
+    def queue_depth(queues):
+        state.requests.append(queues)
+        if state.down:
+            raise ConnectionError("broker is down")
+        return {queue: (0, 1) for queue in queues}
+
+    monkeypatch.setattr(emulation_dispatcher, "LANE_QUEUES", LANES)
+    monkeypatch.setattr(
+        emulation_dispatcher,
+        "STATIC_QUEUES",
+        {lane: itertools.cycle(queues) for lane, queues in LANES.items()},
+    )
+    monkeypatch.setattr(emulation_dispatcher, "queue_depth", queue_depth)
+    monkeypatch.setattr(emulation_dispatcher, "pending_time", lambda queues: {})
+    monkeypatch.setattr(emulation_dispatcher, "QUEUE_LOAD", QueueLoad(ttl=60))
+
+    return state
+
+
+def test_queue_depths_are_cached(broker):
+    choose_queue(INTERACTIVE_LANE)
+    choose_queue(INTERACTIVE_LANE)
+    choose_queue(BULK_LANE)
+
+    assert broker.requests == [["queue1", "queue2", "queue3"]]
+
+
+def test_sent_tasks_are_counted_before_refresh(broker):
+    chosen = []
+
+    for _ in range(4):
+        queue = choose_queue(INTERACTIVE_LANE)
+        emulation_dispatcher.QUEUE_LOAD.add_sent(queue, INTERACTIVE_LANE, 10.0)
+        chosen.append(queue)
+
+    assert sorted(chosen) == ["queue1", "queue1", "queue2", "queue2"]
+
+
+def test_busy_interactive_queue_is_not_borrowed(broker):
+    choose_queue(BULK_LANE)
+    emulation_dispatcher.QUEUE_LOAD.add_sent("queue1", INTERACTIVE_LANE, None)
+    emulation_dispatcher.QUEUE_LOAD.add_sent("queue3", BULK_LANE, None)
+
+    assert choose_queue(BULK_LANE) == "queue2"
+
+
+def test_static_queues_when_broker_is_down(broker):
+    broker.down = True
+
+    chosen = [choose_queue(INTERACTIVE_LANE) for _ in range(3)]
+
+    assert chosen == ["queue1", "queue2", "queue1"]
+    assert choose_queue(BULK_LANE) == "queue3"
+    # Broker isn't asked again until the cache expires
+    assert len(broker.requests) == 1
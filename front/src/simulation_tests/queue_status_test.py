@@ -0,0 +1,76 @@
+import datetime
+
+import pytest
+from flask import Flask
+
+from miminet_model import SimulateLog, db
+from queue_status import QueueStatus
+
+START = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _start(seconds: int) -> datetime.datetime:
+    return START + datetime.timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def simulations():
+    """Simulations started at 0, 10 and 20 seconds, the first one is finished."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+
+    with app.app_context():
+        SimulateLog.__table__.create(db.engine)
+
+        for i, ready in enumerate((True, False, False)):
+            db.session.add(
+                SimulateLog(
+                    id=i + 1,
+                    author_id=1,
+                    network_guid="guid",
+                    simulate_start=_start(10 * i),
+                    ready=ready,
+                )
+            )
+
+        db.session.commit()
+
+        yield
+
+        db.session.remove()
+
+
+def test_pending_before_counts_unfinished_simulations(simulations):
+    status = QueueStatus()
+
+    assert status.pending_before(_start(-1)) == 0
+    assert status.pending_before(_start(10)) == 1
+    assert status.pending_before(_start(30)) == 2
+
+
+def test_finished_simulation_leaves_queue_right_away(simulations):
+    status = QueueStatus()
+    assert status.pending_before(_start(30)) == 2
+
+    # save_simulate_result marks the log ready
+    SimulateLog.query.filter(SimulateLog.id == 2).update({"ready": True})
+    db.session.commit()
+
+    assert status.pending_before(_start(30)) == 1
+
+
+def test_last_start_is_cached(simulations):
+    status = QueueStatus(ttl=60)
+    assert status.last_start() == _start(20)
+
+    db.session.add(
+        SimulateLog(id=4, author_id=1, network_guid="guid", simulate_start=_start(30))
+    )
+    db.session.commit()
+
+    assert status.last_start() == _start(20)
+
+    status.add_started(_start(40))
+
+    assert status.last_start() == _start(40)
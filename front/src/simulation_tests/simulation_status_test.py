@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+import miminet_simulation
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """simulation_status with a mocked database and listener."""
+    database = MagicMock()
+    finished: set[int] = set()
+
+    monkeypatch.setattr(miminet_simulation, "db", database)
+    monkeypatch.setattr(
+        miminet_simulation,
+        "SIMULATION_LISTENER",
+        SimpleNamespace(is_finished=lambda sim_id: sim_id in finished),
+    )
+
+    app = Flask(__name__)
+
+    def call(sim_id, ready_in_db=None):
+        query = database.session.query.return_value
+        query.filter.return_value.scalar.return_value = ready_in_db
+
+        with app.test_request_context(f"/simulation_status?simulation_id={sim_id}"):
+            response = miminet_simulation.simulation_status.__wrapped__()
+            return response.status_code, response.get_json()
+
+    return SimpleNamespace(call=call, database=database, finished=finished)
+
+
+def test_finished_simulation_is_answered_from_notifications(endpoint):
+    endpoint.finished.add(1)
+
+    assert endpoint.call(1) == (200, {"ready": True})
+    endpoint.database.session.query.assert_not_called()
+
+
+@pytest.mark.parametrize("ready", [True, False])
+def test_status_is_read_from_database(endpoint, ready):
+    assert endpoint.call(1, ready_in_db=ready) == (200, {"ready": ready})
+    # Session of the request stays open
+    endpoint.database.session.close.assert_not_called()
+
+
+def test_unknown_simulation(endpoint):
+    status, _ = endpoint.call(1, ready_in_db=None)
+
+    assert status == 400
@@ -406,4 +406,50 @@ var PacketPlayer = (function () {
             return instance || (instance = createInstance());
         }
     }
-})();
\ No newline at end of file
+})();
+// Expand compact animation (see back/src/animation_format.py) into packet groups.
+// Legacy animation (list of packet groups) is returned as is.
+const DecodeAnimation = function (animation){
+
+    if (!animation || Array.isArray(animation) || animation.format !== 'compact'){
+        return animation;
+    }
+
+    let edges = animation.edges.map(function (edge){
+        return {
+            'path': edge[0],
+            'source': edge[1],
+            'target': edge[2],
+            'loss_percentage': edge[3],
+            'duplicate_percentage': edge[4],
+            'id_prefix': edge[5]
+        };
+    });
+
+    let pkt_num = 0;
+
+    return animation.frames.map(function (frame){
+        return frame.map(function (row){
+            let edge = edges[row[0]];
+            let label = animation.labels[row[1]];
+
+            pkt_num++;
+
+            // Version 1 has no packet ids, packets are numbered in order
+            let id = row.length > 3 ? edge.id_prefix + row[3] : 'pkt_' + pkt_num;
+
+            return {
+                'data': {'id': id, 'label': label, 'type': 'packet'},
+                'config': {
+                    'type': label,
+                    'path': edge.path,
+                    'source': edge.source,
+                    'target': edge.target,
+                    'loss_percentage': edge.loss_percentage,
+                    'duplicate_percentage': edge.duplicate_percentage
+                },
+                'timestamp': animation.start + row[2]
+            };
+        });
+    });
+}
@@ -478,18 +478,129 @@ const InterfaceUid = function(){
     return "iface_" + Math.random().toString(9).substring(2, 10);
 }
 
-const PostNodesEdges = function(){
+// Network schema as it is stored on the server (revision network_revision).
+// Changes are sent as JSON Patch against it.
+let syncedNetwork = null;
+
+const CurrentNetwork = function(){
+    return JSON.parse(JSON.stringify({nodes: nodes, edges: edges, jobs: jobs}));
+}
+
+const SnapshotNetwork = function(){
+    syncedNetwork = CurrentNetwork();
+}
+
+const EscapePointer = function(token){
+    return String(token).replace(/~/g, '~0').replace(/\//g, '~1');
+}
+
+// Add JSON Patch operations turning oldValue into newValue
+const DiffJson = function(path, oldValue, newValue, patch){
+    if (JSON.stringify(oldValue) === JSON.stringify(newValue)) {
+        return;
+    }
+
+    const isObject = v => v !== null && typeof v === 'object' && !Array.isArray(v);
+
+    if (Array.isArray(oldValue) && Array.isArray(newValue)) {
+        const common = Math.min(oldValue.length, newValue.length);
+
+        for (let i = 0; i < common; i++) {
+            DiffJson(path + '/' + i, oldValue[i], newValue[i], patch);
+        }
+
+        for (let i = oldValue.length - 1; i >= common; i--) {
+            patch.push({op: 'remove', path: path + '/' + i});
+        }
+
+        for (let i = common; i < newValue.length; i++) {
+            patch.push({op: 'add', path: path + '/' + i, value: newValue[i]});
+        }
+
+        return;
+    }
+
+    if (isObject(oldValue) && isObject(newValue)) {
+        for (const key of Object.keys(oldValue)) {
+            if (!(key in newValue)) {
+                patch.push({op: 'remove', path: path + '/' + EscapePointer(key)});
+            }
+        }
+
+        for (const key of Object.keys(newValue)) {
+            if (key in oldValue) {
+                DiffJson(path + '/' + EscapePointer(key), oldValue[key], newValue[key], patch);
+            } else {
+                patch.push({op: 'add', path: path + '/' + EscapePointer(key), value: newValue[key]});
+            }
+        }
+
+        return;
+    }
+
+    patch.push({op: 'replace', path: path, value: newValue});
+}
+
+// Send only changes of the network. If the server has another revision,
+// send the whole network with postWhole.
+const SyncNetwork = function(postWhole){
+    const current = CurrentNetwork();
+
+    if (syncedNetwork === null || typeof network_revision === 'undefined') {
+        postWhole(current);
+        return;
+    }
+
+    let patch = [];
+    DiffJson('', syncedNetwork, current, patch);
+
+    if (!patch.length) {
+        return;
+    }
+
+    $.ajax({
+        type: 'POST',
+        url: '/network/patch?guid=' + network_guid,
+        data: JSON.stringify({revision: network_revision, patch: patch}),
+        success: function(data) {
+            network_revision = data.revision;
+            syncedNetwork = current;
+        },
+        error: function(xhr) {
+            if (xhr.status === 409) {
+                postWhole(current);
+            } else {
+                console.log('Cannot patch network');
+            }
+        },
+        contentType: "application/json",
+        dataType: 'json'
+    });
+}
+
+const OnWholeNetworkPosted = function(current, data){
+    if (data && data.revision !== undefined) {
+        network_revision = data.revision;
+        syncedNetwork = current;
+    }
+}
+
+const PostWholeNetwork = function(current){
     $.ajax({
         type: 'POST',
         url: '/post_nodes_edges?guid=' + network_guid,
-        data: JSON.stringify([nodes, edges, jobs]),
-        success: function(data) {},
+        data: JSON.stringify([current.nodes, current.edges, current.jobs]),
+        success: function(data) {OnWholeNetworkPosted(current, data)},
         error: function(err) {console.log('Cannot post edges to server')},
         contentType: "application/json",
         dataType: 'json'
     });
 }
 
+const PostNodesEdges = function(){
+    SyncNetwork(PostWholeNetwork);
+}
+
 const AddEdge = function(source_id, target_id){
 
         let source_node = nodes.find(n => n.data.id === source_id);
@@ -728,19 +839,37 @@ const PostNodes = function(){
     });
 }
 
-const MoveNodes = function(){
+// Post node positions only. Unsent changes of edges and jobs need the whole network.
+const PostNodePositions = function(current){
+    if (syncedNetwork === null ||
+        JSON.stringify([current.edges, current.jobs]) !== JSON.stringify([syncedNetwork.edges, syncedNetwork.jobs])) {
+        PostWholeNetwork(current);
+        return;
+    }
 
     $.ajax({
         type: 'POST',
         url: '/move_network_nodes?guid=' + network_guid,
-        data: JSON.stringify(nodes),
-        success: function(data) {},
+        data: JSON.stringify(current.nodes),
+        success: function(data) {
+            if (data && data.revision !== undefined) {
+                network_revision = data.revision;
+            }
+
+            // Edges and jobs on the server may differ after a conflict,
+            // the next change is sent with the whole network
+            syncedNetwork = null;
+        },
         error: function(err) {console.log('Cannot post nodes to server')},
         contentType: "application/json",
         dataType: 'json'
     });
 }
 
+const MoveNodes = function(){
+    SyncNetwork(PostNodePositions);
+}
+
 const prepareStylesheet = function() {
     const getColor = function(ele) {
         if (ele.group() === "edges") {
@@ -1497,7 +1626,7 @@ const CheckSimulation = function (simulation_id)
             // Simulation is ended up and we can grab the packets
             if (xhr.status === 200)
             {
-                packets = JSON.parse(data.packets);
+                packets = DecodeAnimation(JSON.parse(data.packets));
                 pcaps = data.pcaps;
 
                 // Set filters
@@ -1521,6 +1650,36 @@ const CheckSimulation = function (simulation_id)
     });
 }
 
+// Status poll of the last started simulation
+let simulationStatusTimer = null;
+
+// Poll the cheap simulation status until the simulation is over, then grab the packets once.
+const WaitSimulation = function (simulation_id)
+{
+    clearTimeout(simulationStatusTimer);
+
+    $.ajax({
+        type: 'GET',
+        url: '/simulation_status?simulation_id=' + simulation_id,
+        data: '',
+        success: function(data) {
+            if (data.ready) {
+                CheckSimulation(simulation_id);
+            } else {
+                simulationStatusTimer = setTimeout(WaitSimulation, 2000, simulation_id);
+            }
+        },
+        error: function(xhr) {
+            console.log('Cannot get status of simulation id = ' + simulation_id);
+            if (lastSimulationId == simulation_id){
+                SetNetworkPlayerState(-1);
+            }
+        },
+        contentType: "application/json",
+        dataType: 'json'
+    });
+}
+
 // Update edge configuration
 const UpdateEdgeConfiguration = (data) => {
     SetNetworkPlayerState(-1);
@@ -2151,15 +2310,19 @@ const RunSimulation = function (network_guid)
             {
                 lastSimulationId = data.simulation_id
                 console.log("Simulation is running!");
-                // Ok, run CheckSimulation
+                // Ok, wait for the simulation result
                 if (data.simulation_id)
                 {
-                    CheckSimulation(data.simulation_id);
+                    WaitSimulation(data.simulation_id);
                 }
             }
         },
         error: function(err) {
             console.log('Cannot run simulation guid = ' + network_guid);
+            // Network is rejected by pre-flight validation
+            if (err.responseJSON && err.responseJSON.message) {
+                console.log(err.responseJSON.message);
+            }
             SetNetworkPlayerState(-1);
         },
         contentType: "application/json",
@@ -2392,7 +2555,7 @@ const SetNetworkPlayerState = function (simulation_id) {
         $('#PacketSliderInput').hide();
         $('#NetworkPlayer').append('<button type="button" class="btn btn-primary w-100" id="NetworkEmulateButton" disabled>Эмулируется...</button>');
         InsertWaitingTime()
-        CheckSimulation(simulation_id);
+        WaitSimulation(simulation_id);
         return;
     }
 
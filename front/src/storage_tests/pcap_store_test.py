@@ -0,0 +1,98 @@
+import functools
+import gzip
+import hashlib
+import os
+
+import pcap_store
+from pcap_store import load_manifest, pcap_path, update_pcaps
+
+
+def _read_pcap(pcap_dir, iface):
+    with pcap_store.open_pcap(pcap_path(str(pcap_dir), iface)) as file:
+        return file.read()
+
+
+def test_update_pcaps_saves_compressed_captures_and_manifest(tmp_path):
+    update_pcaps([[b"first", "host_1_1"], [b"second", "host_2_1"]], str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "host_1_1.pcap.gz",
+        "host_2_1.pcap.gz",
+        pcap_store.MANIFEST_NAME,
+    ]
+    assert _read_pcap(tmp_path, "host_1_1") == b"first"
+    assert load_manifest(str(tmp_path)) == {
+        "host_1_1": hashlib.sha256(b"first").hexdigest(),
+        "host_2_1": hashlib.sha256(b"second").hexdigest(),
+    }
+
+
+def test_update_pcaps_keeps_unchanged_captures(tmp_path, monkeypatch):
+    update_pcaps([[b"same", "host_1_1"], [b"old", "host_2_1"]], str(tmp_path))
+    # MimiShark JSON of the unchanged capture stays valid
+    (tmp_path / "host_1_1.json").write_text("[]")
+    (tmp_path / "host_2_1.json").write_text("[]")
+
+    saved = []
+    save_pcap = pcap_store.save_pcap
+    monkeypatch.setattr(
+        pcap_store,
+        "save_pcap",
+        lambda pcap, pcap_dir: saved.append(pcap[1]) or save_pcap(pcap, pcap_dir),
+    )
+    update_pcaps([[b"same", "host_1_1"], [b"new", "host_2_1"]], str(tmp_path))
+
+    assert saved == ["host_2_1"]
+    assert (tmp_path / "host_1_1.json").exists()
+    assert not (tmp_path / "host_2_1.json").exists()
+    assert _read_pcap(tmp_path, "host_2_1") == b"new"
+
+
+def test_update_pcaps_removes_captures_of_removed_interfaces(tmp_path):
+    update_pcaps([[b"a", "host_1_1"], [b"b", "host_2_1"]], str(tmp_path))
+    (tmp_path / "host_2_1.json").write_text("[]")
+    # Uncompressed capture of an old simulation
+    (tmp_path / "host_3_1.pcap").write_bytes(b"c")
+
+    update_pcaps([[b"a", "host_1_1"]], str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "host_1_1.pcap.gz",
+        pcap_store.MANIFEST_NAME,
+    ]
+    assert list(load_manifest(str(tmp_path))) == ["host_1_1"]
+
+
+def test_update_pcaps_saves_capture_missing_on_disk(tmp_path):
+    update_pcaps([[b"a", "host_1_1"]], str(tmp_path))
+    os.remove(tmp_path / "host_1_1.pcap.gz")
+
+    update_pcaps([[b"a", "host_1_1"]], str(tmp_path))
+
+    assert _read_pcap(tmp_path, "host_1_1") == b"a"
+
+
+def test_update_pcaps_copies_artifacts(tmp_path, monkeypatch):
+    artifact_dir = tmp_path / "artifacts"
+    artifact_dir.mkdir()
+    digest = hashlib.sha256(b"capture").hexdigest()
+    (artifact_dir / (digest + ".pcap")).write_bytes(b"capture")
+    monkeypatch.setattr(
+        pcap_store,
+        "copy_artifact",
+        functools.partial(pcap_store.copy_artifact, artifact_dir=str(artifact_dir)),
+    )
+
+    pcap_dir = tmp_path / "pcaps"
+    update_pcaps(
+        [
+            {"sha256": digest, "size": 7, "name": "host_1_1"},
+            {"sha256": digest, "size": 8, "name": "host_2_1"},
+        ],
+        str(pcap_dir),
+    )
+
+    assert gzip.decompress((pcap_dir / "host_1_1.pcap.gz").read_bytes()) == b"capture"
+    # Damaged artifact isn't saved
+    assert pcap_path(str(pcap_dir), "host_2_1") is None
+    assert list(load_manifest(str(pcap_dir))) == ["host_1_1"]
@@ -1,18 +1,23 @@
-import os
-import shutil
-import uuid
 import logging
 import json
+import uuid
 
+from sqlalchemy import not_
 from sqlalchemy.orm.exc import StaleDataError
 
-from celery_app import (
-    SEND_NETWORK_EXCHANGE,
-    EXCHANGE_TYPE,
-    app,
-)
+from celery_app import app
+from emulation_dispatcher import BULK_LANE, send_emulation_task
+from pcap_store import update_pcaps
+from simulation_events import publish_simulation_ready
 from app import app as flask_app
-from miminet_model import Simulate, SimulateLog, db, Network
+from miminet_model import (
+    CheckTask,
+    CheckTaskScenario,
+    Simulate,
+    SimulateLog,
+    db,
+    Network,
+)
 from celery.result import AsyncResult, allow_join_result
 from celery.exceptions import TimeoutError
 
@@ -21,6 +26,10 @@ from quiz.service.session_question_service import (
     answer_on_exam_without_session,
 )
 
+# Scenarios without emulation result after this time (in seconds) are scored
+# as failed emulations, so lost results don't block the check forever
+CHECK_TIMEOUT = 10 * 60
+
 
 @app.task(bind=True, queue="common-results-queue")
 def save_simulate_result(self, animation, pcaps):
@@ -45,17 +54,7 @@ def save_simulate_result(self, animation, pcaps):
 
         pcap_dir = "static/pcaps/" + net.guid
 
-        if not os.path.exists(pcap_dir):
-            os.makedirs(pcap_dir)
-            print("Created pcap dir", pcap_dir)
-        else:
-            shutil.rmtree(pcap_dir)
-            os.makedirs(pcap_dir)
-
-        for pcap in pcaps:
-            name = pcap[1]
-            with open(pcap_dir + "/" + name + ".pcap", "wb") as file:
-                file.write(pcap[0])
+        update_pcaps(pcaps, pcap_dir)
 
         try:
             sim.packets = animation
@@ -66,20 +65,29 @@ def save_simulate_result(self, animation, pcaps):
         except StaleDataError:
             return
 
+        publish_simulation_ready(sim.id)
+
 
 @app.task(name="tasks.check_task_network", queue="task-checking-queue")
 def perform_task_check(session_question_id, data_list):
-    """Celery task for checking practice tasks. Write results to database.
+    """Celery task for checking practice tasks.
+
+    Emulations of all scenarios are sent at once, results are scored by
+    save_check_result when the last of them arrives.
 
     Args:
         session_question_id: Id of the current task in the db
         data_list (List[Tuple]): List of tuples (network schema, requirements).
     """
 
-    networks_to_check = []
+    with flask_app.app_context():
+        check = CheckTask(session_question_id=session_question_id)
+        db.session.add(check)
+        db.session.flush()
+
+        scenarios = []
 
-    if session_question_id is None:
-        for network_json, req_json, modifications_json, guid in data_list:
+        for network_json, req_json, modifications_json, *guid in data_list:
             try:
                 network_json = (
                     json.loads(network_json)
@@ -94,47 +102,151 @@ def perform_task_check(session_question_id, data_list):
                     if isinstance(modifications_json, str)
                     else modifications_json
                 )
-
-                animation = create_emulation_task(network_json)
-                networks_to_check.append(
-                    (network_json, animation, req_json, modifications_json)
-                )
-
             except Exception as e:
                 logging.error(f"Ошибка при создании задачи: {e}.")
+                continue
 
-        answer_on_exam_without_session(networks_to_check, guid)
+            if guid:
+                check.network_guid = guid[0]
+
+            scenario = CheckTaskScenario(
+                check_task_id=check.id,
+                task_guid=str(uuid.uuid4()),
+                network=json.dumps(network_json),
+                requirements=json.dumps(req_json),
+                modifications=json.dumps(modifications_json),
+            )
+
+            # Network without jobs isn't emulated
+            if not network_json.get("jobs"):
+                scenario.animation = "[]"
+
+            db.session.add(scenario)
+            scenarios.append(scenario)
+
+        check.remaining = sum(1 for s in scenarios if s.animation is None)
+        db.session.commit()
+
+        for scenario in scenarios:
+            if scenario.animation is not None:
+                continue
 
-    else:
-        for network_json, req_json, modifications_json in data_list:
             try:
-                network_json = (
-                    json.loads(network_json)
-                    if isinstance(network_json, str)
-                    else network_json
-                )
-                req_json = (
-                    json.loads(req_json) if isinstance(req_json, str) else req_json
+                send_emulation_task(
+                    scenario.network,
+                    BULK_LANE,
+                    task_id=scenario.task_guid,
+                    headers={
+                        "network_task_name": "tasks.save_check_result",
+                        "send_pcaps": False,
+                    },
                 )
-                modifications_json = (
-                    json.loads(modifications_json)
-                    if isinstance(modifications_json, str)
-                    else modifications_json
+            except Exception as e:
+                # Scenario without emulation isn't scored
+                logging.error(f"Ошибка при создании задачи: {e}.")
+                db.session.delete(scenario)
+                CheckTask.query.filter(CheckTask.id == check.id).update(
+                    {"remaining": CheckTask.remaining - 1}
                 )
+                db.session.commit()
 
-                animation = create_emulation_task(network_json)
-                networks_to_check.append(
-                    (network_json, animation, req_json, modifications_json)
-                )
+        expire_task_check.apply_async((check.id,), countdown=CHECK_TIMEOUT)
+
+        finish_task_check(check.id)
 
-            except Exception as e:
-                logging.error(f"Ошибка при создании задачи: {e}.")
 
-        with flask_app.app_context():
-            answer_on_exam_question(session_question_id, networks_to_check)
+@app.task(bind=True, queue="common-results-queue")
+def save_check_result(self, animation, pcaps):
+    """Save emulation result of the task check scenario."""
+    task_guid = self.request.id
 
+    with flask_app.app_context():
+        scenario = CheckTaskScenario.query.filter(
+            CheckTaskScenario.task_guid == task_guid
+        ).first()
+
+        # Check is already scored (or result is repeated)
+        if not scenario or scenario.animation is not None:
+            return
 
-def create_emulation_task(net_schema):
+        scenario.animation = animation
+        CheckTask.query.filter(CheckTask.id == scenario.check_task_id).update(
+            {"remaining": CheckTask.remaining - 1}
+        )
+        db.session.commit()
+
+        finish_task_check(scenario.check_task_id)
+
+
+@app.task(name="tasks.expire_task_check", queue="task-checking-queue")
+def expire_task_check(check_task_id):
+    """Score the task check whose emulation results haven't arrived in time."""
+
+    with flask_app.app_context():
+        # Late results of these scenarios are ignored by save_check_result
+        expired = CheckTaskScenario.query.filter(
+            CheckTaskScenario.check_task_id == check_task_id,
+            CheckTaskScenario.animation.is_(None),
+        ).update({"animation": "[]"}, synchronize_session=False)
+
+        if expired:
+            logging.error(
+                f"Проверка {check_task_id}: нет результатов эмуляции {expired} сценариев."
+            )
+
+        CheckTask.query.filter(CheckTask.id == check_task_id).update(
+            {"remaining": 0}, synchronize_session=False
+        )
+        db.session.commit()
+
+        finish_task_check(check_task_id)
+
+
+def finish_task_check(check_task_id):
+    """Score the task check if all its scenarios are emulated (exactly once)."""
+
+    # Only one of concurrent callers marks the check as finished
+    finished = CheckTask.query.filter(
+        CheckTask.id == check_task_id,
+        CheckTask.remaining <= 0,
+        not_(CheckTask.finished),
+    ).update({"finished": True}, synchronize_session=False)
+    db.session.commit()
+
+    if not finished:
+        return
+
+    check = CheckTask.query.filter(CheckTask.id == check_task_id).first()
+    scenarios = (
+        CheckTaskScenario.query.filter(CheckTaskScenario.check_task_id == check.id)
+        .order_by(CheckTaskScenario.id)
+        .all()
+    )
+
+    networks_to_check = [
+        (
+            json.loads(s.network),
+            s.animation,
+            json.loads(s.requirements),
+            json.loads(s.modifications),
+        )
+        for s in scenarios
+    ]
+
+    try:
+        if check.session_question_id is None:
+            answer_on_exam_without_session(networks_to_check, check.network_guid)
+        else:
+            answer_on_exam_question(check.session_question_id, networks_to_check)
+    finally:
+        CheckTaskScenario.query.filter(
+            CheckTaskScenario.check_task_id == check.id
+        ).delete()
+        db.session.delete(check)
+        db.session.commit()
+
+
+def create_emulation_task(net_schema, lane=BULK_LANE):
     if not net_schema.get("jobs"):
         return []
 
@@ -142,13 +254,8 @@ def create_emulation_task(net_schema):
         json.dumps(net_schema) if not isinstance(net_schema, str) else net_schema
     )
 
-    async_obj = app.send_task(
-        "tasks.mininet_worker",
-        [net_schema],
-        routing_key=str(uuid.uuid4()),
-        exchange=SEND_NETWORK_EXCHANGE,
-        exchange_type=EXCHANGE_TYPE,
-    )
+    # Exam checks go to the bulk lane, answers of waiting users - to the interactive one
+    async_obj, _ = send_emulation_task(net_schema, lane)
 
     async_res = AsyncResult(id=async_obj.id, app=app)
 